@@ -1,7 +1,19 @@
 # Lightweight esper compatibility shim for tests
 # Provides minimal World and Processor to satisfy tests and server usage.
+#
+# Storage is archetype-based (structure of arrays): entities sharing the same
+# set of component types live in one Archetype, which keeps one list (column)
+# per component type plus a parallel list of entity ids. Queries only visit
+# archetypes whose signature contains every requested type.
+#
+# Moving an entity between archetypes takes several steps (swap-remove, then
+# append), during which row indices are briefly inconsistent. World.lock is held
+# only across those steps and across the short point lookups and per-archetype
+# row copies that must not observe them; it is never held while processors or
+# callers run, so a reader waits for at most one entity move.
 from __future__ import annotations
-from typing import Any, Dict, List, Tuple, Type, Iterable
+import threading
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple, Type, Iterable
 
 
 class Processor:
@@ -12,68 +24,226 @@ class Processor:
         pass
 
 
+class Archetype:
+    """Column storage for all entities sharing one exact set of component types."""
+
+    __slots__ = ("types", "types_set", "columns", "entities")
+
+    def __init__(self, types_set: FrozenSet[type]) -> None:
+        self.types_set: FrozenSet[type] = types_set
+        self.types: Tuple[type, ...] = tuple(types_set)
+        self.columns: Dict[type, List[Any]] = {t: [] for t in self.types}
+        self.entities: List[int] = []
+
+    def append(self, eid: int, components: Dict[type, Any]) -> int:
+        """Append a row for eid and return its row index."""
+        for t, col in self.columns.items():
+            col.append(components[t])
+        self.entities.append(eid)
+        return len(self.entities) - 1
+
+    def row_components(self, row: int) -> Dict[type, Any]:
+        return {t: col[row] for t, col in self.columns.items()}
+
+    def swap_remove(self, row: int) -> int | None:
+        """Remove a row by moving the last row into its slot.
+
+        Returns the entity id that was moved into ``row`` (or None when the
+        removed row was the last one) so the caller can update its location.
+        """
+        last = len(self.entities) - 1
+        moved: int | None = None
+        if row != last:
+            for col in self.columns.values():
+                col[row] = col[last]
+            moved = self.entities[last]
+            self.entities[row] = moved
+        for col in self.columns.values():
+            col.pop()
+        self.entities.pop()
+        return moved
+
+
 class World:
     def __init__(self) -> None:
-        self._next_eid: int = 1
-        self._entities: Dict[int, List[Any]] = {}
+        self.lock = threading.RLock()
+        self._archetypes: Dict[FrozenSet[type], Archetype] = {}
+        # Bumped when an entity is created or deleted or gains a component type,
+        # so callers can tell whether an index built over the world may be stale
+        self.version: int = 0
+        # Sparse set indexed directly by entity id -> (archetype, row); slot 0 is
+        # reserved so ids start at 1. Ids of deleted entities are recycled via _free.
+        self._loc: List[Optional[Tuple[Archetype, int]]] = [None]
+        self._free: List[int] = []
+        # caller-ordered type tuple -> canonical (id-sorted) signature, so every
+        # ordering of the same query shares one cache entry; never invalidated
+        self._query_keys: Dict[Tuple[type, ...], Tuple[type, ...]] = {}
+        # query signature -> archetypes covering it; reset whenever an archetype is created
+        self._query_cache: Dict[Tuple[type, ...], List[Archetype]] = {}
         self._processors: List[Processor] = []
+        # Immutable copy iterated by process(); rebuilt only after add_processor
+        self._proc_snapshot: Tuple[Processor, ...] = ()
+        self._proc_dirty: bool = True
+
+    # Internal storage helpers
+    def _archetype_for(self, types_set: FrozenSet[type]) -> Archetype:
+        arch = self._archetypes.get(types_set)
+        if arch is None:
+            arch = Archetype(types_set)
+            self._archetypes[types_set] = arch
+            self._query_cache.clear()
+        return arch
+
+    def _matching_archetypes(self, component_types: Tuple[type, ...]) -> List[Archetype]:
+        key = self._query_keys.get(component_types)
+        if key is None:
+            key = self._query_keys.setdefault(component_types, tuple(sorted(component_types, key=id)))
+        matches = self._query_cache.get(key)
+        if matches is None:
+            # Archetypes are only created under the lock, so computing and storing
+            # under it too means no new archetype can be missed by the cached list
+            with self.lock:
+                matches = self._query_cache.get(key)
+                if matches is None:
+                    wanted = frozenset(component_types)
+                    matches = [arch for arch in self._archetypes.values() if wanted <= arch.types_set]
+                    self._query_cache[key] = matches
+        return matches
+
+    def _location(self, eid: int) -> Optional[Tuple[Archetype, int]]:
+        if 0 < eid < len(self._loc):
+            return self._loc[eid]
+        return None
+
+    def _place(self, eid: int, components: Dict[type, Any]) -> None:
+        arch = self._archetype_for(frozenset(components))
+        row = arch.append(eid, components)
+        self._loc[eid] = (arch, row)
+
+    def _detach(self, eid: int) -> Dict[type, Any]:
+        """Remove eid's row from its archetype and return its components."""
+        arch, row = self._loc[eid]  # type: ignore[misc]
+        self._loc[eid] = None
+        components = arch.row_components(row)
+        moved = arch.swap_remove(row)
+        if moved is not None:
+            self._loc[moved] = (arch, row)
+        return components
 
     # Esper API surface used in repo/tests
     def add_processor(self, processor: Processor) -> None:
         processor.world = self
         self._processors.append(processor)
+        self._proc_dirty = True
 
     def create_entity(self, *components: Any) -> int:
-        eid = self._next_eid
-        self._next_eid += 1
-        self._entities[eid] = list(components)
-        return eid
+        with self.lock:
+            if self._free:
+                eid = self._free.pop()
+            else:
+                eid = len(self._loc)
+                self._loc.append(None)
+            self._place(eid, {type(c): c for c in components})
+            self.version += 1
+            return eid
+
+    def delete_entity(self, eid: int) -> None:
+        with self.lock:
+            if self._location(eid) is None:
+                raise KeyError(f"Entity {eid} does not exist")
+            self._detach(eid)
+            self._free.append(eid)
+            self.version += 1
 
     def add_component(self, eid: int, component: Any) -> None:
-        comps = self._entities.setdefault(eid, [])
-        comps.append(component)
+        with self.lock:
+            if self._location(eid) is not None:
+                components = self._detach(eid)
+            else:
+                # Unknown ids are created on demand (compat with the original shim)
+                components = {}
+                if eid >= len(self._loc):
+                    self._loc.extend([None] * (eid + 1 - len(self._loc)))
+            if type(component) not in components:
+                self.version += 1
+            components[type(component)] = component
+            self._place(eid, components)
 
     def remove_component(self, eid: int, component_type: Type[Any]) -> None:
-        comps = self._entities.get(eid, [])
-        for i, c in enumerate(list(comps)):
-            if isinstance(c, component_type):
-                del comps[i]
+        with self.lock:
+            loc = self._location(eid)
+            # Components are keyed by their exact type, so membership is a dict lookup
+            if loc is None or component_type not in loc[0].columns:
+                # if not found, no-op (compat with some esper versions)
                 return
-        # if not found, no-op (compat with some esper versions)
+            components = self._detach(eid)
+            del components[component_type]
+            self._place(eid, components)
 
     def get_components(self, *component_types: Type[Any]) -> Iterable[Tuple[int, Tuple[Any, ...]]]:
-        # Iterate entities that have at least one instance of each requested type
-        for eid, comps in self._entities.items():
-            found: List[Any] = []
-            ok = True
-            for t in component_types:
-                match = None
-                for c in comps:
-                    if isinstance(c, t):
-                        match = c
-                        break
-                if match is None:
-                    ok = False
-                    break
-                found.append(match)
-            if ok:
-                yield eid, tuple(found)  # type: ignore[return-value]
+        # Visit only archetypes whose signature covers every requested type. Rows
+        # are snapshotted per archetype so processors may add/remove components
+        # (migrating entities between archetypes) while iterating.
+        for arch in self._matching_archetypes(component_types):
+            with self.lock:
+                rows = list(zip(arch.entities, zip(*[arch.columns[t] for t in component_types])))
+            yield from rows
+
+    def get_columns(self, *component_types: Type[Any]) -> Iterable[Tuple[List[int], Tuple[List[Any], ...]]]:
+        """Yield ``(entities, columns)`` per archetype covering component_types.
+
+        Columns are returned in the requested type order and are aligned with
+        ``entities`` so systems can process a whole archetype column-wise instead
+        of unpacking one tuple per entity. The lists are snapshots, so structural
+        changes made while processing do not shift rows underneath the caller.
+        """
+        for arch in self._matching_archetypes(component_types):
+            with self.lock:
+                if not arch.entities:
+                    continue
+                snapshot = list(arch.entities), tuple(list(arch.columns[t]) for t in component_types)
+            yield snapshot
+
+    def get_component(self, component_type: Type[Any]) -> Iterable[Tuple[int, Any]]:
+        for arch in self._matching_archetypes((component_type,)):
+            with self.lock:
+                rows = list(zip(arch.entities, arch.columns[component_type]))
+            yield from rows
 
     def process(self) -> None:
-        for p in list(self._processors):
-            try:
-                p.process()
-            except Exception:
-                # Keep test behavior robust; swallow to continue others
-                raise
+        if self._proc_dirty:
+            self._proc_snapshot = tuple(self._processors)
+            self._proc_dirty = False
+        # Processor exceptions propagate to the caller unchanged
+        for p in self._proc_snapshot:
+            p.process()
 
     def component_for_entity(self, eid: int, component_type: Type[Any]) -> Any:
-        comps = self._entities.get(eid, [])
-        for c in comps:
-            if isinstance(c, component_type):
-                return c
+        with self.lock:
+            loc = self._location(eid)
+            if loc is not None:
+                # Exact-type column lookup, consistent with get_components
+                col = loc[0].columns.get(component_type)
+                if col is not None:
+                    return col[loc[1]]
         raise KeyError(f"Entity {eid} does not have component {component_type}")
 
+    def try_component(self, eid: int, component_type: Type[Any]) -> Optional[Any]:
+        """Like component_for_entity, but return None instead of raising KeyError."""
+        with self.lock:
+            loc = self._location(eid)
+            if loc is not None:
+                col = loc[0].columns.get(component_type)
+                if col is not None:
+                    return col[loc[1]]
+        return None
+
+    def has_component(self, eid: int, component_type: Type[Any]) -> bool:
+        # The archetype signature is the entity's component set
+        with self.lock:
+            loc = self._location(eid)
+            return loc is not None and component_type in loc[0].types_set
+
 
 # Provide module-level fallbacks used in server for older patterns
 def get_components(*args: Any, **kwargs: Any):
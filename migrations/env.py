@@ -3,6 +3,10 @@
 This lightweight env.py references SQLAlchemy metadata from src.models.database:Base
 and supports both offline and online migrations. For async URLs, a sync driver is used
 when required by Alembic (e.g., asyncpg -> postgresql).
+
+Upgrading an empty database to head skips the revision chain: the consolidated
+schema (Base.metadata, see 0006_squash_baseline) is created in one transaction
+and the database is stamped at head. Existing databases migrate as usual.
 """
 from __future__ import annotations
 
@@ -10,7 +14,7 @@ from logging.config import fileConfig
 import os
 
 from alembic import context
-from sqlalchemy import pool, create_engine
+from sqlalchemy import pool, create_engine, inspect
 
 from src.models.database import Base
 
@@ -55,17 +59,61 @@ def run_migrations_offline() -> None:
         context.run_migrations()
 
 
-def run_migrations_online() -> None:
-    """Run migrations in 'online' mode."""
-    connectable = create_engine(get_url(), poolclass=pool.NullPool)
+def _is_upgrade_command() -> bool:
+    # cmd_opts is only populated by the alembic CLI; programmatic command.upgrade() leaves it None
+    cmd = getattr(config.cmd_opts, "cmd", None)
+    if not cmd:
+        return True
+    return getattr(cmd[0], "__name__", "") == "upgrade"
 
-    with connectable.connect() as connection:
-        context.configure(connection=connection, target_metadata=target_metadata, compare_type=True)
 
-        with context.begin_transaction():
+def _should_bootstrap(connection) -> bool:
+    """True when upgrading a database with no schema and no version stamp to head."""
+    if not _is_upgrade_command():
+        return False
+    if context.get_revision_argument() != context.get_head_revision():
+        return False
+    insp = inspect(connection)
+    return not insp.has_table("alembic_version") and not insp.has_table("users")
+
+
+def _run_with_connection(connection) -> None:
+    # One transaction for the whole batch (revisions needing CONCURRENTLY step out
+    # of it via autocommit_block)
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        compare_type=True,
+        transaction_per_migration=False,
+    )
+
+    with context.begin_transaction():
+        if _should_bootstrap(connection):
+            target_metadata.create_all(bind=connection)
+            context.get_context().stamp(context.script, "head")
+        else:
             context.run_migrations()
 
 
+def run_migrations_online() -> None:
+    """Run migrations in 'online' mode.
+
+    Callers that migrate repeatedly (e.g. test fixtures) can hand in an open
+    connection via ``config.attributes["connection"]`` to reuse it instead of
+    connecting anew for every command. The connection must not be inside a
+    transaction, since 0007+ build indexes CONCURRENTLY in autocommit blocks.
+    """
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        _run_with_connection(connection)
+        return
+
+    # A CLI invocation uses exactly one connection, so there is nothing to pool
+    connectable = create_engine(get_url(), poolclass=pool.NullPool, insertmanyvalues_page_size=1000)
+    with connectable.connect() as connection:
+        _run_with_connection(connection)
+
+
 if context.is_offline_mode():
     run_migrations_offline()
 else:
@@ -0,0 +1,82 @@
+"""Squashed baseline: align schema with src/models/database.py
+
+Revision ID: 0006_squash_baseline
+Revises: 0005_reports_and_trade
+Create Date: 2025-09-05 10:15:00
+
+Fresh databases no longer replay 0001–0005 one by one: env.py detects an
+empty database when upgrading to head, issues the full schema from
+Base.metadata in a single transaction and stamps it at head.
+
+Databases already at 0005_reports_and_trade upgrade through this revision,
+which only adds the pieces the ORM declares but the earlier revisions never
+created (ship_build_queue, fleet_missions, fleets.colony_ship), so both paths
+end with the same schema.
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0006_squash_baseline"
+down_revision = "0005_reports_and_trade"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    # Spelled out rather than read from Base.metadata, so tables added to the
+    # models later are left to the revisions that introduce them. Databases
+    # bootstrapped with DEV_CREATE_ALL may already have these tables.
+    existing = set(sa.inspect(bind).get_table_names())
+
+    if "ship_build_queue" not in existing:
+        op.create_table(
+            "ship_build_queue",
+            sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column("planet_id", sa.Integer(), sa.ForeignKey("planets.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("ship_type", sa.String(length=50), nullable=False),
+            sa.Column("count", sa.Integer(), nullable=False),
+            sa.Column("completion_time", sa.DateTime(timezone=True), nullable=False),
+            sa.Column("enqueued_at", sa.DateTime(timezone=True), nullable=False),
+            sa.Column("completed_at", sa.DateTime(timezone=True), nullable=True),
+        )
+        op.create_index("ix_ship_queue_planet_id", "ship_build_queue", ["planet_id"], unique=False)
+        op.create_index("ix_ship_queue_completion_time", "ship_build_queue", ["completion_time"], unique=False)
+        op.create_index("ix_ship_queue_completed_at", "ship_build_queue", ["completed_at"], unique=False)
+
+    if "fleet_missions" not in existing:
+        op.create_table(
+            "fleet_missions",
+            sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("origin_galaxy", sa.Integer(), nullable=False),
+            sa.Column("origin_system", sa.Integer(), nullable=False),
+            sa.Column("origin_planet", sa.Integer(), nullable=False),
+            sa.Column("target_galaxy", sa.Integer(), nullable=False),
+            sa.Column("target_system", sa.Integer(), nullable=False),
+            sa.Column("target_planet", sa.Integer(), nullable=False),
+            sa.Column("mission", sa.String(length=32), nullable=False),
+            sa.Column("speed", sa.Float(), nullable=False),
+            sa.Column("recalled", sa.Boolean(), nullable=False),
+            sa.Column("departure_time", sa.DateTime(timezone=True), nullable=False),
+            sa.Column("arrival_time", sa.DateTime(timezone=True), nullable=False),
+            sa.UniqueConstraint("user_id", name="uq_fleet_mission_user_open"),
+        )
+        op.create_index("ix_fleet_missions_user", "fleet_missions", ["user_id"], unique=False)
+        op.create_index("ix_fleet_missions_arrival", "fleet_missions", ["arrival_time"], unique=False)
+
+    fleet_columns = {c["name"] for c in sa.inspect(bind).get_columns("fleets")}
+    if "colony_ship" not in fleet_columns:
+        op.add_column(
+            "fleets",
+            sa.Column("colony_ship", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        )
+
+
+def downgrade() -> None:
+    op.drop_column("fleets", "colony_ship")
+    op.drop_table("fleet_missions")
+    op.drop_table("ship_build_queue")
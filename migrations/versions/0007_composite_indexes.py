@@ -0,0 +1,70 @@
+"""Fold single-column indexes into composites matching query predicates
+
+Revision ID: 0007_composite_indexes
+Revises: 0006_squash_baseline
+Create Date: 2025-09-05 11:30:00
+
+Composite indexes replace single-column ones where queries filter on one
+column and sort or filter on another:
+- trade_offers (status, created_at): open offers listed newest first
+- battle_reports / espionage_reports (attacker_user_id, created_at) and
+  (defender_user_id, created_at): per-user report lists ordered by recency
+- building_queue (planet_id, status), research_queue (user_id, status):
+  pending queue items per planet/user
+
+B-tree indexes can be scanned backwards, so the ascending created_at column
+also serves ORDER BY created_at DESC. All indexes are built and dropped
+CONCURRENTLY (outside the migration transaction) so populated tables stay
+writable during deployment.
+"""
+from __future__ import annotations
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0007_composite_indexes"
+down_revision = "0006_squash_baseline"
+branch_labels = None
+depends_on = None
+
+
+# (name, table, columns) created by this revision
+_COMPOSITES = [
+    ("ix_trade_offers_status_created", "trade_offers", ["status", "created_at"]),
+    ("ix_battle_reports_attacker_created", "battle_reports", ["attacker_user_id", "created_at"]),
+    ("ix_battle_reports_defender_created", "battle_reports", ["defender_user_id", "created_at"]),
+    ("ix_espionage_reports_attacker_created", "espionage_reports", ["attacker_user_id", "created_at"]),
+    ("ix_espionage_reports_defender_created", "espionage_reports", ["defender_user_id", "created_at"]),
+    ("ix_build_queue_planet_status", "building_queue", ["planet_id", "status"]),
+    ("ix_research_queue_user_status", "research_queue", ["user_id", "status"]),
+]
+
+# (name, table, columns) superseded by the composites above
+_SUPERSEDED = [
+    ("ix_trade_offers_status", "trade_offers", ["status"]),
+    ("ix_battle_reports_attacker", "battle_reports", ["attacker_user_id"]),
+    ("ix_battle_reports_defender", "battle_reports", ["defender_user_id"]),
+    ("ix_espionage_reports_attacker", "espionage_reports", ["attacker_user_id"]),
+    ("ix_espionage_reports_defender", "espionage_reports", ["defender_user_id"]),
+    ("ix_build_queue_planet_id", "building_queue", ["planet_id"]),
+    ("ix_build_queue_status", "building_queue", ["status"]),
+    ("ix_research_queue_user_id", "research_queue", ["user_id"]),
+    ("ix_research_queue_status", "research_queue", ["status"]),
+]
+
+
+def upgrade() -> None:
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        for name, table, columns in _COMPOSITES:
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=True)
+        for name, table, _columns in _SUPERSEDED:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns in _SUPERSEDED:
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=True)
+        for name, table, _columns in _COMPOSITES:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
@@ -0,0 +1,65 @@
+"""Partial indexes for pending queue rows and open trade offers
+
+Revision ID: 0008_pending_partial_indexes
+Revises: 0007_composite_indexes
+Create Date: 2025-09-05 14:00:00
+
+Queue lookups only ever read rows with status='pending' and the marketplace
+defaults to status='open', while completed/accepted rows pile up forever.
+Partial indexes cover just the live rows, stay small enough to remain cached
+and are not touched when finished rows are updated:
+- building_queue (planet_id, complete_at) WHERE status='pending'
+- research_queue (user_id, complete_at) WHERE status='pending'
+- trade_offers (created_at) WHERE status='open'
+
+They replace the (owner, status) composites from 0007, the full-table
+complete_at indexes and ix_trade_offers_status_created. Listing offers in other
+statuses uses ix_trade_offers_created_at.
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0008_pending_partial_indexes"
+down_revision = "0007_composite_indexes"
+branch_labels = None
+depends_on = None
+
+
+_PENDING = sa.text("status = 'pending'")
+_OPEN = sa.text("status = 'open'")
+
+# (name, table, columns, where) created by this revision
+_PARTIALS = [
+    ("ix_build_queue_pending", "building_queue", ["planet_id", "complete_at"], _PENDING),
+    ("ix_research_queue_pending", "research_queue", ["user_id", "complete_at"], _PENDING),
+    ("ix_trade_offers_open", "trade_offers", ["created_at"], _OPEN),
+]
+
+# (name, table, columns) superseded by the partial indexes above
+_SUPERSEDED = [
+    ("ix_build_queue_planet_status", "building_queue", ["planet_id", "status"]),
+    ("ix_build_queue_complete_at", "building_queue", ["complete_at"]),
+    ("ix_research_queue_user_status", "research_queue", ["user_id", "status"]),
+    ("ix_research_queue_complete_at", "research_queue", ["complete_at"]),
+    ("ix_trade_offers_status_created", "trade_offers", ["status", "created_at"]),
+]
+
+
+def upgrade() -> None:
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in _PARTIALS:
+            op.create_index(name, table, columns, unique=False, postgresql_where=where, postgresql_concurrently=True)
+        for name, table, _columns in _SUPERSEDED:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns in _SUPERSEDED:
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=True)
+        for name, table, _columns, _where in _PARTIALS:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
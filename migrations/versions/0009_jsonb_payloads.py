@@ -0,0 +1,79 @@
+"""Store JSON payload columns as JSONB and GIN-index report locations
+
+Revision ID: 0009_jsonb_payloads
+Revises: 0008_pending_partial_indexes
+Create Date: 2025-09-05 16:00:00
+
+sa.JSON maps to the text-backed json type on PostgreSQL, which is re-parsed on
+every read and cannot be indexed. This revision converts the payload columns
+to binary jsonb in place and adds a GIN index on battle_reports.location so
+containment (@>) lookups by coordinates are index-backed:
+- notifications.payload
+- battle_reports.location / outcome
+- espionage_reports.location / snapshot
+
+Other dialects keep their JSON storage; only the index is created there.
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "0009_jsonb_payloads"
+down_revision = "0008_pending_partial_indexes"
+branch_labels = None
+depends_on = None
+
+
+# (table, column) stored as JSONB on PostgreSQL
+_COLUMNS = [
+    ("notifications", "payload"),
+    ("battle_reports", "location"),
+    ("battle_reports", "outcome"),
+    ("espionage_reports", "location"),
+    ("espionage_reports", "snapshot"),
+]
+
+
+def _is_postgres() -> bool:
+    return op.get_bind().dialect.name == "postgresql"
+
+
+def upgrade() -> None:
+    if _is_postgres():
+        for table, column in _COLUMNS:
+            op.alter_column(
+                table,
+                column,
+                type_=postgresql.JSONB(),
+                existing_type=sa.JSON(),
+                existing_nullable=False,
+                postgresql_using=f"{column}::jsonb",
+            )
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_battle_reports_location_gin",
+            "battle_reports",
+            ["location"],
+            unique=False,
+            postgresql_using="gin",
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_battle_reports_location_gin", table_name="battle_reports", postgresql_concurrently=True)
+    if _is_postgres():
+        for table, column in _COLUMNS:
+            op.alter_column(
+                table,
+                column,
+                type_=sa.JSON(),
+                existing_type=postgresql.JSONB(),
+                existing_nullable=False,
+                postgresql_using=f"{column}::json",
+            )
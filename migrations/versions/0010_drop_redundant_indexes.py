@@ -0,0 +1,66 @@
+"""Drop single-column indexes duplicated by unique constraints
+
+Revision ID: 0010_drop_redundant_indexes
+Revises: 0009_jsonb_payloads
+Create Date: 2025-09-05 17:00:00
+
+0001 created plain indexes next to unique constraints that already maintain a
+btree on the same leading column:
+- ix_users_username / ix_users_email duplicate uq_users_username / uq_users_email
+- ix_planets_owner_id duplicates the leading column of
+  uq_owner_coord (owner_id, galaxy, system, position)
+
+ix_planets_coords (galaxy, system, position) stays: it does not lead with
+owner_id and serves the occupied-coordinate lookups.
+
+Databases bootstrapped from metadata before this revision have unique
+ix_users_* indexes instead of the uq_users_* constraints; the constraints are
+added first where missing so uniqueness is never lost.
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0010_drop_redundant_indexes"
+down_revision = "0009_jsonb_payloads"
+branch_labels = None
+depends_on = None
+
+
+# (constraint, column) that must exist on users before the indexes go
+_USER_UNIQUES = [
+    ("uq_users_username", "username"),
+    ("uq_users_email", "email"),
+]
+
+# (name, table, columns) dropped by this revision
+_REDUNDANT = [
+    ("ix_users_username", "users", ["username"]),
+    ("ix_users_email", "users", ["email"]),
+    ("ix_planets_owner_id", "planets", ["owner_id"]),
+]
+
+
+def upgrade() -> None:
+    insp = sa.inspect(op.get_bind())
+    existing = {uc["name"] for uc in insp.get_unique_constraints("users")}
+    missing = [(name, column) for name, column in _USER_UNIQUES if name not in existing]
+    if missing:
+        with op.batch_alter_table("users") as batch:
+            for name, column in missing:
+                batch.create_unique_constraint(name, [column])
+
+    indexes = {
+        table: {ix["name"] for ix in insp.get_indexes(table)}
+        for table in {table for _name, table, _columns in _REDUNDANT}
+    }
+    for name, table, _columns in _REDUNDANT:
+        if name in indexes[table]:
+            op.drop_index(name, table_name=table)
+
+
+def downgrade() -> None:
+    for name, table, columns in _REDUNDANT:
+        op.create_index(name, table, columns, unique=False)
@@ -0,0 +1,37 @@
+"""Composite (user_id, created_at) index for per-user notification lists
+
+Revision ID: 0011_notifications_user_created
+Revises: 0010_drop_redundant_indexes
+Create Date: 2025-09-06 10:00:00
+
+GET /player/{user_id}/notifications filters on user_id and orders by
+created_at DESC with offset/limit. The composite index turns that into a
+backward range scan of one user's entries and supersedes the single-column
+ix_notifications_user_id; ix_notifications_created_at is left as is.
+Built and dropped CONCURRENTLY, as in 0007.
+"""
+from __future__ import annotations
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0011_notifications_user_created"
+down_revision = "0010_drop_redundant_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_notifications_user_created", "notifications", ["user_id", "created_at"],
+            unique=False, postgresql_concurrently=True,
+        )
+        op.drop_index("ix_notifications_user_id", table_name="notifications", postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index("ix_notifications_user_id", "notifications", ["user_id"], unique=False, postgresql_concurrently=True)
+        op.drop_index("ix_notifications_user_created", table_name="notifications", postgresql_concurrently=True)
@@ -2,7 +2,9 @@
 from __future__ import annotations
 
 import argparse
+import hashlib
 import json
+import os
 import sys
 from pathlib import Path
 
@@ -16,12 +18,44 @@ try:
 except Exception as e:  # pragma: no cover
     yaml = None
 
-# Import the FastAPI app
-from src.api.routes import app
+# libyaml's C emitter is much faster than the pure-Python one; it is available
+# when PyYAML comes from a wheel or was built against libyaml-dev
+try:
+    from yaml import CSafeDumper as YamlDumper  # type: ignore
+except Exception:  # pragma: no cover - PyYAML without libyaml, or no PyYAML
+    YamlDumper = getattr(yaml, "SafeDumper", None)
+
+# Route and request/response model definitions the schema is derived from
+SCHEMA_SOURCES = [PROJECT_ROOT / "src" / "api"]
+
+
+def source_digest(fmt: str) -> str:
+    """Hash the paths and mtimes of the schema sources (cheap; nothing is imported)."""
+    h = hashlib.blake2b(fmt.encode("utf-8"), digest_size=16)
+    for root in SCHEMA_SOURCES:
+        for path in sorted(root.rglob("*.py")):
+            h.update(str(path.relative_to(PROJECT_ROOT)).encode("utf-8"))
+            h.update(str(os.stat(path).st_mtime_ns).encode("ascii"))
+    return h.hexdigest()
+
+
+def hash_path_for(out_path: Path) -> Path:
+    return out_path.with_suffix(out_path.suffix + ".hash")
+
+
+def is_up_to_date(out_path: Path, digest: str) -> bool:
+    """True when out_path exists and was generated from the same sources."""
+    try:
+        return out_path.exists() and hash_path_for(out_path).read_text(encoding="utf-8").strip() == digest
+    except OSError:
+        return False
 
 
 def generate_schema_dict() -> dict:
     """Return the OpenAPI schema dict from the FastAPI app."""
+    # Import lazily so an up-to-date schema never pays for loading the app
+    from src.api.routes import app
+
     # Ensure schema is built
     return app.openapi()
 
@@ -33,11 +67,12 @@ def write_output(schema: dict, out_path: Path, fmt: str) -> None:
             raise RuntimeError(
                 "PyYAML is required to output YAML. Install with: pip install pyyaml"
             )
-        text = yaml.safe_dump(schema, sort_keys=False, allow_unicode=True)
-        out_path.write_text(text, encoding="utf-8")
+        # Serialize straight into the file instead of building the whole text first
+        with out_path.open("w", encoding="utf-8") as fp:
+            yaml.dump(schema, fp, Dumper=YamlDumper, sort_keys=False, allow_unicode=True)
     else:
-        text = json.dumps(schema, indent=2, ensure_ascii=False)
-        out_path.write_text(text, encoding="utf-8")
+        with out_path.open("w", encoding="utf-8") as fp:
+            json.dump(schema, fp, indent=2, ensure_ascii=False)
 
 
 def main() -> None:
@@ -55,10 +90,21 @@ def main() -> None:
         default="yaml",
         help="Output format (default: yaml)",
     )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Regenerate even if the API sources are unchanged",
+    )
     args = parser.parse_args()
 
+    digest = source_digest(args.format)
+    if not args.force and is_up_to_date(args.out, digest):
+        print(f"OpenAPI schema at {args.out} is up to date")
+        return
+
     schema = generate_schema_dict()
     write_output(schema, args.out, args.format)
+    hash_path_for(args.out).write_text(digest + "\n", encoding="utf-8")
     print(f"OpenAPI schema written to {args.out} in {args.format.upper()} format")
 
 
@@ -2,13 +2,14 @@
 Locust load testing for the Ogame-like server.
 
 Simulates 1000+ concurrent players that:
-- Register (or log in if already registered)
+- Register (or log in if already registered) via a single /auth/bootstrap call
 - Retrieve game status and player data
 - Queue random building constructions
 
 Usage examples:
   # Start your API server first (in another terminal):
-  #   uvicorn src.main:app --host 0.0.0.0 --port 8000
+  #   uvicorn src.main:app --host 0.0.0.0 --port 8000 --loop uvloop --http httptools --no-access-log
+  # (single worker: game state is per-process; see README.md)
   # Then run Locust pointing to the host:
   #   locust -f scripts/load/locustfile.py --host http://127.0.0.1:8000
   # In the web UI, set Users (spawned) to 1000+ and choose a spawn rate.
@@ -19,6 +20,8 @@ Environment variables (optional):
 - WAIT_MAX: maximum wait time between tasks in seconds (default: 1.5)
 - BUILDING_TYPES: comma-separated list of building types to use
   (default: "metal_mine,crystal_mine,deuterium_synthesizer,solar_plant,robot_factory,shipyard")
+- NETWORK_TIMEOUT / CONNECTION_TIMEOUT: HTTP client timeouts in seconds (default: 10)
+- LOCUST_INSECURE: "true" to skip TLS certificate verification (default: false)
 
 Notes:
 - This script keeps runtime-side changes minimal. Locust is not added to requirements.txt; install it separately:
@@ -27,9 +30,10 @@ Notes:
 """
 from __future__ import annotations
 
+import json
 import os
 import random
-import uuid
+import secrets
 from typing import List, Optional
 
 from locust import FastHttpUser, task, between
@@ -52,6 +56,18 @@ DEFAULT_BUILDINGS = [
 ]
 
 
+def _building_types() -> List[str]:
+    raw = os.getenv("BUILDING_TYPES")
+    return [b.strip() for b in raw.split(",") if b.strip()] if raw else DEFAULT_BUILDINGS
+
+
+USER_PREFIX = os.getenv("USER_PREFIX", "load")
+
+# Request bodies are encoded once at import; tasks only pick one
+BUILD_PAYLOADS: List[bytes] = [json.dumps({"building_type": b}).encode("utf-8") for b in _building_types()]
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+
 class GameUser(FastHttpUser):
     """Simulated game user that authenticates and performs gameplay actions.
 
@@ -60,44 +76,48 @@ class GameUser(FastHttpUser):
 
     wait_time = between(_env_float("WAIT_MIN", 0.1), _env_float("WAIT_MAX", 0.5))
 
+    # Each VU runs its tasks sequentially over one keep-alive connection, so a
+    # single pooled connection is enough; retries would hide server errors
+    concurrency = 1
+    max_retries = 0
+    network_timeout = _env_float("NETWORK_TIMEOUT", 10.0)
+    connection_timeout = _env_float("CONNECTION_TIMEOUT", 10.0)
+    # Skip TLS certificate verification (self-signed staging hosts only)
+    insecure = os.getenv("LOCUST_INSECURE", "false").lower() == "true"
+
     def on_start(self) -> None:
         self._token: Optional[str] = None
         self.user_id: Optional[int] = None
-        self.username: str = f"{os.getenv('USER_PREFIX', 'load')}_{uuid.uuid4().hex[:12]}"
-        self.password: str = f"Passw0rd!{uuid.uuid4().hex[:6]}"  # >= 8 chars to satisfy validation
-        self.email: str = f"{self.username}@example.com"
-
-        # Try to register; if already exists, proceed to login
-        self._register_if_possible()
-        self._login()
-        # Fallback to /auth/me to discover ID if registration didn't return it
-        if self.user_id is None:
-            self._whoami()
+        self._new_identity()
+
+        # One round-trip: registers, or logs in when the username already exists
+        self._bootstrap()
+        if self._token is None:
+            # Retry once with a fresh identity (e.g. generated email collided)
+            self._new_identity()
+            self._bootstrap()
 
     # ------------ Auth helpers ------------
-    def _register_if_possible(self) -> None:
+    def _new_identity(self) -> None:
+        # One CSPRNG draw covers both the username and password suffixes
+        raw = secrets.token_hex(9)
+        self.username = f"{USER_PREFIX}_{raw[:12]}"
+        self.password = f"Passw0rd!{raw[12:]}"  # >= 8 chars to satisfy validation
+        self.email = f"{self.username}@example.com"
+
+    def _bootstrap(self) -> None:
         payload = {
             "username": self.username,
             "email": self.email,
             "password": self.password,
         }
-        with self.client.post("/auth/register", json=payload, name="/auth/register", catch_response=True) as resp:
-            # In many runs, this may 400 due to username already taken.
+        with self.client.post("/auth/bootstrap", json=payload, name="/auth/bootstrap", catch_response=True) as resp:
             if resp.status_code == 200:
                 try:
                     data = resp.json()
                     self.user_id = int(data.get("id"))
-                except Exception:
-                    pass
-            else:
-                resp.success()  # Do not treat 4xx here as failure during load prep
-
-    def _login(self) -> None:
-        payload = {"username": self.username, "password": self.password}
-        with self.client.post("/auth/login", json=payload, name="/auth/login", catch_response=True) as resp:
-            if resp.status_code == 200:
-                try:
-                    data = resp.json()
+                    self._player_url = f"/player/{self.user_id}"
+                    self._build_url = f"{self._player_url}/build"
                     token = data.get("access_token")
                     if token:
                         self._token = token
@@ -105,38 +125,7 @@ class GameUser(FastHttpUser):
                 except Exception:
                     pass
             else:
-                # If login failed (e.g., registration failed with taken username), try a fresh identity once
-                if resp.status_code in (400, 401):
-                    # Generate a new identity and try register+login once more
-                    self.username = f"{os.getenv('USER_PREFIX', 'load')}_{uuid.uuid4().hex[:12]}"
-                    self.password = f"Passw0rd!{uuid.uuid4().hex[:6]}"
-                    self.email = f"{self.username}@example.com"
-                    self._register_if_possible()
-                    # Attempt login again
-                    with self.client.post("/auth/login", json={"username": self.username, "password": self.password}, name="/auth/login", catch_response=True) as resp2:
-                        if resp2.status_code == 200:
-                            try:
-                                data2 = resp2.json()
-                                token = data2.get("access_token")
-                                if token:
-                                    self._token = token
-                                    self.client.headers.update({"Authorization": f"Bearer {token}"})
-                            except Exception:
-                                pass
-                        else:
-                            resp2.success()  # avoid polluting stats with setup failures
-                resp.success()
-
-    def _whoami(self) -> None:
-        with self.client.get("/auth/me", name="/auth/me", catch_response=True) as resp:
-            if resp.status_code == 200:
-                try:
-                    data = resp.json()
-                    self.user_id = int(data.get("id"))
-                except Exception:
-                    pass
-            else:
-                resp.success()
+                resp.success()  # Do not treat setup 4xx as failures in the load stats
 
     # ------------ Task definitions ------------
     @task(3)
@@ -146,14 +135,10 @@ class GameUser(FastHttpUser):
     @task(3)
     def get_player(self) -> None:
         if self.user_id is not None:
-            self.client.get(f"/player/{self.user_id}", name="/player/:id")
+            self.client.get(self._player_url, name="/player/:id")
 
     @task(2)
     def maybe_queue_build(self) -> None:
         if self.user_id is None:
             return
-        raw = os.getenv("BUILDING_TYPES")
-        buildings: List[str] = [b.strip() for b in raw.split(",")] if raw else DEFAULT_BUILDINGS
-        building = random.choice(buildings)
-        payload = {"building_type": building}
-        self.client.post(f"/player/{self.user_id}/build", json=payload, name="/player/:id/build")
+        self.client.post(self._build_url, data=random.choice(BUILD_PAYLOADS), headers=JSON_HEADERS, name="/player/:id/build")
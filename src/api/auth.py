@@ -1,26 +1,37 @@
 from __future__ import annotations
 
+import time
+from copy import copy
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Any, Dict, List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from pydantic import BaseModel
-from sqlalchemy import select
+from pydantic import BaseModel, Field, field_validator
+from sqlalchemy import bindparam, exists, insert, literal, or_, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.auth.security import (
     create_access_token,
     get_current_user,
-    hash_password,
+    hash_password_async,
     oauth2_scheme,
-    verify_password,
+    password_needs_rehash,
+    verify_password_async,
     blacklist_token,
     mem_create_user,
     mem_get_user_by_username,
+    user_has_planet_cached,
+    remember_user_has_planet,
+    forget_user_has_planet,
+    record_last_login,
 )
+# Read flags as module attributes at call time so runtime overrides still apply
+from src.core import config as _config
 from src.core.database import get_async_session, get_optional_async_session, is_db_enabled
 from src.models.database import User as ORMUser, Planet as ORMPlanet, Building as ORMBuilding
 from src.core.state import game_world
+from src.core.time_utils import utc_now
 from src.models import Player, Position, Resources, ResourceProduction, Buildings, BuildQueue, ShipBuildQueue, Fleet, Research, ResearchQueue, Planet as PlanetComp
 
 # Reusable dependency to ensure a player's data is present in the ECS world
@@ -31,15 +42,15 @@ def ensure_player_loaded(user_id: int) -> bool:
     """FastAPI dependency that ensures a player's ECS data is loaded.
 
     If the player's data is not present in-memory, attempt to load it from
-    persistence using GameWorld.load_player_data(user_id). Any exceptions are
+    persistence using GameWorld.load_player_data(user_id). Players already in
+    the user->entity index return after a single dict lookup. Any exceptions are
     swallowed to preserve endpoint resilience; the endpoint should still
     return 404 if the player truly does not exist.
     """
     try:
-        if game_world.get_player_data(user_id) is None:
+        if not game_world.has_player(user_id):
             game_world.load_player_data(user_id)
             # Optional short wait/poll to allow async hydration to complete in DB-backed mode
-            import time
             # Allow more time for DB hydration in docker-compose environments
             deadline = time.perf_counter() + 2.0  # wait up to ~2s
             while game_world.get_player_data(user_id) is None and time.perf_counter() < deadline:
@@ -55,10 +66,9 @@ def ensure_player_loaded(user_id: int) -> bool:
 def ensure_current_user_player_loaded(user: ORMUser = Depends(get_current_user)) -> bool:  # type: ignore[name-defined]
     try:
         uid = int(getattr(user, "id", 0))
-        if uid and game_world.get_player_data(uid) is None:
+        if uid and not game_world.has_player(uid):
             game_world.load_player_data(uid)
             # Optional short wait/poll to allow async hydration to complete in DB-backed mode
-            import time
             # Allow more time for DB hydration in docker-compose environments
             deadline = time.perf_counter() + 2.0  # wait up to ~2s
             while game_world.get_player_data(uid) is None and time.perf_counter() < deadline:
@@ -69,19 +79,71 @@ def ensure_current_user_player_loaded(user: ORMUser = Depends(get_current_user))
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
+# Flat value components of the in-memory starter kit, built once and shallow-copied
+# per registration. Components holding timestamps or queue lists are created fresh.
+_STARTER_PROTOTYPES = (
+    Position(),
+    Resources(metal=100000, crystal=100000, deuterium=100000),
+    Buildings(shipyard=1),
+    Fleet(),
+    Research(),
+)
+
+
+def _starter_components(username: str, user_id: int, planet_name: str) -> tuple:
+    return (
+        Player(name=username, user_id=user_id),
+        *map(copy, _STARTER_PROTOTYPES),
+        ResourceProduction(),
+        BuildQueue(),
+        ShipBuildQueue(),
+        ResearchQueue(),
+        PlanetComp(name=planet_name, owner_id=user_id),
+    )
+
 
 class RegisterRequest(BaseModel):
-    username: str
+    # Checked while parsing; register_validation_detail turns violations back
+    # into the 400 responses these routes have always returned
+    username: str = Field(min_length=3)
     email: str
-    password: str
+    password: str = Field(min_length=8)
+
+    @field_validator("email")
+    @classmethod
+    def _check_email(cls, value: str) -> str:
+        if "@" not in value or "." not in value:
+            raise ValueError("Invalid email")
+        return value
+
 
-    def validate_basic(self) -> None:
-        if len(self.username) < 3:
-            raise HTTPException(status_code=400, detail="Username too short")
-        if "@" not in self.email or "." not in self.email:
-            raise HTTPException(status_code=400, detail="Invalid email")
-        if len(self.password) < 8:
-            raise HTTPException(status_code=400, detail="Password too short (min 8)")
+# RegisterRequest field -> (pydantic error types it may raise, 400 detail), in check order
+_REGISTER_CHECKS = (
+    ("username", ("string_too_short",), "Username too short"),
+    ("email", ("value_error",), "Invalid email"),
+    ("password", ("string_too_short",), "Password too short (min 8)"),
+)
+_REGISTER_PATHS = frozenset({"/auth/register", "/auth/bootstrap"})
+
+
+def register_validation_detail(path: str, errors: List[Dict[str, Any]]) -> Optional[str]:
+    """Return the 400 detail for a RegisterRequest rule violation, or None.
+
+    Only /auth/register and /auth/bootstrap are mapped, and only when every error
+    is one of RegisterRequest's own checks; missing fields and wrong types keep
+    FastAPI's standard 422.
+    """
+    if path not in _REGISTER_PATHS or not errors:
+        return None
+    failed = set()
+    for err in errors:
+        loc = tuple(err.get("loc", ()))
+        field = loc[1] if len(loc) == 2 and loc[0] == "body" else None
+        check = next((c for c in _REGISTER_CHECKS if c[0] == field), None)
+        if check is None or err.get("type") not in check[1]:
+            return None
+        failed.add(field)
+    return next(detail for field, _types, detail in _REGISTER_CHECKS if field in failed)
 
 
 class LoginRequest(BaseModel):
@@ -94,42 +156,119 @@ class TokenResponse(BaseModel):
     token_type: str = "bearer"
 
 
-@router.post("/register")
-async def register(payload: RegisterRequest, session: Optional[AsyncSession] = Depends(get_optional_async_session)):
-    payload.validate_basic()
+class BootstrapResponse(TokenResponse):
+    id: int
+
+
+class RegisterResponse(BaseModel):
+    id: int
+    username: str
+    email: str
+
+
+class MeResponse(BaseModel):
+    id: int
+    username: str
+    email: Optional[str] = None
+    is_active: bool
+    created_at: Optional[str] = None
+    last_login: Optional[str] = None
+    needs_start_choice: bool
+
+
+# Statements built once at import and executed with bound parameters, so each
+# request reuses SQLAlchemy's compiled form and asyncpg's prepared statement
+_SELECT_USER_CONFLICTS = (
+    select(ORMUser.username, ORMUser.email)
+    .where(or_(ORMUser.username == bindparam("username"), ORMUser.email == bindparam("email")))
+    .limit(2)
+)
+_INSERT_USER = (
+    insert(ORMUser)
+    .values(username=bindparam("username"), email=bindparam("email"), password_hash=bindparam("password_hash"))
+    .returning(ORMUser.id)
+)
+# PostgreSQL: the starter planet rides along via a data-modifying CTE (one round-trip)
+_new_user = _INSERT_USER.cte("new_user")
+_INSERT_USER_WITH_PLANET = (
+    insert(ORMPlanet)
+    .from_select(
+        ["owner_id", "name", "galaxy", "system", "position", "last_update"],
+        select(
+            _new_user.c.id,
+            bindparam("planet_name", type_=ORMPlanet.name.type),
+            literal(1),
+            literal(1),
+            literal(1),
+            bindparam("last_update", type_=ORMPlanet.last_update.type),
+        ),
+    )
+    .returning(ORMPlanet.owner_id)
+)
+del _new_user
+_INSERT_STARTER_PLANET = insert(ORMPlanet).values(
+    name=bindparam("planet_name"), owner_id=bindparam("owner_id"), galaxy=1, system=1, position=1
+)
+_SELECT_LOGIN_USER = select(ORMUser.id, ORMUser.is_active, ORMUser.password_hash).where(
+    ORMUser.username == bindparam("username")
+)
+_SELECT_HAS_PLANET = select(exists().where(ORMPlanet.owner_id == bindparam("owner_id")))
+_UPDATE_PASSWORD_HASH = update(ORMUser).where(ORMUser.id == bindparam("user_id")).values(password_hash=bindparam("new_hash"))
+
+
+class _UsernameTaken(HTTPException):
+    """400 raised by _create_user for an existing username (bootstrap logs in instead)."""
 
+    def __init__(self) -> None:
+        super().__init__(status_code=400, detail="Username already taken")
+
+
+async def _hash_new_password(password: str) -> str:
     try:
-        pwd_hash = hash_password(payload.password)
+        return await hash_password_async(password)
     except Exception:
         raise HTTPException(status_code=500, detail="Password hashing unavailable")
 
+
+async def _create_user(payload: RegisterRequest, session: Optional[AsyncSession]) -> int:
+    """Create the user (and starter planet/entity unless start choice is required); return its id.
+
+    Raises HTTPException(400) when the username or email is already taken
+    (_UsernameTaken for the username). The password is only hashed once the
+    conflict checks pass.
+    """
     # Config flag to optionally require start choice
-    try:
-        from src.core.config import REQUIRE_START_CHOICE, STARTER_PLANET_NAME
-    except Exception:
-        REQUIRE_START_CHOICE = False
-        STARTER_PLANET_NAME = "Homeworld"
+    REQUIRE_START_CHOICE = _config.REQUIRE_START_CHOICE
+    STARTER_PLANET_NAME = _config.STARTER_PLANET_NAME
 
     if is_db_enabled() and session is not None:
-        # Ensure unique username/email
-        result = await session.execute(select(ORMUser).where(ORMUser.username == payload.username))
-        if result.scalar_one_or_none() is not None:
-            raise HTTPException(status_code=400, detail="Username already taken")
-        result = await session.execute(select(ORMUser).where(ORMUser.email == payload.email))
-        if result.scalar_one_or_none() is not None:
+        # Ensure unique username/email in one round-trip (at most one row can match each)
+        result = await session.execute(_SELECT_USER_CONFLICTS, {"username": payload.username, "email": payload.email})
+        conflicts = result.all()
+        if any(row.username == payload.username for row in conflicts):
+            raise _UsernameTaken()
+        if conflicts:
             raise HTTPException(status_code=400, detail="Email already in use")
+        pwd_hash = await _hash_new_password(payload.password)
 
-        user = ORMUser(username=payload.username, email=payload.email, password_hash=pwd_hash)
-        session.add(user)
-        await session.flush()
-
-        if not REQUIRE_START_CHOICE:
-            # Create initial planet for the user (default location)
-            planet = ORMPlanet(name=STARTER_PLANET_NAME, owner_id=user.id, galaxy=1, system=1, position=1)
-            session.add(planet)
+        # Core INSERT ... RETURNING
+        user_params = {"username": payload.username, "email": payload.email, "password_hash": pwd_hash}
+        try:
+            if REQUIRE_START_CHOICE:
+                user_id = (await session.execute(_INSERT_USER, user_params)).scalar_one()
+            elif session.bind is not None and session.bind.dialect.name == "postgresql":
+                params = {**user_params, "planet_name": STARTER_PLANET_NAME, "last_update": utc_now()}
+                user_id = (await session.execute(_INSERT_USER_WITH_PLANET, params)).scalar_one()
+            else:
+                user_id = (await session.execute(_INSERT_USER, user_params)).scalar_one()
+                # Create initial planet for the user (default location)
+                await session.execute(_INSERT_STARTER_PLANET, {"planet_name": STARTER_PLANET_NAME, "owner_id": user_id})
+        except IntegrityError:
+            # Lost a race with a concurrent registration for the same name/email
+            await session.rollback()
+            raise HTTPException(status_code=400, detail="Username or email already taken")
 
         await session.commit()
-        user_id = user.id
 
         # Ensure ECS Player is created/loaded for the new user (when auto-start is allowed)
         if not REQUIRE_START_CHOICE:
@@ -140,7 +279,8 @@ async def register(payload: RegisterRequest, session: Optional[AsyncSession] = D
     else:
         # In-memory registration fallback
         if mem_get_user_by_username(payload.username) is not None:
-            raise HTTPException(status_code=400, detail="Username already taken")
+            raise _UsernameTaken()
+        pwd_hash = await _hash_new_password(payload.password)
         mem_user = mem_create_user(payload.username, payload.email, pwd_hash)
         mem_user.last_login = None
         user_id = mem_user.id
@@ -158,92 +298,123 @@ async def register(payload: RegisterRequest, session: Optional[AsyncSession] = D
                         game_world.world.delete_entity(ent)
                     except Exception:
                         pass
+                game_world.user_index.pop(user_id, None)
+                if to_delete:
+                    # Their planets may have been elsewhere
+                    game_world.invalidate_planet_occupancy()
             except Exception:
                 pass
             try:
-                game_world.world.create_entity(
-                    Player(name=payload.username, user_id=user_id),
-                    Position(),
-                    Resources(metal=100000, crystal=100000, deuterium=100000),
-                    ResourceProduction(),
-                    Buildings(shipyard=1),
-                    BuildQueue(),
-                    ShipBuildQueue(),
-                    Fleet(),
-                    Research(),
-                    ResearchQueue(),
-                    PlanetComp(name=STARTER_PLANET_NAME, owner_id=user_id),
-                )
+                game_world.user_index[user_id] = game_world.world.create_entity(*_starter_components(payload.username, user_id, STARTER_PLANET_NAME))
             except Exception:
                 pass
 
-    return {"id": user_id, "username": payload.username, "email": payload.email}
+    # Ids can be reused (in-memory store resets), so never inherit a cached planet flag
+    forget_user_has_planet(user_id)
+    if not REQUIRE_START_CHOICE:
+        # A starter planet (and entity) was just created at the default location
+        game_world.record_planet_occupied(1, 1, 1)
+    return user_id
 
 
-@router.post("/login", response_model=TokenResponse)
-async def login(payload: LoginRequest, session: Optional[AsyncSession] = Depends(get_optional_async_session)):
+async def _authenticate(payload: LoginRequest, session: Optional[AsyncSession]) -> int:
+    """Verify credentials, record the login and return the user id (401 on failure)."""
     if is_db_enabled() and session is not None:
-        result = await session.execute(select(ORMUser).where(ORMUser.username == payload.username))
-        user = result.scalar_one_or_none()
+        # Only the columns the check needs; no ORM identity-map round trip
+        user = (await session.execute(_SELECT_LOGIN_USER, {"username": payload.username})).first()
         if user is None or not user.is_active:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
         try:
-            if not user.password_hash or not verify_password(payload.password, user.password_hash):
+            if not user.password_hash or not await verify_password_async(payload.password, user.password_hash):
                 raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
         except HTTPException:
             raise
         except Exception:
             raise HTTPException(status_code=500, detail="Password verification unavailable")
 
-        user.last_login = datetime.utcnow()
-        await session.commit()
+        # Written by the next batched flush instead of an UPDATE + commit per login
+        record_last_login(user.id, utc_now())
         user_id = user.id
+        if password_needs_rehash(user.password_hash):
+            # One-time migration of a deprecated (e.g. bcrypt) hash; best-effort
+            try:
+                new_hash = await hash_password_async(payload.password)
+                await session.execute(_UPDATE_PASSWORD_HASH, {"user_id": user_id, "new_hash": new_hash})
+                await session.commit()
+            except Exception:
+                pass
     else:
         mem_user = mem_get_user_by_username(payload.username)
-        if mem_user is None or mem_user.password_hash is None or not verify_password(payload.password, mem_user.password_hash):
+        if mem_user is None or mem_user.password_hash is None or not await verify_password_async(payload.password, mem_user.password_hash):
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
         mem_user.last_login = datetime.now(timezone.utc)
         user_id = mem_user.id
+        if password_needs_rehash(mem_user.password_hash):
+            mem_user.password_hash = await hash_password_async(payload.password)
+    return user_id
 
+
+def _issue_token(user_id: int) -> str:
+    # Hydrate from the DB only on first sight; re-loading an already present player
+    # would redo the DB reads and overwrite newer in-memory state
     try:
-        game_world.load_player_data(user_id)
+        if not game_world.has_player(user_id):
+            game_world.load_player_data(user_id)
     except Exception:
         pass
+    return create_access_token(subject=str(user_id))
 
-    token = create_access_token(subject=str(user_id))
-    return TokenResponse(access_token=token)
 
+@router.post("/register", response_model=RegisterResponse)
+async def register(payload: RegisterRequest, session: Optional[AsyncSession] = Depends(get_optional_async_session)):
+    user_id = await _create_user(payload, session)
+    return {"id": user_id, "username": payload.username, "email": payload.email}
+
+
+@router.post("/login", response_model=TokenResponse)
+async def login(payload: LoginRequest, session: Optional[AsyncSession] = Depends(get_optional_async_session)):
+    user_id = await _authenticate(payload, session)
+    return TokenResponse(access_token=_issue_token(user_id))
+
+
+@router.post("/bootstrap", response_model=BootstrapResponse)
+async def bootstrap(payload: RegisterRequest, session: Optional[AsyncSession] = Depends(get_optional_async_session)):
+    """Register-or-login in a single round-trip, returning the user id and a token.
 
-@router.get("/me")
+    A taken username falls through to a password check, so clients (e.g. the
+    Locust load test) can call this unconditionally on start-up.
+    """
+    try:
+        user_id = await _create_user(payload, session)
+    except _UsernameTaken:
+        user_id = await _authenticate(LoginRequest(username=payload.username, password=payload.password), session)
+    return BootstrapResponse(id=user_id, access_token=_issue_token(user_id))
+
+
+@router.get("/me", response_model=MeResponse)
 async def me(current_user: ORMUser = Depends(get_current_user), session: Optional[AsyncSession] = Depends(get_optional_async_session)):
     # Determine whether the user still needs to choose a starting location
     needs_start_choice = False
-    try:
-        from src.core.config import REQUIRE_START_CHOICE
-    except Exception:
-        REQUIRE_START_CHOICE = False
-
-    if REQUIRE_START_CHOICE:
+    if _config.REQUIRE_START_CHOICE and not user_has_planet_cached(current_user.id):
         if is_db_enabled() and session is not None:
             try:
-                from src.models.database import Planet as ORMPlanet
-                result = await session.execute(select(ORMPlanet.id).where(ORMPlanet.owner_id == current_user.id))
-                needs_start_choice = result.first() is None
+                has_planet = await session.scalar(_SELECT_HAS_PLANET, {"owner_id": current_user.id})
+                needs_start_choice = not has_planet
             except Exception:
                 needs_start_choice = True
         else:
             # ECS-only check: verify user has an entity with Position component
             try:
-                from src.core.state import game_world as _gw
-                from src.models import Player as _P, Position as _Pos
-                has_pos = False
-                for ent, (p, pos) in _gw.world.get_components(_P, _Pos):
-                    if p.user_id == current_user.id:
-                        has_pos = True
-                        break
-                needs_start_choice = not has_pos
+                ent = game_world.player_entity(current_user.id)
+                if ent is None:
+                    needs_start_choice = True
+                else:
+                    # Raises KeyError (-> needs_start_choice) when Position is missing
+                    game_world.world.component_for_entity(ent, Position)
             except Exception:
                 needs_start_choice = True
+        if not needs_start_choice:
+            remember_user_has_planet(current_user.id)
 
     return {
         "id": current_user.id,
@@ -2,14 +2,27 @@ from __future__ import annotations
 
 from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import Optional, List, Dict, Set, Tuple
-from fastapi import FastAPI, HTTPException, Depends, Query, WebSocket, WebSocketDisconnect, Request
+from typing import Any, Optional, List, Dict, Set, Tuple
+from fastapi import FastAPI, HTTPException, Depends, Query, WebSocket, WebSocketDisconnect, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.exception_handlers import request_validation_exception_handler
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+import json
+import operator
 import logging
 import tracemalloc
 import asyncio
+import random
 import time
+from dataclasses import fields as dc_fields
+try:
+    import orjson as _orjson
+except Exception:  # pragma: no cover - optional accelerator; stdlib json is used instead
+    _orjson = None
 
+from src.core import config as _config
 from src.core.game import GameWorld
 from src.core.config import (
     CORS_ALLOW_ORIGINS,
@@ -20,14 +33,46 @@ from src.core.config import (
     GALAXY_COUNT,
     SYSTEMS_PER_GALAXY,
     POSITIONS_PER_SYSTEM,
+    STARTER_PLANET_NAME,
+    PLANET_SIZE_MIN,
+    PLANET_SIZE_MAX,
+    PLANET_TEMPERATURE_MIN,
+    PLANET_TEMPERATURE_MAX,
+    STARTER_INIT_RESOURCES,
 )
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, or_
-from src.core.database import check_database, init_db, get_optional_async_session, get_optional_readonly_async_session, is_db_enabled, shutdown_db, start_db
-from src.models import Player, Research, ResearchQueue, Fleet, Position as ECSPosition
-from src.models.database import TradeOffer as ORMTradeOffer, TradeEvent as ORMTradeEvent, BattleReport as ORMBattleReport, EspionageReport as ORMEspionageReport
-from src.api.auth import router as auth_router, ensure_player_loaded, ensure_current_user_player_loaded
-from src.auth.security import ensure_user_matches_path, rate_limiter_dependency, get_current_user, decode_token, reset_in_memory_auth_state
+from sqlalchemy import and_, bindparam, delete, desc, exists, func, literal, select, or_, tuple_
+from src.core.database import check_database, init_db, get_optional_async_session, get_optional_readonly_async_session, is_db_enabled, shutdown_db, start_db, warm_pool
+from src.models import (
+    Player,
+    Research,
+    ResearchQueue,
+    Fleet,
+    Position as ECSPosition,
+    Buildings,
+    BuildQueue,
+    ShipBuildQueue,
+    FleetMovement,
+    Resources,
+    ResourceProduction,
+    Planet as ECSPlanet,
+)
+from src.models.database import (
+    TradeOffer as ORMTradeOffer,
+    TradeEvent as ORMTradeEvent,
+    BattleReport as ORMBattleReport,
+    EspionageReport as ORMEspionageReport,
+    Planet as ORMPlanet,
+    User as ORMUser,
+    Notification as ORMNotification,
+)
+from src.api.auth import router as auth_router, ensure_player_loaded, ensure_current_user_player_loaded, register_validation_detail
+from src.auth.security import ensure_user_matches_path, rate_limiter_dependency, get_current_user, decode_token_cached, reset_in_memory_auth_state, warm_password_hashing
+from src.core.trade_events import list_trade_history, publish_trade_event, record_trade_event, TradeEventPayload
+from src.core.notifications import get_in_memory_notifications
+from src.systems.planet_creation import seeded_pool_ready, list_available_from_seed
+from src.systems.resource_production import energy_balance
+from src.api.ws import encode_message
 from src.core.sync import fetch_battle_reports_for_user, fetch_battle_report_for_user, fetch_espionage_reports_for_user, fetch_espionage_report_for_user
 
 logger = logging.getLogger(__name__)
@@ -41,13 +86,32 @@ except Exception:
 # Global game world instance (shared singleton)
 from src.core.state import game_world  # reuse the shared GameWorld instance
 
+# Ship counts of a Fleet component in one C-level call (used for fleet-size caps)
+_FLEET_SHIP_COUNTS = operator.attrgetter(*(fld.name for fld in dc_fields(Fleet)))
+
+# server_time string shared by WS pongs/welcomes and status endpoints; formatted at
+# most once per _ISO_CLOCK_SECONDS rather than once per message
+_ISO_CLOCK_SECONDS = 0.1
+_iso_clock: Tuple[float, str] = (float("-inf"), "")
+
+
+def _iso_now() -> str:
+    global _iso_clock
+    now = time.monotonic()
+    if now - _iso_clock[0] >= _ISO_CLOCK_SECONDS:
+        _iso_clock = (now, datetime.now().isoformat())
+    return _iso_clock[1]
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """FastAPI lifespan context: starts/stops the background game loop and ensures DB schema."""
+    # Load the password hashing backend in the background before the first login
+    warm_password_hashing()
     # Initialize database engines within this event loop, then ensure schema (dev)
     try:
         await start_db()
+        await warm_pool()
     except Exception:
         pass
     # Optionally initialize schema in dev mode
@@ -57,6 +121,13 @@ async def lifespan(app: FastAPI):
             await init_db()
     except Exception:
         pass
+    # Start each app lifespan without a status snapshot (or a lock bound to the loop) from a previous one
+    global _game_status_cache, _game_status_lock, _metrics_cache, _planet_occupancy_lock
+    _game_status_cache = None
+    _game_status_lock = asyncio.Lock()
+    _metrics_cache = None
+    _planet_occupancy_lock = asyncio.Lock()
+    game_world.invalidate_planet_occupancy()
     # Reset in-memory auth state when DB is disabled (helps test isolation)
     try:
         if not is_db_enabled():
@@ -121,6 +192,12 @@ async def lifespan(app: FastAPI):
     try:
         yield
     finally:
+        # Deliver queued real-time messages before sockets are closed
+        try:
+            from src.api.ws import stop as stop_ws_sender
+            await stop_ws_sender()
+        except Exception:
+            pass
         # Attempt to close any active WebSocket connections gracefully
         try:
             manager = globals().get("ws_manager")
@@ -133,6 +210,12 @@ async def lifespan(app: FastAPI):
             game_world.stop_game_loop()
         except Exception:
             pass
+        # Write login timestamps still waiting for their batched flush
+        try:
+            from src.auth.security import flush_last_logins
+            await flush_last_logins()
+        except Exception:
+            pass
         # Dispose database engines within the running loop to avoid cross-loop termination
         try:
             await shutdown_db()
@@ -154,11 +237,29 @@ app.add_middleware(
 # Routers
 app.include_router(auth_router)
 
+
+@app.exception_handler(RequestValidationError)
+async def _validation_error_handler(request: Request, exc: RequestValidationError):
+    # Registration rule violations keep their historical 400 + message contract
+    detail = register_validation_detail(request.url.path, exc.errors())
+    if detail is not None:
+        return JSONResponse(status_code=400, content={"detail": detail})
+    return await request_validation_exception_handler(request, exc)
+
 # Metrics middleware and endpoint
 from src.core.metrics import metrics
 
+# Scrape/probe endpoints are served without recording themselves
+_SKIP_METRICS_PATHS = frozenset({"/metrics", "/healthz", "/healthz/db"})
+
+
 @app.middleware("http")
 async def metrics_middleware(request: Request, call_next):
+    # Raw ASGI scope values: request.url would build and parse a URL object per request
+    scope = request.scope
+    path = scope.get("path", "")
+    if path in _SKIP_METRICS_PATHS:
+        return await call_next(request)
     start = time.perf_counter()
     response = None
     try:
@@ -167,18 +268,47 @@ async def metrics_middleware(request: Request, call_next):
     finally:
         try:
             duration = time.perf_counter() - start
-            route_obj = request.scope.get("route")
-            route_path = getattr(route_obj, "path", request.url.path)
+            route_path = getattr(scope.get("route"), "path", None) or path
             status = getattr(response, "status_code", 500)
-            metrics.record_http(request.method, route_path, status, duration)
+            metrics.record_http(scope.get("method", "GET"), route_path, status, duration)
         except Exception:
             # Never break requests due to metrics errors
             pass
 
 
+# Last serialized /metrics document: (monotonic built_at, JSON bytes)
+_metrics_cache: Optional[tuple[float, bytes]] = None
+
+
 @app.get("/metrics")
 async def get_metrics():
-    return metrics.snapshot()
+    """Return the metrics snapshot, reusing it for METRICS_CACHE_SECONDS across scrapes."""
+    global _metrics_cache
+
+    cached = _metrics_cache
+    now = time.monotonic()
+    # Built synchronously (no await), so concurrent scrapes cannot stampede
+    if cached is None or now - cached[0] >= _config.METRICS_CACHE_SECONDS:
+        snap = metrics.snapshot()
+        body = _orjson.dumps(snap) if _orjson is not None else json.dumps(snap).encode()
+        cached = (now, body)
+        _metrics_cache = cached
+    return Response(content=cached[1], media_type="application/json")
+
+
+# One encoder for both ConnectionManager and the cross-thread sender in src.api.ws
+_encode_ws_message = encode_message
+
+
+def _list_response(payload: dict) -> Response:
+    """Serialize a list endpoint's payload straight to JSON bytes.
+
+    Returning a Response skips FastAPI's jsonable_encoder walk over every row;
+    orjson encodes ints and datetimes natively (naive values keep isoformat's form).
+    """
+    if _orjson is not None:
+        return Response(content=_orjson.dumps(payload), media_type="application/json")
+    return Response(content=json.dumps(jsonable_encoder(payload)).encode(), media_type="application/json")
 
 
 class ConnectionManager:
@@ -189,30 +319,55 @@ class ConnectionManager:
     """
 
     def __init__(self) -> None:
-        self._connections: Dict[int, Set[WebSocket]] = {}
+        # Only touched from the event loop, and never across an await, so no lock.
+        # Per-user tuples are replaced, never mutated, so senders can hold one
+        # across awaits without copying it first.
+        self._connections: Dict[int, Tuple[WebSocket, ...]] = {}
+        # Running total kept in step with _connections (logged on every connect/disconnect)
+        self._count: int = 0
 
     async def connect(self, websocket: WebSocket, user_id: int) -> None:
         await websocket.accept()
-        self._connections.setdefault(user_id, set()).add(websocket)
-        logger.info("ws_connected user_id=%s total=%s", user_id, self.total_connections)
+        conns = self._connections.get(user_id, ())
+        if websocket not in conns:
+            self._connections[user_id] = conns + (websocket,)
+            self._count += 1
+        logger.info("ws_connected user_id=%s total=%s", user_id, self._count)
 
     def disconnect(self, websocket: WebSocket, user_id: int) -> None:
         conns = self._connections.get(user_id)
         if conns and websocket in conns:
-            conns.remove(websocket)
-            if not conns:
+            remaining = tuple(ws for ws in conns if ws is not websocket)
+            self._count -= 1
+            if remaining:
+                self._connections[user_id] = remaining
+            else:
                 self._connections.pop(user_id, None)
-        logger.info("ws_disconnected user_id=%s total=%s", user_id, self.total_connections)
+        logger.info("ws_disconnected user_id=%s total=%s", user_id, self._count)
 
     @property
     def total_connections(self) -> int:
-        return sum(len(v) for v in self._connections.values())
+        return self._count
 
     async def send_to_user(self, user_id: int, message: dict) -> None:
-        for ws in list(self._connections.get(user_id, set())):
-            try:
-                await ws.send_json(message)
-            except Exception:
+        conns = self._connections.get(user_id)
+        if not conns:
+            return
+        await self._send_text(user_id, conns, _encode_ws_message(message))
+
+    async def send_text_to_user(self, user_id: int, text: str) -> None:
+        """Send an already-encoded JSON message to every socket of user_id."""
+        conns = self._connections.get(user_id)
+        if not conns:
+            return
+        await self._send_text(user_id, conns, text)
+
+    async def _send_text(self, user_id: int, sockets: Tuple[WebSocket, ...], text: str) -> None:
+        # Writes overlap, so a user's slowest socket bounds the send, not the sum.
+        # Text frames, as send_json would produce, so clients see no difference.
+        results = await asyncio.gather(*(ws.send_text(text) for ws in sockets), return_exceptions=True)
+        for ws, result in zip(sockets, results):
+            if isinstance(result, Exception):
                 # Drop broken sockets
                 try:
                     await ws.close()
@@ -221,12 +376,16 @@ class ConnectionManager:
                 self.disconnect(ws, user_id)
 
     async def broadcast(self, message: dict) -> None:
-        for user_id in list(self._connections.keys()):
-            await self.send_to_user(user_id, message)
+        # Encoded once for every recipient. gather() unpacks the generator before
+        # any send runs, so iterating the live dict here is safe.
+        text = _encode_ws_message(message)
+        await asyncio.gather(
+            *(self._send_text(user_id, conns, text) for user_id, conns in self._connections.items())
+        )
 
     async def close_all(self) -> None:
         for user_id, conns in list(self._connections.items()):
-            for ws in list(conns):
+            for ws in conns:
                 try:
                     await ws.close(code=1001)
                 except Exception:
@@ -244,6 +403,46 @@ async def root():
     return {"message": "Ogame-like Game Server", "status": "running"}
 
 
+# Replies queued per connection before the reader waits for the writer (backpressure)
+_WS_REPLY_QUEUE_SIZE = 64
+# Consecutive receive failures tolerated before the connection is given up on
+_WS_MAX_RECEIVE_ERRORS = 3
+
+
+def _ws_reply(data: str) -> Dict[str, Any]:
+    """Build the reply for one client text frame."""
+    if data.lower().strip() == "ping":
+        return {"type": "pong", "server_time": _iso_now()}
+    # Unknown message, ignore or echo back as info
+    return {"type": "info", "message": data}
+
+
+async def _ws_reader(websocket: WebSocket, replies: asyncio.Queue) -> None:
+    """Read client frames and queue one reply each; None tells the writer to stop."""
+    errors = 0
+    while errors < _WS_MAX_RECEIVE_ERRORS:
+        try:
+            # iter_text() ends quietly on WebSocketDisconnect
+            async for data in websocket.iter_text():
+                errors = 0
+                await replies.put(_ws_reply(data))
+            break
+        except Exception:
+            # Attempt to continue on non-fatal errors (e.g. a binary frame)
+            errors += 1
+            await replies.put({"type": "error", "message": "invalid message"})
+    await replies.put(None)
+
+
+async def _ws_writer(websocket: WebSocket, replies: asyncio.Queue) -> None:
+    """Send queued replies in order until the reader's None sentinel."""
+    while True:
+        message = await replies.get()
+        if message is None:
+            return
+        await websocket.send_json(message)
+
+
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     """Basic WebSocket endpoint for real-time updates.
@@ -260,7 +459,7 @@ async def websocket_endpoint(websocket: WebSocket):
             pass
         return
     try:
-        payload = decode_token(token)
+        payload = decode_token_cached(token)
         sub = payload.get("sub")
         user_id = int(sub)
     except Exception:
@@ -276,25 +475,18 @@ async def websocket_endpoint(websocket: WebSocket):
         await websocket.send_json({
             "type": "welcome",
             "user_id": user_id,
-            "server_time": datetime.now().isoformat(),
+            "server_time": _iso_now(),
         })
-        # Simple receive loop: handle ping messages
-        while True:
-            try:
-                data = await websocket.receive_text()
-                if data.lower().strip() == "ping":
-                    await websocket.send_json({"type": "pong", "server_time": datetime.now().isoformat()})
-                else:
-                    # Unknown message, ignore or echo back as info
-                    await websocket.send_json({"type": "info", "message": data})
-            except WebSocketDisconnect:
-                break
-            except Exception:
-                # Attempt to continue on non-fatal errors
-                try:
-                    await websocket.send_json({"type": "error", "message": "invalid message"})
-                except Exception:
-                    break
+        # Reading and replying run as separate tasks, so the next frame is read
+        # while the previous reply is still being written
+        replies: asyncio.Queue = asyncio.Queue(maxsize=_WS_REPLY_QUEUE_SIZE)
+        try:
+            async with asyncio.TaskGroup() as tg:
+                tg.create_task(_ws_reader(websocket, replies))
+                tg.create_task(_ws_writer(websocket, replies))
+        except* Exception:
+            # A failed write ends the connection (the group already cancelled the reader)
+            pass
     finally:
         try:
             ws_manager.disconnect(websocket, user_id)
@@ -324,13 +516,11 @@ async def build_building(user_id: int, building_data: dict, user=Depends(ensure_
         'user_id': user_id,
         'building_type': building_type,
     }
-    game_world.queue_command(command)
-
     activity_command = {
         'type': 'update_player_activity',
         'user_id': user_id,
     }
-    game_world.queue_command(activity_command)
+    game_world.queue_commands([command, activity_command])
 
     return {"message": f"Build command queued for {building_type}"}
 
@@ -339,8 +529,10 @@ async def build_building(user_id: int, building_data: dict, user=Depends(ensure_
 async def demolish_building(user_id: int, building_type: str, user=Depends(ensure_user_matches_path), _rl=Depends(rate_limiter_dependency), _pl=Depends(ensure_player_loaded)):
     """Demolish a building one level down, with partial refund and safety checks."""
 
-    game_world.queue_command({'type': 'demolish_building', 'user_id': user_id, 'building_type': building_type})
-    game_world.queue_command({'type': 'update_player_activity', 'user_id': user_id})
+    game_world.queue_commands([
+        {'type': 'demolish_building', 'user_id': user_id, 'building_type': building_type},
+        {'type': 'update_player_activity', 'user_id': user_id},
+    ])
     return {"message": f"Demolition command queued for {building_type}"}
 
 
@@ -348,8 +540,10 @@ async def demolish_building(user_id: int, building_type: str, user=Depends(ensur
 async def cancel_build_queue(user_id: int, index: int, user=Depends(ensure_user_matches_path), _rl=Depends(rate_limiter_dependency), _pl=Depends(ensure_player_loaded)):
     """Cancel a pending build queue item and refund part of the cost."""
 
-    game_world.queue_command({'type': 'cancel_build_queue', 'user_id': user_id, 'index': index})
-    game_world.queue_command({'type': 'update_player_activity', 'user_id': user_id})
+    game_world.queue_commands([
+        {'type': 'cancel_build_queue', 'user_id': user_id, 'index': index},
+        {'type': 'update_player_activity', 'user_id': user_id},
+    ])
     return {"message": f"Cancel command queued for build queue index {index}"}
 
 
@@ -366,13 +560,42 @@ async def get_building_costs(building_type: str, level: int = 0):
     }
 
 
+# Aggregate part of /game-status shared by all callers: (monotonic computed_at, snapshot)
+_game_status_cache: Optional[tuple[float, Dict[str, Any]]] = None
+_game_status_lock = asyncio.Lock()
+
+
 @app.get("/game-status")
 async def get_game_status():
     """Get general game status information.
 
     Extended to include database status and persistence mode to reflect
-    DB-only persistence per docs/cleanup.md.
+    DB-only persistence per docs/cleanup.md. The aggregates (entity count,
+    DB probe, energy summary) are the same for every caller and are reused
+    for GAME_STATUS_CACHE_SECONDS; one request recomputes them at a time.
     """
+    global _game_status_cache
+    ttl = _config.GAME_STATUS_CACHE_SECONDS
+
+    cached = _game_status_cache
+    if cached is None or time.monotonic() - cached[0] >= ttl:
+        async with _game_status_lock:
+            cached = _game_status_cache
+            if cached is None or time.monotonic() - cached[0] >= ttl:
+                cached = (time.monotonic(), await _compute_game_status())
+                _game_status_cache = cached
+    snapshot = cached[1]
+
+    return {
+        "game_running": game_world.running,
+        "total_entities": snapshot["total_entities"],
+        "server_time": _iso_now(),
+        "database": snapshot["database"],
+        "energy": snapshot["energy"],
+    }
+
+
+async def _compute_game_status() -> Dict[str, Any]:
     # Count entities by iterating Player components to avoid relying on private internals
     try:
         seen = set()
@@ -390,55 +613,7 @@ async def get_game_status():
 
     # Compute aggregate energy status across loaded planets (best-effort)
     try:
-        from src.models import Buildings as _Bld
-        from src.core.config import (
-            ENERGY_SOLAR_BASE as _E_BASE,
-            ENERGY_SOLAR_GROWTH as _E_GROWTH,
-            ENERGY_CONSUMPTION as _E_CONS,
-            ENERGY_CONSUMPTION_GROWTH as _E_CONS_GROWTH,
-            ENERGY_TECH_ENERGY_BONUS_PER_LEVEL as _E_BONUS,
-            ENERGY_DEFICIT_SOFT_FLOOR as _SOFT_FLOOR,
-        )
-        deficit_count = 0
-        total_planets = 0
-        min_factor = None
-        getter = getattr(game_world.world, "get_components", None)
-        if getter is None:
-            getter = game_world.world.get_components
-        for ent, (player, buildings) in getter(Player, _Bld):
-            total_planets += 1
-            # compute energy bonus via research if present
-            try:
-                research = game_world.world.component_for_entity(ent, Research)
-                energy_lvl = int(getattr(research, 'energy', 0))
-            except Exception:
-                energy_lvl = 0
-            bonus = 1.0 + (_E_BONUS * energy_lvl)
-            sp_lvl = max(0, int(getattr(buildings, 'solar_plant', 0)))
-            produced = (_E_BASE * sp_lvl * (_E_GROWTH ** max(0, sp_lvl - 1))) * bonus
-            def _cons(_base: float, _lvl: int) -> float:
-                _lvl = max(0, int(_lvl))
-                return _base * _lvl * (_E_CONS_GROWTH ** max(0, _lvl - 1))
-            required = 0.0
-            required += _cons(_E_CONS.get('metal_mine', 0.0), getattr(buildings, 'metal_mine', 0))
-            required += _cons(_E_CONS.get('crystal_mine', 0.0), getattr(buildings, 'crystal_mine', 0))
-            required += _cons(_E_CONS.get('deuterium_synthesizer', 0.0), getattr(buildings, 'deuterium_synthesizer', 0))
-            if required <= 0:
-                factor_raw = 1.0
-            elif produced <= 0:
-                factor_raw = 0.0
-            else:
-                factor_raw = min(1.0, produced / required)
-            if factor_raw < 1.0:
-                deficit_count += 1
-            if min_factor is None or factor_raw < min_factor:
-                min_factor = float(factor_raw)
-        energy_summary = {
-            "deficit_planets": int(deficit_count),
-            "total_planets": int(total_planets),
-            "min_factor": float(min_factor) if min_factor is not None else None,
-            "soft_floor": float(_SOFT_FLOOR),
-        }
+        energy_summary = _energy_summary()
     except Exception:
         energy_summary = {
             "deficit_planets": 0,
@@ -448,42 +623,82 @@ async def get_game_status():
         }
 
     return {
-        "game_running": game_world.running,
         "total_entities": total_entities,
-        "server_time": datetime.now().isoformat(),
         "database": {"status": "ok" if db_ok else "fail", "persistence": "db_only"},
         "energy": energy_summary,
     }
 
 
+def _energy_summary() -> Dict[str, Any]:
+    """Aggregate energy balance over every loaded (Player, Buildings) entity.
+
+    Works a whole archetype at a time: Research levels come from the same column
+    snapshot as Buildings (entities without Research count as level 0), and each
+    planet's factor comes from resource_production.energy_balance, the formula
+    the production tick applies.
+    """
+    world = game_world.world
+    columns = getattr(world, "get_columns", None)
+    if columns is not None:
+        batches = []
+        with_research: Set[int] = set()
+        for ents, (_players, bld_col, res_col) in columns(Player, Buildings, Research):
+            with_research.update(ents)
+            batches.append((bld_col, [int(getattr(r, 'energy', 0)) for r in res_col]))
+        for ents, (_players, bld_col) in columns(Player, Buildings):
+            rest = [b for ent, b in zip(ents, bld_col) if ent not in with_research]
+            if rest:
+                batches.append((rest, [0] * len(rest)))
+    else:
+        rows = [(bld, world.try_component(ent, Research)) for ent, (_player, bld) in world.get_components(Player, Buildings)]
+        batches = [([b for b, _r in rows], [int(getattr(r, 'energy', 0)) for _b, r in rows])] if rows else []
+
+    deficit_count = 0
+    total_planets = 0
+    min_factor = None
+    for bld_col, energy_lvls in batches:
+        total_planets += len(bld_col)
+        factors = [energy_balance(b, en)[2] for b, en in zip(bld_col, energy_lvls)]
+        deficit_count += sum(1 for f in factors if f < 1.0)
+        if factors:
+            lowest = min(factors)
+            if min_factor is None or lowest < min_factor:
+                min_factor = float(lowest)
+    return {
+        "deficit_planets": int(deficit_count),
+        "total_planets": int(total_planets),
+        "min_factor": float(min_factor) if min_factor is not None else None,
+        "soft_floor": float(_config.ENERGY_DEFICIT_SOFT_FLOOR),
+    }
+
+
 @app.get("/player/{user_id}/research")
 async def get_player_research(user_id: int, user=Depends(ensure_user_matches_path), _rl=Depends(rate_limiter_dependency), _pl=Depends(ensure_player_loaded)):
     """Return current research levels and research queue for the player."""
     # Player presence ensured by dependency
 
     # Find the player's research components
-    for ent, (player, research, rq) in game_world.world.get_components(Player, Research, ResearchQueue):
-        if player.user_id != user_id:
-            continue
-        return {
-            "research": {
-                "energy": research.energy,
-                "laser": research.laser,
-                "ion": research.ion,
-                "hyperspace": research.hyperspace,
-                "plasma": research.plasma,
-            },
-            "queue": [
-                {
-                    "type": item.get("type"),
-                    "completion_time": item.get("completion_time").isoformat() if item.get("completion_time") else None,
-                    "cost": item.get("cost", {}),
-                }
-                for item in rq.items
-            ],
-        }
-
-    raise HTTPException(status_code=404, detail="Player not found")
+    found = game_world.player_components(user_id, Research, ResearchQueue)
+    if found is None:
+        raise HTTPException(status_code=404, detail="Player not found")
+    _ent, (research, rq) = found
+    return {
+        "research": {
+            "energy": research.energy,
+            "laser": research.laser,
+            "ion": research.ion,
+            "hyperspace": research.hyperspace,
+            "plasma": research.plasma,
+        },
+        "queue": [
+            {
+                "type": item.get("type"),
+                "completion_time": item.get("completion_time").isoformat() if item.get("completion_time") else None,
+                "cost": item.get("cost", {}),
+            }
+            for item in rq.items
+        ],
+    }
 
 
 @app.post("/player/{user_id}/research")
@@ -498,25 +713,32 @@ async def start_research(user_id: int, payload: dict, user=Depends(ensure_user_m
     if research_type not in valid_types:
         raise HTTPException(status_code=400, detail="Invalid research_type")
 
-    game_world.queue_command({
-        "type": "start_research",
-        "user_id": user_id,
-        "research_type": research_type,
-    })
-    game_world.queue_command({
-        "type": "update_player_activity",
-        "user_id": user_id,
-    })
+    game_world.queue_commands([
+        {
+            "type": "start_research",
+            "user_id": user_id,
+            "research_type": research_type,
+        },
+        {
+            "type": "update_player_activity",
+            "user_id": user_id,
+        },
+    ])
 
     return {"message": f"Research command queued for {research_type}"}
 
 
+# (last_save_ts, iso string) so probes only reformat after a new save lands
+_last_save_iso_cache: Tuple[float, str] = (0.0, "")
+
+
 @app.get("/healthz")
 async def healthz():
     """Health check endpoint providing basic service metrics.
 
     Adds flags required by docs/tasks.md task 21: worldLoaded, lastSaveTs, and last tick metrics.
     """
+    global _last_save_iso_cache
     try:
         current, peak = tracemalloc.get_traced_memory()
     except Exception:
@@ -538,12 +760,12 @@ async def healthz():
 
     # Last save timestamp in ISO if available
     try:
-        import time as _t
         last_save_ts = getattr(game_world, "_last_save_ts", 0.0)
         last_save_iso = None
         if last_save_ts and last_save_ts > 0:
-            from datetime import datetime as _dt
-            last_save_iso = _dt.fromtimestamp(last_save_ts).isoformat()
+            if last_save_ts != _last_save_iso_cache[0]:
+                _last_save_iso_cache = (last_save_ts, datetime.fromtimestamp(last_save_ts).isoformat())
+            last_save_iso = _last_save_iso_cache[1]
     except Exception:
         last_save_iso = None
 
@@ -553,7 +775,7 @@ async def healthz():
         "loop": {
             "running": game_world.running,
             "tick_rate": TICK_RATE,
-            "queue_depth": game_world.command_queue.qsize(),
+            "queue_depth": game_world.pending_count,
             "ticks": ticks,
             "last_tick_ms": last_tick_ms,
             "jitter_last_ms": jitter_last_ms,
@@ -564,7 +786,7 @@ async def healthz():
         },
         "database": {"status": "ok" if db_ok else "fail", "persistence": "db_only"},
         "lastSaveTs": last_save_iso,
-        "server_time": datetime.now().isoformat(),
+        "server_time": _iso_now(),
     }
 
 
@@ -573,19 +795,18 @@ async def healthz():
 async def get_player_fleet(user_id: int, user=Depends(ensure_user_matches_path), _rl=Depends(rate_limiter_dependency), _pl=Depends(ensure_player_loaded)):
     """Get the player's current fleet and ship build queue.
 
-    To improve determinism in tests, this endpoint will opportunistically
-    advance the ECS world one tick before reading data. This allows
-    ship builds that have reached their completion time to be applied
-    immediately when queried.
+    With SETTLE_WORLD_ON_READ enabled (test determinism), the ECS world is
+    advanced before reading so completions that are already due show up
+    immediately instead of on the game loop's next tick.
     """
-    # Opportunistically progress the world to apply any due completions
-    try:
-        game_world._process_commands()
-        game_world.world.process()
-        # Process twice to settle multi-phase arrivals (e.g., colonization)
-        game_world.world.process()
-    except Exception:
-        pass
+    if _config.SETTLE_WORLD_ON_READ:
+        try:
+            game_world._process_commands()
+            game_world.world.process()
+            # Process twice to settle multi-phase arrivals (e.g., colonization)
+            game_world.world.process()
+        except Exception:
+            pass
 
     data = game_world.get_player_data(user_id)
     if data is None:
@@ -594,19 +815,16 @@ async def get_player_fleet(user_id: int, user=Depends(ensure_user_matches_path),
     # Attempt to read ShipBuildQueue directly for immediacy (helps tests)
     ship_queue_items = []
     try:
-        from src.models import Player as _P, ShipBuildQueue as _SBQ
-        for ent, (p, sbq) in game_world.world.get_components(_P, _SBQ):
-            if p.user_id != user_id:
-                continue
-            if sbq and getattr(sbq, 'items', None):
-                for item in sbq.items:
-                    ship_queue_items.append({
-                        'type': item.get('type'),
-                        'count': int(item.get('count', 1)),
-                        'completion_time': item.get('completion_time').isoformat() if item.get('completion_time') else None,
-                        'cost': item.get('cost'),
-                    })
-            break
+        found = game_world.player_components(user_id, ShipBuildQueue)
+        sbq = found[1][0] if found is not None else None
+        if sbq and getattr(sbq, 'items', None):
+            for item in sbq.items:
+                ship_queue_items.append({
+                    'type': item.get('type'),
+                    'count': int(item.get('count', 1)),
+                    'completion_time': item.get('completion_time').isoformat() if item.get('completion_time') else None,
+                    'cost': item.get('cost'),
+                })
     except Exception:
         pass
 
@@ -636,16 +854,6 @@ async def build_ships(user_id: int, payload: dict, user=Depends(ensure_user_matc
 
     # Opportunistically compute validation against current ECS state for immediate errors
     try:
-        # Progress world to settle any completions first
-        game_world._process_commands()
-        game_world.world.process()
-    except Exception:
-        pass
-
-    try:
-        from dataclasses import fields as _fields
-        from src.models import Player as _P, Buildings as _B, ShipBuildQueue as _SBQ, Fleet as _F, Research as _R
-        from src.core.config import SHIPYARD_QUEUE_BASE_LIMIT, SHIPYARD_QUEUE_PER_LEVEL, BASE_MAX_FLEET_SIZE, FLEET_SIZE_PER_COMPUTER_LEVEL
         # Find the player's current entity
         ent = None
         shipyard_level = 0
@@ -653,22 +861,18 @@ async def build_ships(user_id: int, payload: dict, user=Depends(ensure_user_matc
         total_current = 0
         comp_lvl = 0
         sbq = None
-        for e, (p, b, f) in game_world.world.get_components(_P, _B, _F):
-            if p.user_id != user_id:
-                continue
+        found = game_world.player_components(user_id, Buildings, Fleet)
+        if found is not None:
+            e, (b, f) = found
             ent = e
             shipyard_level = int(getattr(b, 'shipyard', 0))
             # queue length
-            try:
-                sbq = game_world.world.component_for_entity(e, _SBQ)
-                if sbq and getattr(sbq, 'items', None):
-                    queue_len = len(sbq.items)
-            except Exception:
-                queue_len = 0
+            sbq = game_world.world.try_component(e, ShipBuildQueue)
+            if sbq and getattr(sbq, 'items', None):
+                queue_len = len(sbq.items)
             # current fleet sum
             try:
-                for fld in _fields(_F):
-                    total_current += int(getattr(f, fld.name, 0))
+                total_current += sum(map(int, _FLEET_SHIP_COUNTS(f)))
             except Exception:
                 pass
             # add queued counts as part of cap check
@@ -679,17 +883,13 @@ async def build_ships(user_id: int, payload: dict, user=Depends(ensure_user_matc
                     except Exception:
                         pass
             # computer tech level
-            try:
-                r = game_world.world.component_for_entity(e, _R)
-                comp_lvl = int(getattr(r, 'computer', 0)) if r is not None else 0
-            except Exception:
-                comp_lvl = 0
-            break
+            r = game_world.world.try_component(e, Research)
+            comp_lvl = int(getattr(r, 'computer', 0)) if r is not None else 0
         if ent is not None:
-            queue_limit = int(SHIPYARD_QUEUE_BASE_LIMIT) + int(SHIPYARD_QUEUE_PER_LEVEL) * max(0, shipyard_level)
+            queue_limit = int(_config.SHIPYARD_QUEUE_BASE_LIMIT) + int(_config.SHIPYARD_QUEUE_PER_LEVEL) * max(0, shipyard_level)
             if queue_len >= queue_limit:
                 raise HTTPException(status_code=400, detail="Shipyard queue full")
-            max_allowed = int(BASE_MAX_FLEET_SIZE) + int(FLEET_SIZE_PER_COMPUTER_LEVEL) * max(0, comp_lvl)
+            max_allowed = int(_config.BASE_MAX_FLEET_SIZE) + int(_config.FLEET_SIZE_PER_COMPUTER_LEVEL) * max(0, comp_lvl)
             if total_current + quantity > max_allowed:
                 raise HTTPException(status_code=400, detail="Fleet size cap exceeded")
     except HTTPException:
@@ -698,7 +898,9 @@ async def build_ships(user_id: int, payload: dict, user=Depends(ensure_user_matc
         # Best effort only; fall through to command path
         pass
 
-    game_world.queue_command({
+    # Applied now so the queue is visible to the next GET; only the activity
+    # touch waits for the game loop
+    game_world.apply_command({
         'type': 'build_ships',
         'user_id': user_id,
         'ship_type': ship_type,
@@ -706,12 +908,6 @@ async def build_ships(user_id: int, payload: dict, user=Depends(ensure_user_matc
     })
     game_world.queue_command({'type': 'update_player_activity', 'user_id': user_id})
 
-    # Process immediately to make queue visible in subsequent GET during tests
-    try:
-        game_world._process_commands()
-    except Exception:
-        pass
-
     return {"message": f"Ship build queued: {ship_type} x{quantity}"}
 
 
@@ -753,7 +949,8 @@ async def dispatch_fleet(user_id: int, payload: dict, user=Depends(ensure_user_m
     if ships is not None and not isinstance(ships, dict):
         raise HTTPException(status_code=400, detail="ships must be an object mapping ship_type to count")
 
-    game_world.queue_command({
+    # Applied now so the movement is visible to the next GET
+    game_world.apply_command({
         'type': 'fleet_dispatch',
         'user_id': user_id,
         'galaxy': galaxy,
@@ -765,12 +962,6 @@ async def dispatch_fleet(user_id: int, payload: dict, user=Depends(ensure_user_m
     })
     game_world.queue_command({'type': 'update_player_activity', 'user_id': user_id})
 
-    # Best-effort immediate processing to improve test determinism
-    try:
-        game_world._process_commands()
-    except Exception:
-        pass
-
     return {"message": "Fleet dispatch queued", "target": {"galaxy": galaxy, "system": system, "position": position}, "mission": mission}
 
 
@@ -783,35 +974,27 @@ async def recall_fleet(user_id: int, fleet_id: int, user=Depends(ensure_user_mat
     concurrent fleets is not yet implemented.
     """
 
-    # Enqueue recall command
-    game_world.queue_command({
+    # Applied now: the response reports the resulting recall state
+    game_world.apply_command({
         'type': 'fleet_recall',
         'user_id': user_id,
         'fleet_id': fleet_id,
     })
     game_world.queue_command({'type': 'update_player_activity', 'user_id': user_id})
 
-    # Process immediately for determinism in tests
-    try:
-        game_world._process_commands()
-    except Exception:
-        pass
-
     # Inspect ECS to confirm recall state
     return_eta = None
     recalled = False
     try:
-        from src.models import Player as _P, FleetMovement as _FM
-        for ent, (p, mv) in game_world.world.get_components(_P, _FM):
-            if p.user_id != user_id:
-                continue
+        found = game_world.player_components(user_id, FleetMovement)
+        if found is not None:
+            mv = found[1][0]
             recalled = bool(getattr(mv, 'recalled', False))
             if recalled:
                 try:
                     return_eta = mv.arrival_time.isoformat()
                 except Exception:
                     return_eta = None
-            break
     except Exception:
         pass
 
@@ -823,6 +1006,22 @@ async def recall_fleet(user_id: int, fleet_id: int, user=Depends(ensure_user_mat
 
 
 
+# Listing reads only the serialized columns: plain Row tuples, no ORM instances
+_SELECT_OWNED_PLANETS = select(
+    ORMPlanet.id,
+    ORMPlanet.name,
+    ORMPlanet.galaxy,
+    ORMPlanet.system,
+    ORMPlanet.position,
+    ORMPlanet.metal,
+    ORMPlanet.crystal,
+    ORMPlanet.deuterium,
+    ORMPlanet.temperature,
+    ORMPlanet.size,
+    ORMPlanet.last_update,
+).where(ORMPlanet.owner_id == bindparam("owner_id"))
+
+
 @app.get("/player/{user_id}/planets")
 async def get_player_planets(
     user_id: int,
@@ -839,31 +1038,31 @@ async def get_player_planets(
     data = game_world.get_player_data(user_id)
     if data is None:
         raise HTTPException(status_code=404, detail="Player not found")
+    return _list_response({"planets": await _owned_planets(user_id, session)})
 
+
+async def _owned_planets(user_id: int, session: Optional[AsyncSession]) -> List[Dict]:
+    """Planets owned by user_id from the DB, else the player's current ECS planet."""
     planets: List[Dict] = []
 
     # Prefer database listing when available
     try:
         if is_db_enabled() and session is not None:
-            from sqlalchemy import select
-            from src.models.database import Planet as ORMPlanet
-            result = await session.execute(select(ORMPlanet).where(ORMPlanet.owner_id == user_id))  # type: ignore[assignment]
-            for row in result.scalars():
-                planets.append({
-                    "id": int(row.id),
-                    "name": row.name,
-                    "galaxy": int(row.galaxy),
-                    "system": int(row.system),
-                    "position": int(row.position),
-                    "resources": {
-                        "metal": int(row.metal),
-                        "crystal": int(row.crystal),
-                        "deuterium": int(row.deuterium),
-                    },
-                    "temperature": int(row.temperature),
-                    "size": int(row.size),
-                    "last_update": row.last_update.isoformat() if getattr(row, "last_update", None) else None,
-                })
+            result = await session.execute(_SELECT_OWNED_PLANETS, {"owner_id": user_id})  # type: ignore[assignment]
+            planets = [
+                {
+                    "id": pid,
+                    "name": name,
+                    "galaxy": g,
+                    "system": s,
+                    "position": p,
+                    "resources": {"metal": metal, "crystal": crystal, "deuterium": deut},
+                    "temperature": temperature,
+                    "size": size,
+                    "last_update": last_update,
+                }
+                for pid, name, g, s, p, metal, crystal, deut, temperature, size, last_update in result.all()
+            ]
     except Exception:
         # Fall back to ECS below
         pass
@@ -871,20 +1070,11 @@ async def get_player_planets(
     if not planets:
         # ECS fallback: return the current planet for this player's entity
         try:
-            from src.models import Resources as _R, Planet as _Planet
-            for ent, (p, pos) in game_world.world.get_components(Player, ECSPosition):
-                if p.user_id != user_id:
-                    continue
-                res = None
-                pc = None
-                try:
-                    res = game_world.world.component_for_entity(ent, _R)
-                except Exception:
-                    pass
-                try:
-                    pc = game_world.world.component_for_entity(ent, _Planet)
-                except Exception:
-                    pass
+            found = game_world.player_components(user_id, ECSPosition)
+            if found is not None:
+                ent, (pos,) = found
+                res = game_world.world.try_component(ent, Resources)
+                pc = game_world.world.try_component(ent, ECSPlanet)
                 planets.append({
                     "name": getattr(pc, "name", "Homeworld"),
                     "galaxy": int(getattr(pos, "galaxy", 1)),
@@ -896,11 +1086,94 @@ async def get_player_planets(
                         "deuterium": int(getattr(res, "deuterium", 0)),
                     },
                 })
-                break
         except Exception:
             pass
 
-    return {"planets": planets}
+    return planets
+
+
+# Whole-table read: streamed through a server-side cursor in yield_per batches
+_SELECT_PLANET_COORDS = select(ORMPlanet.galaxy, ORMPlanet.system, ORMPlanet.position).execution_options(yield_per=1000)
+_planet_occupancy_lock = asyncio.Lock()
+
+
+async def _load_planet_occupancy(session: Optional[AsyncSession]) -> Dict[Tuple[int, int], Set[int]]:
+    """Occupied positions per (galaxy, system): DB planets when available, else ECS players."""
+    by_system: Dict[Tuple[int, int], Set[int]] = {}
+    if is_db_enabled() and session is not None:
+        try:
+            result = await session.stream(_SELECT_PLANET_COORDS)
+            async for g, s, p in result:
+                by_system.setdefault((g, s), set()).add(p)
+        except Exception:
+            # Fall back to ECS if DB path fails
+            by_system = {}
+    if not by_system:
+        # ECS fallback: mark positions used by current ECS players
+        try:
+            for _ent, (_p, pos) in game_world.world.get_components(Player, ECSPosition):
+                by_system.setdefault((int(pos.galaxy), int(pos.system)), set()).add(int(pos.planet))
+        except Exception:
+            pass
+    return by_system
+
+
+async def _planet_occupancy(session: Optional[AsyncSession]) -> Dict[Tuple[int, int], Set[int]]:
+    """Return the cached occupancy index, rebuilding it once it is invalidated or stale."""
+    cached = game_world.planet_occupancy
+    ttl = _config.PLANET_OCCUPANCY_CACHE_SECONDS
+    if cached is not None and time.monotonic() - cached[0] < ttl:
+        return cached[1]
+    async with _planet_occupancy_lock:
+        cached = game_world.planet_occupancy
+        if cached is not None and time.monotonic() - cached[0] < ttl:
+            return cached[1]
+        version = game_world.planet_occupancy_version
+        started = time.monotonic()
+        by_system = await _load_planet_occupancy(session)
+        # Not stored if a planet was created while loading; the next call rebuilds
+        if ttl > 0 and game_world.planet_occupancy_version == version:
+            game_world.planet_occupancy = (started, by_system)
+        return by_system
+
+
+# Seeded-pool pages computed against one occupancy index, keyed by
+# (galaxy, system, limit, offset). The seed never changes once drawn, so the pages
+# stay valid until the index is replaced or a planet is added to it (both bump
+# game_world.planet_occupancy_version).
+_SEED_PAGE_CACHE_MAX_ENTRIES = 256
+_seed_page_cache: Tuple[Optional[Dict[Tuple[int, int], Set[int]]], int, Dict[Tuple[Any, ...], List[Dict[str, int]]]] = (None, -1, {})
+
+
+def _seeded_page(
+    occupied_by_system: Dict[Tuple[int, int], Set[int]],
+    galaxy: Optional[int],
+    system: Optional[int],
+    limit: int,
+    offset: int,
+) -> List[Dict[str, int]]:
+    global _seed_page_cache
+    index, version, pages = _seed_page_cache
+    current_version = game_world.planet_occupancy_version
+    if index is not occupied_by_system or version != current_version:
+        pages = {}
+        _seed_page_cache = (occupied_by_system, current_version, pages)
+    key = (galaxy, system, limit, offset)
+    page = pages.get(key)
+    if page is None:
+        occupied = [
+            (g, s, p)
+            # Copied first: the game thread may add a system to the index meanwhile
+            for (g, s), positions in list(occupied_by_system.items())
+            if (galaxy is None or g == galaxy) and (system is None or s == system)
+            for p in positions
+        ]
+        page = list_available_from_seed(occupied, galaxy=galaxy, system=system, limit=limit, offset=offset)
+        if len(pages) >= _SEED_PAGE_CACHE_MAX_ENTRIES:
+            # Oldest insertion first (dicts keep insertion order)
+            pages.pop(next(iter(pages)), None)
+        pages[key] = page
+    return page
 
 
 @app.get("/planets/available")
@@ -927,81 +1200,62 @@ async def get_available_planets(
     if system is not None and (system < 1 or system > SYSTEMS_PER_GALAXY):
         raise HTTPException(status_code=400, detail=f"system must be in [1, {SYSTEMS_PER_GALAXY}]")
 
-    # Build occupied coordinates set
-    occupied: Set[Tuple[int, int, int]] = set()
-
-    try:
-        if is_db_enabled() and session is not None:
-            # Query existing planets from DB
-            try:
-                from sqlalchemy import select
-                from src.models.database import Planet as ORMPlanet
-                filters = []
-                if galaxy is not None:
-                    filters.append(ORMPlanet.galaxy == galaxy)
-                if system is not None:
-                    filters.append(ORMPlanet.system == system)
-                stmt = select(ORMPlanet.galaxy, ORMPlanet.system, ORMPlanet.position)
-                if filters:
-                    from sqlalchemy import and_  # local import to avoid top-level dependency in disabled envs
-                    stmt = stmt.where(and_(*filters))
-                result = await session.execute(stmt)  # type: ignore[assignment]
-                rows = result.all()
-                for g, s, p in rows:
-                    occupied.add((int(g), int(s), int(p)))
-            except Exception:
-                # Fall back to ECS if DB path fails
-                pass
-        if not occupied:
-            # ECS fallback: mark positions used by current ECS players
-            try:
-                for ent, (p, pos) in game_world.world.get_components(Player, ECSPosition):
-                    occupied.add((int(pos.galaxy), int(pos.system), int(pos.planet)))
-            except Exception:
-                pass
-    except Exception:
-        pass
+    occupied_by_system = await _planet_occupancy(session)
 
     # If a seeded pool exists, use it directly
     try:
-        from src.systems.planet_creation import seeded_pool_ready, list_available_from_seed
         if seeded_pool_ready():
-            seeded_available = list_available_from_seed(occupied, galaxy=galaxy, system=system, limit=limit, offset=offset)
-            return {"available": seeded_available}
+            return _list_response({"available": _seeded_page(occupied_by_system, galaxy, system, limit, offset)})
     except Exception:
         pass
 
-    # Fallback: generate candidates within bounds, honoring filters and pagination
-    candidates: List[Dict[str, int]] = []
-    collected = 0
-    target = offset + limit
+    # Fallback: walk the coordinate lattice in order, honoring filters and pagination.
+    # Whole systems inside the offset are skipped by their free-slot count, so only
+    # the returned page is enumerated position by position.
+    available: List[Dict[str, int]] = []
+    skip = offset
 
     g_start = galaxy if galaxy is not None else 1
     g_end = galaxy if galaxy is not None else GALAXY_COUNT
-    s_start_default = system if system is not None else 1
-    s_end_default = system if system is not None else SYSTEMS_PER_GALAXY
+    s_start = system if system is not None else 1
+    s_end = system if system is not None else SYSTEMS_PER_GALAXY
 
     for g in range(g_start, g_end + 1):
-        s_start = s_start_default
-        s_end = s_end_default
         for s in range(s_start, s_end + 1):
+            taken = occupied_by_system.get((g, s), ())
+            if skip:
+                free = POSITIONS_PER_SYSTEM
+                if taken:
+                    free -= sum(1 for p in taken if 1 <= p <= POSITIONS_PER_SYSTEM)
+                if skip >= free:
+                    skip -= free
+                    continue
             for p in range(1, POSITIONS_PER_SYSTEM + 1):
-                if (g, s, p) in occupied:
+                if p in taken:
                     continue
-                # Collect until offset+limit, then slice later
-                if collected < target:
-                    candidates.append({"galaxy": g, "system": s, "position": p})
-                    collected += 1
-                else:
-                    break
-            if collected >= target:
-                break
-        if collected >= target:
-            break
-
-    # Apply offset and limit
-    available = candidates[offset:offset + limit]
-    return {"available": available}
+                if skip:
+                    skip -= 1
+                    continue
+                available.append({"galaxy": g, "system": s, "position": p})
+                if len(available) >= limit:
+                    return _list_response({"available": available})
+
+    return _list_response({"available": available})
+
+
+# Presence checks only: the DB answers from one index probe, no row is hydrated
+_USER_EXISTS = exists().where(ORMUser.id == bindparam("user_id"))
+_OWNS_PLANET = exists().where(ORMPlanet.owner_id == bindparam("user_id"))
+_IN_SELECTED_SYSTEM = and_(ORMPlanet.galaxy == bindparam("galaxy"), ORMPlanet.system == bindparam("system"))
+_SELECT_USER_EXISTS = select(_USER_EXISTS)
+_SELECT_OWNS_PLANET = select(_OWNS_PLANET)
+_SELECT_SYSTEM_POSITIONS = select(ORMPlanet.position).where(_IN_SELECTED_SYSTEM)
+# PostgreSQL: all three pre-insert checks in one round-trip
+_SELECT_START_CHECKS = select(
+    _USER_EXISTS.label("user_exists"),
+    _OWNS_PLANET.label("owns_planet"),
+    select(func.array_agg(ORMPlanet.position)).where(_IN_SELECTED_SYSTEM).scalar_subquery().label("taken"),
+)
 
 
 # Choose starting location endpoint
@@ -1025,9 +1279,6 @@ async def choose_start(
     - Only allowed if the user currently owns zero planets.
     - Coordinates must be within configured bounds and target position must be unoccupied.
     """
-    # Bounds and defaults
-    from src.core.config import GALAXY_COUNT, SYSTEMS_PER_GALAXY, POSITIONS_PER_SYSTEM, STARTER_PLANET_NAME, PLANET_SIZE_MIN, PLANET_SIZE_MAX, PLANET_TEMPERATURE_MIN, PLANET_TEMPERATURE_MAX, STARTER_INIT_RESOURCES
-
     try:
         galaxy = int(payload.get("galaxy"))
         system = int(payload.get("system"))
@@ -1053,20 +1304,20 @@ async def choose_start(
 
     # If DB is enabled, persist the starter planet there
     if is_db_enabled() and session is not None:
-        from sqlalchemy import select, and_
-        from src.models.database import Planet as ORMPlanet, User as ORMUser
-        # Verify user exists
-        result = await session.execute(select(ORMUser).where(ORMUser.id == user_id))
-        orm_user = result.scalar_one_or_none()
-        if orm_user is None:
+        # User must exist and own zero planets; collect occupied positions in the selected system
+        params = {"user_id": user_id, "galaxy": galaxy, "system": system}
+        if session.bind is not None and session.bind.dialect.name == "postgresql":
+            checks = (await session.execute(_SELECT_START_CHECKS, params)).one()
+            user_exists, owns_planet = checks.user_exists, checks.owns_planet
+            occupied = set(checks.taken or ())
+        else:
+            user_exists = await session.scalar(_SELECT_USER_EXISTS, params)
+            owns_planet = await session.scalar(_SELECT_OWNS_PLANET, params)
+            occupied = set((await session.scalars(_SELECT_SYSTEM_POSITIONS, params)).all())
+        if not user_exists:
             raise HTTPException(status_code=404, detail="User not found")
-        # Ensure user has zero planets
-        result = await session.execute(select(ORMPlanet).where(ORMPlanet.owner_id == user_id))
-        if result.scalars().first() is not None:
+        if owns_planet:
             raise HTTPException(status_code=400, detail="Starter planet already chosen")
-        # Determine occupied positions in selected system
-        q = select(ORMPlanet.position).where(and_(ORMPlanet.galaxy == galaxy, ORMPlanet.system == system))
-        occupied = {int(row[0]) for row in (await session.execute(q)).all()}
         # If position not specified, choose the first free
         if position is None:
             for p in range(1, POSITIONS_PER_SYSTEM + 1):
@@ -1079,9 +1330,8 @@ async def choose_start(
             if int(position) in occupied:
                 raise HTTPException(status_code=409, detail="Selected position is occupied")
         # Create the planet with configured attributes
-        import random as _rnd
-        size = int(_rnd.randint(int(PLANET_SIZE_MIN), int(PLANET_SIZE_MAX)))
-        temperature = int(_rnd.randint(int(PLANET_TEMPERATURE_MIN), int(PLANET_TEMPERATURE_MAX)))
+        size = int(random.randint(int(PLANET_SIZE_MIN), int(PLANET_SIZE_MAX)))
+        temperature = int(random.randint(int(PLANET_TEMPERATURE_MIN), int(PLANET_TEMPERATURE_MAX)))
         planet = ORMPlanet(
             name=str(name), owner_id=int(user_id), galaxy=int(galaxy), system=int(system), position=int(position),
             size=size, temperature=temperature,
@@ -1095,6 +1345,7 @@ async def choose_start(
             pass
         session.add(planet)
         await session.commit()
+        game_world.record_planet_occupied(galaxy, system, position)
         # Load player into ECS from DB to reflect new planet
         try:
             game_world.load_player_data(user_id)
@@ -1108,9 +1359,8 @@ async def choose_start(
     # ECS-only fallback when DB is disabled
     # Ensure user entity does not already have a planet
     try:
-        for ent, (p, pos) in game_world.world.get_components(Player, ECSPosition):
-            if p.user_id == user_id:
-                raise HTTPException(status_code=400, detail="Starter planet already chosen")
+        if game_world.player_components(user_id, ECSPosition) is not None:
+            raise HTTPException(status_code=400, detail="Starter planet already chosen")
     except HTTPException:
         raise
     except Exception:
@@ -1137,26 +1387,26 @@ async def choose_start(
 
     # Create ECS entity for the user at the chosen coordinates
     try:
-        from src.models import Resources as _R, Planet as _Planet, ResourceProduction as _RP, Buildings as _B, BuildQueue as _BQ, ShipBuildQueue as _SBQ, Fleet as _F, Research as _Res, ResearchQueue as _Rq
-        game_world.world.create_entity(
+        game_world.user_index[int(user_id)] = game_world.world.create_entity(
             Player(name=str(getattr(user, 'username', f"User{user_id}")) if hasattr(user, 'username') else f"User{user_id}", user_id=int(user_id)),
             ECSPosition(galaxy=int(galaxy), system=int(system), planet=int(position)),
-            _R(),
-            _RP(),
-            _B(),
-            _BQ(),
-            _SBQ(),
-            _F(),
-            _Res(),
-            _Rq(),
-            _Planet(name=str(name), owner_id=int(user_id)),
+            Resources(),
+            ResourceProduction(),
+            Buildings(),
+            BuildQueue(),
+            ShipBuildQueue(),
+            Fleet(),
+            Research(),
+            ResearchQueue(),
+            ECSPlanet(name=str(name), owner_id=int(user_id)),
         )
     except Exception:
         # Minimal entity if components are unavailable
         try:
-            game_world.world.create_entity(Player(name=f"User{user_id}", user_id=int(user_id)), ECSPosition(galaxy=int(galaxy), system=int(system), planet=int(position)))
+            game_world.user_index[int(user_id)] = game_world.world.create_entity(Player(name=f"User{user_id}", user_id=int(user_id)), ECSPosition(galaxy=int(galaxy), system=int(system), planet=int(position)))
         except Exception:
             pass
+    game_world.record_planet_occupied(galaxy, system, position)
 
     return {"message": "Starter planet created", "planet": {"name": str(name), "galaxy": int(galaxy), "system": int(system), "position": int(position)}}
 
@@ -1210,21 +1460,24 @@ async def list_battle_reports(
 
     Pagination via limit/offset. Returns newest-first ordering.
     """
+    return _list_response({"reports": await _battle_report_list(user_id, limit, offset)})
+
+
+async def _battle_report_list(user_id: int, limit: int, offset: int) -> list:
     # Prefer DB when available via sync helpers
     if is_db_enabled():
         try:
             reports = await fetch_battle_reports_for_user(user_id, limit=limit, offset=offset)
             if reports:
-                return {"reports": reports}
+                return reports
         except Exception:
             pass
 
     # Fallback to in-memory store
     try:
-        reports = game_world.list_battle_reports(user_id, limit=limit, offset=offset)
+        return game_world.list_battle_reports(user_id, limit=limit, offset=offset)
     except Exception:
-        reports = []
-    return {"reports": reports}
+        return []
 
 
 @app.get("/player/{user_id}/battle-reports/{report_id}")
@@ -1269,21 +1522,24 @@ async def list_espionage_reports(
 
     Pagination via limit/offset. Returns newest-first ordering.
     """
+    return _list_response({"reports": await _espionage_report_list(user_id, limit, offset)})
+
+
+async def _espionage_report_list(user_id: int, limit: int, offset: int) -> list:
     # Prefer DB when available via sync helpers
     if is_db_enabled():
         try:
             reports = await fetch_espionage_reports_for_user(user_id, limit=limit, offset=offset)
             if reports is not None:
-                return {"reports": reports}
+                return reports
         except Exception:
             pass
 
     # Fallback to in-memory store
     try:
-        reports = game_world.list_espionage_reports(user_id, limit=limit, offset=offset)
+        return game_world.list_espionage_reports(user_id, limit=limit, offset=offset)
     except Exception:
-        reports = []
-    return {"reports": reports}
+        return []
 
 
 @app.get("/player/{user_id}/espionage-reports/{report_id}")
@@ -1329,18 +1585,54 @@ async def list_trade_history(
 
     Newest-first, paginated via limit/offset.
     """
+    return {"events": await _trade_history_events(user_id, limit, offset, session)}
+
+
+async def _trade_history_events(user_id: int, limit: int, offset: int, session: Optional[AsyncSession]) -> list:
     # Use centralized service (handles DB vs in-memory)
     try:
-        from src.core.trade_events import list_trade_history as _list_trade_history
-        events = await _list_trade_history(user_id=int(user_id), limit=limit, offset=offset, session=session, gw=game_world)
-        return {"events": events}
+        return await list_trade_history(user_id=int(user_id), limit=limit, offset=offset, session=session, gw=game_world)
     except Exception:
         # Fallback to in-memory direct
         try:
-            events = game_world.list_trade_history(user_id, limit=limit, offset=offset)
+            return game_world.list_trade_history(user_id, limit=limit, offset=offset)
         except Exception:
-            events = []
-        return {"events": events}
+            return []
+
+
+@app.get("/player/{user_id}/dashboard")
+async def get_player_dashboard(
+    user_id: int,
+    limit: int = Query(default=10, ge=1, le=200),
+    user=Depends(ensure_user_matches_path),
+    _rl=Depends(rate_limiter_dependency),
+    _pl=Depends(ensure_player_loaded),
+    session: Optional[AsyncSession] = Depends(get_optional_readonly_async_session),
+):
+    """Planets plus the newest battle reports, espionage reports and trade events in one payload.
+
+    Same data as the four list endpoints (first page, up to limit entries each)
+    behind a single auth check and rate-limit token. The report helpers open their
+    own sessions and run concurrently; the planet and trade history queries share
+    the request session, which does not allow concurrent use, so they run in turn.
+    """
+    if not game_world.has_player(user_id):
+        raise HTTPException(status_code=404, detail="Player not found")
+
+    async def on_request_session():
+        return await _owned_planets(user_id, session), await _trade_history_events(user_id, limit, 0, session)
+
+    (planets, trade_history), battle_reports, espionage_reports = await asyncio.gather(
+        on_request_session(),
+        _battle_report_list(user_id, limit, 0),
+        _espionage_report_list(user_id, limit, 0),
+    )
+    return _list_response({
+        "planets": planets,
+        "battle_reports": battle_reports,
+        "espionage_reports": espionage_reports,
+        "trade_history": trade_history,
+    })
 
 @app.post("/trade/offers")
 async def create_trade_offer(
@@ -1396,10 +1688,9 @@ async def create_trade_offer(
                 requested_amount=int(requested_amount),
                 status="open",
             )
+            # No separate flush: the offer id is explicit and trade_events has no FK
+            # to it, so the offer and event rows go out in one flush and one commit
             session.add(orm_offer)
-            await session.flush()
-            # Record event via centralized service (commits the session)
-            from src.core.trade_events import record_trade_event, TradeEventPayload
             payload: TradeEventPayload = {
                 "type": "offer_created",
                 "offer_id": int(oid),
@@ -1411,7 +1702,10 @@ async def create_trade_offer(
                 "requested_amount": int(requested_amount),
                 "status": "open",
             }
-            await record_trade_event(payload, session=session)
+            event = await record_trade_event(payload, session=session, commit=False)
+            await session.commit()
+            # Only announced once both rows are committed
+            publish_trade_event(event)
             created_offer_dict = {
                 "id": int(orm_offer.id),
                 "seller_user_id": int(orm_offer.seller_user_id),
@@ -1425,13 +1719,29 @@ async def create_trade_offer(
     except Exception:
         # Swallow DB errors; fallback response from in-memory
         created_offer_dict = None
+        try:
+            await session.rollback()  # type: ignore[union-attr]
+        except Exception:
+            pass
 
     # Build response from DB if available; otherwise from ECS
     if created_offer_dict is not None:
         return created_offer_dict
-    offers = game_world.list_market_offers(status=None)
-    offer = next((o for o in offers if int(o.get("id", -1)) == int(oid)), None)
-    return offer or {"id": oid}
+    return game_world.get_market_offer(oid) or {"id": oid}
+
+
+_TRADE_OFFER_COLUMNS = (
+    ORMTradeOffer.id,
+    ORMTradeOffer.seller_user_id,
+    ORMTradeOffer.offered_resource,
+    ORMTradeOffer.offered_amount,
+    ORMTradeOffer.requested_resource,
+    ORMTradeOffer.requested_amount,
+    ORMTradeOffer.status,
+    ORMTradeOffer.accepted_by,
+    ORMTradeOffer.created_at,
+    ORMTradeOffer.accepted_at,
+)
 
 
 @app.get("/trade/offers")
@@ -1439,46 +1749,70 @@ async def list_trade_offers(
     status: Optional[str] = Query(default="open"),
     limit: int = Query(default=50, ge=1, le=1000),
     offset: int = Query(default=0, ge=0),
+    before_created_at: Optional[datetime] = Query(default=None),
+    before_id: Optional[int] = Query(default=None, ge=1),
     session: Optional[AsyncSession] = Depends(get_optional_readonly_async_session),
 ):
-    """List marketplace offers. Filter by status ('open', 'accepted', 'cancelled') or None for all."""
+    """List marketplace offers. Filter by status ('open', 'accepted', 'cancelled') or None for all.
+
+    Offers are returned newest first. For deep pages, pass the previous response's
+    next_cursor fields (before_created_at, before_id) instead of a growing offset:
+    the database then seeks straight to the page rather than skipping offset rows.
+    A cursor cannot be combined with a non-zero offset. next_cursor is null when
+    no further offers exist.
+    """
+    if before_created_at is not None and offset:
+        raise HTTPException(status_code=400, detail="offset cannot be combined with before_created_at")
     # Normalize status: allow explicit null via 'all'
     _status = None if status in (None, "all", "*") else str(status)
 
     # Prefer DB for listing
     if is_db_enabled() and session is not None:
         try:
-            stmt = select(ORMTradeOffer)
+            stmt = select(*_TRADE_OFFER_COLUMNS)
             if _status is not None:
                 stmt = stmt.where(ORMTradeOffer.status == _status)
-            stmt = stmt.order_by(ORMTradeOffer.created_at.desc()).offset(int(offset)).limit(int(limit))
-            result = await session.execute(stmt)
-            rows = result.scalars().all()
+            if before_created_at is not None:
+                # Keyset: id breaks ties between offers created in the same instant
+                if before_id is not None:
+                    cursor = tuple_(literal(before_created_at, ORMTradeOffer.created_at.type), literal(before_id, ORMTradeOffer.id.type))
+                    stmt = stmt.where(tuple_(ORMTradeOffer.created_at, ORMTradeOffer.id) < cursor)
+                else:
+                    stmt = stmt.where(ORMTradeOffer.created_at < before_created_at)
+            # One row past the page tells whether another page exists
+            stmt = stmt.order_by(ORMTradeOffer.created_at.desc(), ORMTradeOffer.id.desc()).offset(int(offset)).limit(int(limit) + 1)
+            rows = (await session.execute(stmt)).all()
             offers = [
                 {
-                    "id": int(o.id),
-                    "seller_user_id": int(o.seller_user_id),
-                    "offered_resource": o.offered_resource,
-                    "offered_amount": int(o.offered_amount),
-                    "requested_resource": o.requested_resource,
-                    "requested_amount": int(o.requested_amount),
-                    "status": o.status,
-                    "accepted_by": int(o.accepted_by) if o.accepted_by is not None else None,
-                    "created_at": o.created_at.isoformat() if getattr(o, "created_at", None) else None,
-                    "accepted_at": o.accepted_at.isoformat() if getattr(o, "accepted_at", None) else None,
+                    "id": oid,
+                    "seller_user_id": seller,
+                    "offered_resource": offered_resource,
+                    "offered_amount": offered_amount,
+                    "requested_resource": requested_resource,
+                    "requested_amount": requested_amount,
+                    "status": offer_status,
+                    "accepted_by": accepted_by,
+                    "created_at": created_at,
+                    "accepted_at": accepted_at,
                 }
-                for o in rows
+                for (
+                    oid, seller, offered_resource, offered_amount, requested_resource,
+                    requested_amount, offer_status, accepted_by, created_at, accepted_at,
+                ) in rows[:limit]
             ]
-            return {"offers": offers}
+            next_cursor = None
+            if len(rows) > limit and offers[-1]["created_at"] is not None:
+                next_cursor = {"before_created_at": offers[-1]["created_at"], "before_id": offers[-1]["id"]}
+            return _list_response({"offers": offers, "next_cursor": next_cursor})
         except Exception:
             pass
 
-    # Fallback to in-memory list
+    # Fallback to in-memory list (offset pagination only)
     try:
         offers = game_world.list_market_offers(status=_status, limit=limit, offset=offset)
     except Exception:
         offers = []
-    return {"offers": offers}
+    return _list_response({"offers": offers, "next_cursor": None})
 
 
 @app.post("/trade/accept/{offer_id}")
@@ -1508,10 +1842,8 @@ async def accept_trade_offer(
             if orm_offer is not None and orm_offer.status == "open":
                 orm_offer.status = "accepted"
                 orm_offer.accepted_by = int(user.id)
-                from datetime import datetime as _dt
-                orm_offer.accepted_at = _dt.utcnow()
+                orm_offer.accepted_at = datetime.utcnow()
                 # Record event via centralized service; commit will persist both offer and event
-                from src.core.trade_events import record_trade_event, TradeEventPayload
                 payload: TradeEventPayload = {
                     "type": "trade_completed",
                     "offer_id": int(offer_id),
@@ -1531,11 +1863,24 @@ async def accept_trade_offer(
 
 
 # --- Notifications Endpoints ---
+_NOTIFICATION_COLUMNS = (
+    ORMNotification.id,
+    ORMNotification.user_id,
+    ORMNotification.type,
+    ORMNotification.payload,
+    ORMNotification.priority,
+    ORMNotification.created_at,
+    ORMNotification.read_at,
+)
+
+
 @app.get("/player/{user_id}/notifications")
 async def list_notifications(
     user_id: int,
     limit: int = Query(default=50, ge=1, le=200),
     offset: int = Query(default=0, ge=0),
+    before_created_at: Optional[datetime] = Query(default=None),
+    before_id: Optional[int] = Query(default=None, ge=1),
     user=Depends(ensure_user_matches_path),
     _rl=Depends(rate_limiter_dependency),
     session: Optional[AsyncSession] = Depends(get_optional_readonly_async_session),
@@ -1543,37 +1888,58 @@ async def list_notifications(
     """List notifications for the authenticated user.
 
     Prefers database when enabled; falls back to in-memory notifications otherwise.
-    Newest-first ordering when using DB.
+    Newest-first ordering when using DB. As with /trade/offers, deep pages should
+    pass the previous response's next_cursor fields (before_created_at, before_id)
+    rather than a growing offset, and never together with a non-zero offset;
+    next_cursor is null when no further notifications exist and always null for
+    the in-memory store.
     """
+    if before_created_at is not None and offset:
+        raise HTTPException(status_code=400, detail="offset cannot be combined with before_created_at")
     notifications: List[Dict] = []
+    next_cursor = None
+    db_ok = False
 
     # Database path (preferred)
     try:
         if is_db_enabled() and session is not None:
-            from sqlalchemy import select
-            from sqlalchemy import desc as _desc
-            from src.models.database import Notification as ORMNotification
-            stmt = select(ORMNotification).where(ORMNotification.user_id == user_id).order_by(_desc(ORMNotification.created_at)).offset(offset).limit(limit)
-            result = await session.execute(stmt)  # type: ignore[assignment]
-            for row in result.scalars():
-                notifications.append({
-                    "id": int(row.id),
-                    "user_id": int(row.user_id),
-                    "type": row.type,
-                    "payload": dict(row.payload or {}),
-                    "priority": row.priority,
-                    "created_at": row.created_at.isoformat() if getattr(row, "created_at", None) else None,
-                    "read_at": row.read_at.isoformat() if getattr(row, "read_at", None) else None,
-                })
+            stmt = select(*_NOTIFICATION_COLUMNS).where(ORMNotification.user_id == user_id)
+            if before_created_at is not None:
+                # Keyset: id breaks ties between notifications created in the same instant
+                if before_id is not None:
+                    cursor = tuple_(literal(before_created_at, ORMNotification.created_at.type), literal(before_id, ORMNotification.id.type))
+                    stmt = stmt.where(tuple_(ORMNotification.created_at, ORMNotification.id) < cursor)
+                else:
+                    stmt = stmt.where(ORMNotification.created_at < before_created_at)
+            # One row past the page tells whether another page exists
+            stmt = stmt.order_by(desc(ORMNotification.created_at), desc(ORMNotification.id)).offset(offset).limit(limit + 1)
+            rows = (await session.execute(stmt)).all()
+            # JSON payloads are decoded into fresh dicts per row, so no copy is needed
+            notifications = [
+                {
+                    "id": nid,
+                    "user_id": uid,
+                    "type": ntype,
+                    "payload": payload or {},
+                    "priority": priority,
+                    "created_at": created_at,
+                    "read_at": read_at,
+                }
+                for nid, uid, ntype, payload, priority, created_at, read_at in rows[:limit]
+            ]
+            if len(rows) > limit and notifications[-1]["created_at"] is not None:
+                next_cursor = {"before_created_at": notifications[-1]["created_at"], "before_id": notifications[-1]["id"]}
+            db_ok = True
     except Exception:
         # Fall back to in-memory
         notifications = []
+        next_cursor = None
 
-    # In-memory fallback
-    if not notifications:
+    # In-memory fallback, only when the database was not queried; an empty DB page
+    # is a real result (e.g. the end of keyset pagination)
+    if not db_ok:
         try:
-            from src.core.notifications import get_in_memory_notifications as _get_inmem
-            items = _get_inmem(user_id=user_id, limit=limit, offset=offset)  # type: ignore
+            items = get_in_memory_notifications(user_id=user_id, limit=limit, offset=offset)  # type: ignore
         except Exception:
             items = []
         # items may already contain ISO strings for timestamps
@@ -1591,7 +1957,15 @@ async def list_notifications(
             except Exception:
                 continue
 
-    return {"notifications": notifications}
+    return _list_response({"notifications": notifications, "next_cursor": next_cursor})
+
+
+# Ownership check and delete in one round trip; no row is loaded into the session
+_DELETE_OWN_NOTIFICATION = (
+    delete(ORMNotification)
+    .where(ORMNotification.id == bindparam("notification_id"), ORMNotification.user_id == bindparam("user_id"))
+    .returning(ORMNotification.id)
+)
 
 
 @app.delete("/notifications/{notification_id}")
@@ -1610,13 +1984,11 @@ async def delete_notification(
         raise HTTPException(status_code=404, detail="Notification not found")
 
     try:
-        from sqlalchemy import select
-        from src.models.database import Notification as ORMNotification
-        result = await session.execute(select(ORMNotification).where(ORMNotification.id == int(notification_id)))  # type: ignore[assignment]
-        obj = result.scalar_one_or_none()
-        if obj is None or int(obj.user_id) != int(user.id):
+        result = await session.execute(
+            _DELETE_OWN_NOTIFICATION, {"notification_id": int(notification_id), "user_id": int(user.id)}
+        )  # type: ignore[assignment]
+        if result.scalar_one_or_none() is None:
             raise HTTPException(status_code=404, detail="Notification not found")
-        await session.delete(obj)
         await session.commit()
         return {"deleted": True, "id": int(notification_id)}
     except HTTPException:
@@ -1663,8 +2035,8 @@ async def get_market_guidance():
     the full requested amount. With default configuration, the fee is 0.0.
     """
     try:
-        # Local import to avoid widening global import list
-        from src.core.config import EXCHANGE_RATIOS as _RATIOS, TRADE_TRANSACTION_FEE_RATE as _FEE
+        _RATIOS = _config.EXCHANGE_RATIOS
+        _FEE = _config.TRADE_TRANSACTION_FEE_RATE
         ratios = {
             "metal": float(_RATIOS.get("metal", 3.0)),
             "crystal": float(_RATIOS.get("crystal", 2.0)),
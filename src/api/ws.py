@@ -10,42 +10,127 @@ Design:
 - FastAPI runs on an asyncio event loop. We capture that loop at app startup
   via set_loop() and store it here.
 - Producers (systems, GameWorld) call send_to_user(user_id, payload) from any
-  thread. We schedule the actual coroutine onto the captured loop using
-  asyncio.run_coroutine_threadsafe.
+  thread. Messages are appended to lock-guarded per-user deques; one long-running
+  drain task on the captured loop empties it, so producers never allocate a
+  coroutine or Task per message.
+- The drainer waits BATCH_WINDOW_SECONDS after being woken so that a tick's
+  burst of updates is coalesced: several pending messages for the same user go
+  out as one {"type": "batch", "items": [...]} frame (at most MAX_BATCH_ITEMS
+  each). A lone message is sent unchanged.
+- Each user has a bounded queue (PER_USER_MAX_PENDING). When a slow client or
+  stalled loop lets it fill, the oldest message is dropped (counted as
+  ws.dropped) and the user's next delivery is preceded by
+  {"type": "gap", "from_seq": a, "to_seq": b} naming the lost range.
+- Payloads are JSON-encoded once, in the producer's thread, so the event loop
+  only splices the "seq" key in and joins batch frames from ready-made text.
+  Frames stay text frames, exactly as send_json would produce them.
+- Every message is stamped with a per-user, monotonically increasing "seq" so
+  clients can detect loss and resync. queue_depth(user_id) lets producers of
+  low-priority updates back off while a user's queue is saturated.
 - We lazily import ws_manager from src.api.routes at call time to avoid
   circular imports at module import time.
 
 Payload contract:
 - Each message is a JSON-serializable dict and SHOULD include a 'type' key.
+  A "seq" key is added on delivery.
 - Examples: {"type": "resource_update", ...}, {"type": "building_complete", ...}
 """
 
-from typing import Optional, Dict, Any
+from collections import deque
+from typing import Optional, Dict, Any, Deque, List, Tuple
 import asyncio
 import logging
+import json
+import threading
+try:
+    import orjson as _orjson
+except Exception:  # pragma: no cover - optional accelerator; stdlib json is used instead
+    _orjson = None
+
+from src.core.metrics import metrics
 
 logger = logging.getLogger(__name__)
 
+# Coalescing window after the first pending message, and the per-frame item cap
+BATCH_WINDOW_SECONDS = 0.001
+MAX_BATCH_ITEMS = 64
+# Drop-oldest bound per user; producers of skippable updates back off at LOW_PRIORITY_MAX_DEPTH
+PER_USER_MAX_PENDING = 256
+LOW_PRIORITY_MAX_DEPTH = PER_USER_MAX_PENDING // 2
+
 # Captured asyncio loop used by FastAPI app
 _loop: Optional[asyncio.AbstractEventLoop] = None
+# user_id -> queued (seq, encoded payload), appended by producers on any thread; users
+# are removed when drained, so an empty dict means nothing is pending
+_pending: Dict[int, Deque[Tuple[int, str]]] = {}
+# user_id -> last seq issued (kept across loops so a reconnecting client sees a jump)
+_seq: Dict[int, int] = {}
+# user_id -> first seq lost to drop-oldest since the last delivery
+_gap_from: Dict[int, int] = {}
+_pending_lock = threading.Lock()
+# Set (on the loop) when _pending goes from empty to non-empty
+_wakeup: Optional[asyncio.Event] = None
+_drain_task: Optional[asyncio.Task] = None
+
 
 def set_loop(loop: asyncio.AbstractEventLoop) -> None:
-    """Record the running asyncio loop for thread-safe scheduling."""
-    global _loop
+    """Record the running asyncio loop and start the drain task on it.
+
+    Must be called from within that loop (the app lifespan does so).
+    """
+    global _loop, _wakeup, _drain_task
+    if _drain_task is not None and not _drain_task.done():
+        _drain_task.cancel()
+    with _pending_lock:
+        # Messages queued for a previous loop are not delivered
+        _pending.clear()
+        _gap_from.clear()
     _loop = loop
+    _wakeup = asyncio.Event()
+    _drain_task = loop.create_task(_drain(_wakeup))
     try:
         logger.info("ws_loop_set")
     except Exception:
         pass
 
-async def _send_to_user_async(user_id: int, message: Dict[str, Any]) -> None:
+
+async def stop() -> None:
+    """Deliver whatever is still pending and stop the drain task (app shutdown)."""
+    global _loop, _drain_task
+    task = _drain_task
+    _loop = None
+    _drain_task = None
+    if task is not None and not task.done():
+        task.cancel()
+        try:
+            await task
+        except (asyncio.CancelledError, Exception):
+            pass
+    await _flush()
+
+
+def encode_message(message: Dict[str, Any]) -> str:
+    """Serialize a WebSocket message in the compact form Starlette's send_json uses."""
+    if _orjson is not None:
+        return _orjson.dumps(message, option=_orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(message, separators=(",", ":"), ensure_ascii=False)
+
+
+def _with_seq(seq: int, encoded: str) -> str:
+    # encoded is a JSON object; "seq" is spliced in as its first key
+    if encoded == "{}":
+        return '{"seq":%d}' % seq
+    return '{"seq":%d,%s' % (seq, encoded[1:])
+
+
+async def _send_to_user_async(user_id: int, text: str) -> None:
     # Lazy import to avoid cycles
     try:
         from src.api.routes import ws_manager  # type: ignore
     except Exception:
         return
     try:
-        await ws_manager.send_to_user(int(user_id), dict(message))
+        await ws_manager.send_text_to_user(int(user_id), text)
     except Exception:
         # Avoid raising from background contexts
         try:
@@ -53,6 +138,55 @@ async def _send_to_user_async(user_id: int, message: Dict[str, Any]) -> None:
         except Exception:
             pass
 
+
+async def _send_items(user_id: int, items: List[str]) -> None:
+    for i in range(0, len(items), MAX_BATCH_ITEMS):
+        chunk = items[i:i + MAX_BATCH_ITEMS]
+        text = chunk[0] if len(chunk) == 1 else '{"type":"batch","items":[' + ",".join(chunk) + "]}"
+        await _send_to_user_async(user_id, text)
+
+
+def queue_depth(user_id: int) -> int:
+    """Number of messages waiting to be delivered to user_id."""
+    q = _pending.get(int(user_id))
+    return len(q) if q else 0
+
+
+async def _flush() -> None:
+    """Send everything queued so far, grouped per user in arrival order."""
+    with _pending_lock:
+        if not _pending:
+            return
+        queues = dict(_pending)
+        gaps = dict(_gap_from)
+        _pending.clear()
+        _gap_from.clear()
+    by_user: Dict[int, List[str]] = {}
+    for uid, q in queues.items():
+        items: List[str] = []
+        gap_from = gaps.get(uid)
+        if gap_from is not None:
+            items.append('{"type":"gap","from_seq":%d,"to_seq":%d}' % (gap_from, q[0][0] - 1))
+        items.extend(_with_seq(seq, encoded) for seq, encoded in q)
+        by_user[uid] = items
+    # Users are independent; their sockets are written concurrently
+    await asyncio.gather(*(_send_items(uid, items) for uid, items in by_user.items()))
+
+
+async def _drain(wakeup: asyncio.Event) -> None:
+    while True:
+        await wakeup.wait()
+        wakeup.clear()
+        await asyncio.sleep(BATCH_WINDOW_SECONDS)
+        try:
+            await _flush()
+        except Exception:
+            try:
+                logger.exception("ws_drain_failed")
+            except Exception:
+                pass
+
+
 def send_to_user(user_id: int, message: Dict[str, Any]) -> None:
     """Thread-safe fire-and-forget send to a specific user.
 
@@ -60,27 +194,30 @@ def send_to_user(user_id: int, message: Dict[str, Any]) -> None:
     the message is dropped silently (best-effort semantics).
     """
     loop = _loop
-    if loop is None:
+    wakeup = _wakeup
+    if loop is None or wakeup is None:
         return
     if getattr(loop, "is_closed", None) and loop.is_closed():
         return
     try:
         uid = int(user_id)
-        payload = dict(message)
-        fut = asyncio.run_coroutine_threadsafe(_send_to_user_async(uid, payload), loop)
-        # Add a done callback to swallow/log exceptions from the coroutine
-        def _done_cb(f):
-            try:
-                _ = f.result()
-            except Exception:
-                try:
-                    logger.exception("ws_send_task_failed user_id=%s", uid)
-                except Exception:
-                    pass
-        try:
-            fut.add_done_callback(_done_cb)
-        except Exception:
-            pass
+        # Encoded here, off the event loop and outside the lock
+        encoded = encode_message(message)
+        with _pending_lock:
+            was_empty = not _pending
+            q = _pending.get(uid)
+            if q is None:
+                q = _pending[uid] = deque(maxlen=PER_USER_MAX_PENDING)
+            elif len(q) == PER_USER_MAX_PENDING:
+                # The append below evicts the oldest message
+                _gap_from.setdefault(uid, q[0][0])
+                metrics.increment_event("ws.dropped")
+            seq = _seq.get(uid, 0) + 1
+            _seq[uid] = seq
+            q.append((seq, encoded))
+        # Only the first message of a burst needs to wake the drainer
+        if was_empty:
+            loop.call_soon_threadsafe(wakeup.set)
     except Exception:
         # Do not propagate errors to producers
         try:
@@ -88,4 +225,4 @@ def send_to_user(user_id: int, message: Dict[str, Any]) -> None:
         except Exception:
             pass
 
-__all__ = ["set_loop", "send_to_user"]
+__all__ = ["set_loop", "send_to_user", "stop", "queue_depth"]
@@ -1,7 +1,11 @@
 from __future__ import annotations
 
+import asyncio
+import logging
+import os
 import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, Optional
 
@@ -9,23 +13,74 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from sqlalchemy import select
+from sqlalchemy import bindparam, case, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.core.config import JWT_SECRET, JWT_ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES, RATE_LIMIT_PER_MINUTE
+from src.core.config import (
+    JWT_SECRET,
+    JWT_ALGORITHM,
+    ACCESS_TOKEN_EXPIRE_MINUTES,
+    RATE_LIMIT_PER_MINUTE,
+    ME_CACHE_TTL_SECONDS,
+    AUTH_USER_CACHE_TTL_SECONDS,
+    AUTH_USER_CACHE_MAX_ENTRIES,
+    LAST_LOGIN_FLUSH_SECONDS,
+)
 from src.core.database import get_async_session, get_optional_async_session, is_db_enabled
 from src.models.database import User as ORMUser
 
-# Password hashing context
-_pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+logger = logging.getLogger(__name__)
+
+# Password hashing context. argon2id (argon2-cffi) is used for new hashes when
+# installed; bcrypt hashes keep verifying and are flagged for rehash on login.
+try:
+    import argon2 as _argon2  # noqa: F401
+    _PWD_CONTEXT_KWARGS: Dict[str, Any] = {
+        "schemes": ["argon2", "bcrypt"],
+        "argon2__memory_cost": 19456,
+        "argon2__time_cost": 2,
+        "argon2__parallelism": 1,
+    }
+except Exception:  # pragma: no cover - optional; bcrypt remains the only scheme
+    _PWD_CONTEXT_KWARGS = {"schemes": ["bcrypt"]}
+_pwd_context = CryptContext(deprecated="auto", **_PWD_CONTEXT_KWARGS)
+
+# bcrypt releases the GIL while hashing, so a thread pool sized to the CPU count
+# runs hashes in parallel without blocking the event loop
+_PWD_EXECUTOR = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix="pwd-hash")
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
-# In-memory token blacklist
-_TOKEN_BLACKLIST: set[str] = set()
-
-# Simple in-memory rate limiter: user_id -> (window_start_epoch_sec, count)
-_RATE_LIMIT_STATE: Dict[int, tuple[int, int]] = {}
+# In-memory token blacklist: token -> its exp (epoch seconds). Entries are swept
+# once the token would have expired anyway, at most every _BLACKLIST_SWEEP_SECONDS.
+_TOKEN_BLACKLIST: Dict[str, float] = {}
+_BLACKLIST_SWEEP_SECONDS = 60.0
+_BLACKLIST_NEXT_SWEEP: float = 0.0
+
+# In-memory token-bucket rate limiter: user_id -> [tokens, last refill (monotonic)].
+# Buckets hold up to RATE_LIMIT_PER_MINUTE tokens and refill continuously at that
+# rate, so there is no window boundary at which twice the limit gets through.
+_RATE_LIMIT_STATE: Dict[int, list[float]] = {}
+
+# Verified bearer token -> (monotonic expiry, user). Lets authenticated requests
+# skip the JWT decode and the users SELECT for a short TTL; never outlives the
+# token's own exp and is dropped when the token is blacklisted.
+_TOKEN_USER_CACHE: Dict[str, tuple[float, Any]] = {}
+
+# Verified bearer token -> its claims, reused until the token's own exp so
+# reconnect storms (WebSocket handshakes) skip signature verification
+_DECODED_TOKEN_CACHE: Dict[str, Dict[str, Any]] = {}
+
+# Login timestamps waiting for the next batched UPDATE: user_id -> last_login
+_PENDING_LAST_LOGIN: Dict[int, datetime] = {}
+_LAST_LOGIN_FLUSH_SCHEDULED = False
+# Running flush tasks, strongly referenced until done
+_LAST_LOGIN_FLUSH_TASKS: set[asyncio.Task] = set()
+
+# Users known to own at least one planet: user_id -> monotonic expiry. Only
+# positive results are cached, so a user who just chose a start location is
+# never reported as still needing one.
+_HAS_PLANET_CACHE: Dict[int, float] = {}
 
 # In-memory user store for DB-disabled environments
 class _UserLite:
@@ -55,6 +110,9 @@ def reset_in_memory_auth_state() -> None:
     _MEM_NEXT_ID = 1
     _TOKEN_BLACKLIST.clear()
     _RATE_LIMIT_STATE.clear()
+    _HAS_PLANET_CACHE.clear()
+    _TOKEN_USER_CACHE.clear()
+    _DECODED_TOKEN_CACHE.clear()
 
 
 def mem_create_user(username: str, email: Optional[str], password_hash: Optional[str]) -> _UserLite:
@@ -74,6 +132,69 @@ def mem_get_user_by_id(user_id: int) -> Optional[_UserLite]:
     return _MEM_USERS.get(user_id)
 
 
+def user_has_planet_cached(user_id: int) -> bool:
+    expiry = _HAS_PLANET_CACHE.get(user_id)
+    if expiry is None:
+        return False
+    if expiry < time.monotonic():
+        _HAS_PLANET_CACHE.pop(user_id, None)
+        return False
+    return True
+
+
+def remember_user_has_planet(user_id: int) -> None:
+    if ME_CACHE_TTL_SECONDS > 0:
+        _HAS_PLANET_CACHE[user_id] = time.monotonic() + ME_CACHE_TTL_SECONDS
+
+
+def forget_user_has_planet(user_id: int) -> None:
+    _HAS_PLANET_CACHE.pop(user_id, None)
+
+
+def record_last_login(user_id: int, when: datetime) -> None:
+    """Buffer a login timestamp; a flush LAST_LOGIN_FLUSH_SECONDS later writes the batch.
+
+    Must be called from a coroutine running on the application event loop.
+    """
+    global _LAST_LOGIN_FLUSH_SCHEDULED
+    _PENDING_LAST_LOGIN[int(user_id)] = when
+    if _LAST_LOGIN_FLUSH_SCHEDULED:
+        return
+    loop = asyncio.get_running_loop()
+    loop.call_later(max(0.0, LAST_LOGIN_FLUSH_SECONDS), _start_last_login_flush, loop)
+    _LAST_LOGIN_FLUSH_SCHEDULED = True
+
+
+def _start_last_login_flush(loop: asyncio.AbstractEventLoop) -> None:
+    # The loop only holds weak references to tasks; keep the flush alive until it finishes
+    task = loop.create_task(flush_last_logins())
+    _LAST_LOGIN_FLUSH_TASKS.add(task)
+    task.add_done_callback(_LAST_LOGIN_FLUSH_TASKS.discard)
+
+
+async def flush_last_logins() -> None:
+    """Write all buffered login timestamps with a single UPDATE ... CASE statement."""
+    global _LAST_LOGIN_FLUSH_SCHEDULED
+    _LAST_LOGIN_FLUSH_SCHEDULED = False
+    if not _PENDING_LAST_LOGIN:
+        return
+    pending = dict(_PENDING_LAST_LOGIN)
+    _PENDING_LAST_LOGIN.clear()
+    if not is_db_enabled():
+        return
+    try:
+        from src.core import database as _db
+        async with _db.SessionLocal() as session:  # type: ignore[misc]
+            await session.execute(
+                update(ORMUser)
+                .where(ORMUser.id.in_(list(pending)))
+                .values(last_login=case(pending, value=ORMUser.id))
+            )
+            await session.commit()
+    except Exception as exc:  # pragma: no cover - env dependent
+        logger.warning("last_login_flush_failed users=%s err=%s", len(pending), exc)
+
+
 def hash_password(password: str) -> str:
     # Prefer passlib hashing; fall back to a simple tagged scheme when unavailable
     try:
@@ -92,6 +213,34 @@ def verify_password(password: str, password_hash: str) -> bool:
         return False
 
 
+def password_needs_rehash(password_hash: str) -> bool:
+    """True when password_hash uses a deprecated scheme or outdated parameters."""
+    try:
+        return _pwd_context.needs_update(password_hash)
+    except Exception:
+        return False
+
+
+def warm_password_hashing() -> None:
+    """Load the hashing backend on the password pool so the first login does not pay for it."""
+    try:
+        _PWD_EXECUTOR.submit(hash_password, "warmup")
+    except Exception:
+        pass
+
+
+async def hash_password_async(password: str) -> str:
+    """hash_password run on the password thread pool (for use in async endpoints)."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_PWD_EXECUTOR, hash_password, password)
+
+
+async def verify_password_async(password: str, password_hash: str) -> bool:
+    """verify_password run on the password thread pool (for use in async endpoints)."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_PWD_EXECUTOR, verify_password, password, password_hash)
+
+
 def create_access_token(subject: str, additional_claims: Optional[Dict[str, Any]] = None, expires_minutes: Optional[int] = None) -> str:
     expire_delta = expires_minutes if expires_minutes is not None else ACCESS_TOKEN_EXPIRE_MINUTES
     expire = datetime.now(timezone.utc) + timedelta(minutes=expire_delta)
@@ -107,11 +256,62 @@ def decode_token(token: str) -> Dict[str, Any]:
     return payload
 
 
+def decode_token_cached(token: str) -> Dict[str, Any]:
+    """decode_token() memoized per token string until the token expires.
+
+    Raises like decode_token for invalid tokens; those are never cached.
+    """
+    payload = _DECODED_TOKEN_CACHE.get(token)
+    if payload is not None:
+        try:
+            if float(payload["exp"]) > time.time():
+                return payload
+        except (KeyError, TypeError, ValueError):
+            pass
+        _DECODED_TOKEN_CACHE.pop(token, None)
+    payload = decode_token(token)
+    if len(_DECODED_TOKEN_CACHE) >= AUTH_USER_CACHE_MAX_ENTRIES:
+        # Oldest insertion first (dicts keep insertion order)
+        _DECODED_TOKEN_CACHE.pop(next(iter(_DECODED_TOKEN_CACHE)), None)
+    _DECODED_TOKEN_CACHE[token] = payload
+    return payload
+
+
+def _cache_token_user(token: str, token_exp: Any, user: Any) -> None:
+    if AUTH_USER_CACHE_TTL_SECONDS <= 0:
+        return
+    now = time.monotonic()
+    ttl = float(AUTH_USER_CACHE_TTL_SECONDS)
+    try:
+        ttl = min(ttl, float(token_exp) - time.time())
+    except (TypeError, ValueError):
+        pass
+    if ttl <= 0:
+        return
+    if len(_TOKEN_USER_CACHE) >= AUTH_USER_CACHE_MAX_ENTRIES:
+        for key in [k for k, (exp, _u) in list(_TOKEN_USER_CACHE.items()) if exp < now]:
+            _TOKEN_USER_CACHE.pop(key, None)
+        while len(_TOKEN_USER_CACHE) >= AUTH_USER_CACHE_MAX_ENTRIES:
+            # Oldest insertion first (dicts keep insertion order)
+            _TOKEN_USER_CACHE.pop(next(iter(_TOKEN_USER_CACHE)), None)
+    _TOKEN_USER_CACHE[token] = (now + ttl, user)
+
+
+# Built once; executed with a bound id so the compiled/prepared form is reused
+_SELECT_USER_BY_ID = select(ORMUser).where(ORMUser.id == bindparam("user_id"))
+
+
 async def get_current_user(token: str = Depends(oauth2_scheme), session: Optional[AsyncSession] = Depends(get_optional_async_session)) -> ORMUser | _UserLite:
     if not token or token in _TOKEN_BLACKLIST:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+    cached = _TOKEN_USER_CACHE.get(token)
+    if cached is not None:
+        if cached[0] >= time.monotonic():
+            return cached[1]
+        _TOKEN_USER_CACHE.pop(token, None)
     try:
-        payload = decode_token(token)
+        # The user cache is short-lived; the decoded claims stay valid until exp
+        payload = decode_token_cached(token)
         sub = payload.get("sub")
         if sub is None:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token payload")
@@ -123,12 +323,14 @@ async def get_current_user(token: str = Depends(oauth2_scheme), session: Optiona
         user = mem_get_user_by_id(user_id)
         if user is None or not user.is_active:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Inactive user")
+        _cache_token_user(token, payload.get("exp"), user)
         return user
 
-    result = await session.execute(select(ORMUser).where(ORMUser.id == user_id))
+    result = await session.execute(_SELECT_USER_BY_ID, {"user_id": user_id})
     user = result.scalar_one_or_none()
     if user is None or not user.is_active:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Inactive user")
+    _cache_token_user(token, payload.get("exp"), user)
     return user
 
 
@@ -139,20 +341,36 @@ async def ensure_user_matches_path(user_id: int, user=Depends(get_current_user))
 
 
 def blacklist_token(token: str) -> None:
-    _TOKEN_BLACKLIST.add(token)
+    global _BLACKLIST_NEXT_SWEEP
+    now = time.time()
+    try:
+        # The signature was checked when the token was used; only exp is needed here
+        exp = float(jwt.get_unverified_claims(token)["exp"])
+    except Exception:
+        exp = now + ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    _TOKEN_BLACKLIST[token] = exp
+    _TOKEN_USER_CACHE.pop(token, None)
+    _DECODED_TOKEN_CACHE.pop(token, None)
+    if now >= _BLACKLIST_NEXT_SWEEP:
+        _BLACKLIST_NEXT_SWEEP = now + _BLACKLIST_SWEEP_SECONDS
+        for key in [k for k, k_exp in _TOKEN_BLACKLIST.items() if k_exp < now]:
+            del _TOKEN_BLACKLIST[key]
 
 
 def rate_limit_check(user_id: int) -> None:
-    now = int(time.time())
-    window_start = now - (now % 60)
-    state = _RATE_LIMIT_STATE.get(user_id)
-    if state is None or state[0] != window_start:
-        _RATE_LIMIT_STATE[user_id] = (window_start, 1)
+    # Runs on the event loop only, so the bucket is updated in place without a lock
+    now = time.monotonic()
+    capacity = float(RATE_LIMIT_PER_MINUTE)
+    bucket = _RATE_LIMIT_STATE.get(user_id)
+    if bucket is None:
+        _RATE_LIMIT_STATE[user_id] = [capacity - 1.0, now]
         return
-    count = state[1] + 1
-    if count > RATE_LIMIT_PER_MINUTE:
+    tokens = min(capacity, bucket[0] + (now - bucket[1]) * capacity / 60.0)
+    bucket[1] = now
+    if tokens < 1.0:
+        bucket[0] = tokens
         raise HTTPException(status_code=429, detail="Rate limit exceeded")
-    _RATE_LIMIT_STATE[user_id] = (window_start, count)
+    bucket[0] = tokens - 1.0
 
 
 async def rate_limiter_dependency(user=Depends(get_current_user)) -> None:
@@ -65,9 +65,12 @@ class TradeAcceptOfferCommand(BaseCommand):
     offer_id: int
 
 
-# Parse helpers to normalize incoming raw dicts into typed, validated tuples
+# Parse helpers to normalize incoming raw dicts into typed, validated tuples.
+# Commands built by the API already carry ints, so exact ints skip the int() conversion.
 
 def _get_int(value: Any, default: int = 0) -> int:
+    if type(value) is int:
+        return value
     try:
         return int(value)
     except Exception:
@@ -76,6 +79,8 @@ def _get_int(value: Any, default: int = 0) -> int:
 
 def _get_coord(value: Any, default: int = 1) -> int:
     """Coordinates should default to 1 when missing or falsy (including 0)."""
+    if type(value) is int:
+        return value or default
     try:
         v = int(value)
     except Exception:
@@ -84,9 +89,9 @@ def _get_coord(value: Any, default: int = 1) -> int:
 
 
 def _get_optional_int(value: Any) -> Optional[int]:
+    if value is None or type(value) is int:
+        return value
     try:
-        if value is None:
-            return None
         return int(value)
     except Exception:
         return None
@@ -39,16 +39,43 @@ READ_REPLICA_URLS: List[str] = [u.strip() for u in os.environ.get("READ_REPLICA_
 # Async SQLAlchemy engine/pool settings
 DB_ECHO: bool = os.environ.get("DB_ECHO", "false").lower() == "true"
 DB_POOL_PRE_PING: bool = os.environ.get("DB_POOL_PRE_PING", "true").lower() == "true"
-DB_POOL_SIZE: int = int(os.environ.get("DB_POOL_SIZE", "5"))
-DB_MAX_OVERFLOW: int = int(os.environ.get("DB_MAX_OVERFLOW", "10"))
+DB_POOL_SIZE: int = int(os.environ.get("DB_POOL_SIZE", "20"))
+DB_MAX_OVERFLOW: int = int(os.environ.get("DB_MAX_OVERFLOW", "20"))
 DB_POOL_TIMEOUT: int = int(os.environ.get("DB_POOL_TIMEOUT", "30"))
 DB_POOL_RECYCLE: int = int(os.environ.get("DB_POOL_RECYCLE", "1800"))
+# Connections opened per engine at startup so the first requests skip connect/auth (0 disables)
+DB_POOL_WARM: int = int(os.environ.get("DB_POOL_WARM", str(DB_POOL_SIZE)))
+# Rows per multi-row INSERT ... VALUES statement when SQLAlchemy batches executemany (insertmanyvalues)
+DB_INSERTMANYVALUES_PAGE_SIZE: int = int(os.environ.get("DB_INSERTMANYVALUES_PAGE_SIZE", "1000"))
+
+# Seconds the aggregate part of /game-status is reused across requests (0 disables)
+GAME_STATUS_CACHE_SECONDS: float = float(os.environ.get("GAME_STATUS_CACHE_SECONDS", "1.0"))
+
+# Seconds a serialized /metrics document is served to repeat scrapers (0 disables)
+METRICS_CACHE_SECONDS: float = float(os.environ.get("METRICS_CACHE_SECONDS", "1.0"))
+
+# Seconds the occupied-coordinates index behind /planets/available is reused. Planet
+# creation through the API invalidates it immediately; the TTL bounds staleness from
+# other writers (colonization, other processes). 0 rebuilds on every request.
+PLANET_OCCUPANCY_CACHE_SECONDS: float = float(os.environ.get("PLANET_OCCUPANCY_CACHE_SECONDS", "5.0"))
+
+# Advance the ECS world inline on GET /player/{id}/fleet so completions are visible
+# to the very next read. The game loop applies them within one tick anyway; only the
+# test suite (which asserts right after short sleeps) needs this.
+SETTLE_WORLD_ON_READ: bool = os.environ.get("SETTLE_WORLD_ON_READ", "false").lower() == "true"
 
 # Auth / Security configuration
 JWT_SECRET: str = os.environ.get("JWT_SECRET", "dev-secret-change-me")
 JWT_ALGORITHM: str = os.environ.get("JWT_ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.environ.get("ACCESS_TOKEN_EXPIRE_MINUTES", "1440"))  # 24h
 RATE_LIMIT_PER_MINUTE: int = int(os.environ.get("RATE_LIMIT_PER_MINUTE", "100"))
+# Seconds a verified bearer token maps to its cached user row before re-validating (0 disables)
+AUTH_USER_CACHE_TTL_SECONDS: int = int(os.environ.get("AUTH_USER_CACHE_TTL_SECONDS", "30"))
+AUTH_USER_CACHE_MAX_ENTRIES: int = int(os.environ.get("AUTH_USER_CACHE_MAX_ENTRIES", "10000"))
+# Seconds login timestamps are buffered before one batched UPDATE writes them
+LAST_LOGIN_FLUSH_SECONDS: float = float(os.environ.get("LAST_LOGIN_FLUSH_SECONDS", "5"))
+# Seconds /auth/me trusts a positive "user owns a planet" check before querying again (0 disables)
+ME_CACHE_TTL_SECONDS: int = int(os.environ.get("ME_CACHE_TTL_SECONDS", "30"))
 
 # CORS configuration
 CORS_ALLOW_ORIGINS: List[str] = [orig.strip() for orig in os.environ.get("CORS_ALLOW_ORIGINS", "*").split(",")]
@@ -118,6 +145,12 @@ ENERGY_CONSUMPTION = {
 # Effective formula per building: BASE * level * (ENERGY_CONSUMPTION_GROWTH ** max(0, level-1))
 # Default 1.0 preserves legacy linear behavior.
 ENERGY_CONSUMPTION_GROWTH: float = float(os.environ.get("ENERGY_CONSUMPTION_GROWTH", "1.0"))
+# growth ** k for k < GROWTH_POW_TABLE_SIZE, so per-planet level formulas index a
+# tuple instead of calling float pow; levels past the table fall back to **
+GROWTH_POW_TABLE_SIZE: int = 64
+ENERGY_SOLAR_GROWTH_POW = tuple(ENERGY_SOLAR_GROWTH ** k for k in range(GROWTH_POW_TABLE_SIZE))
+FUSION_ENERGY_GROWTH_POW = tuple(FUSION_ENERGY_GROWTH ** k for k in range(GROWTH_POW_TABLE_SIZE))
+ENERGY_CONSUMPTION_GROWTH_POW = tuple(ENERGY_CONSUMPTION_GROWTH ** k for k in range(GROWTH_POW_TABLE_SIZE))
 
 # Soft floor for energy deficit production scaling (fraction 0..1)
 # Applied only when ENERGY_REQUIRED > 0 and ENERGY_PRODUCED > 0; zero energy still yields factor=0.
@@ -6,6 +6,7 @@ not run on import; call its functions explicitly from startup hooks if needed.
 """
 from __future__ import annotations
 
+import asyncio
 import logging
 from typing import AsyncGenerator, Optional
 
@@ -25,6 +26,8 @@ from sqlalchemy.ext.asyncio import async_sessionmaker as _AsyncSessionMaker
 engine: Optional[AsyncEngine] = None  # Created in start_db() on the owning asyncio loop
 # Note: SessionLocal is loop-affine; never access from non-owning threads.
 SessionLocal: Optional[_AsyncSessionMaker[AsyncSession]] = None  # set in start_db()
+# Memoized readiness: only start_db() sets it, after engine and SessionLocal exist;
+# shutdown_db() clears all three together
 _DB_ENABLED = False
 
 # Detect greenlet availability; SQLAlchemy relies on it in several execution paths
@@ -36,8 +39,8 @@ except Exception:  # pragma: no cover - tests may not have greenlet installed
 
 
 def is_db_enabled() -> bool:
-    """Return True if the async DB is usable in this process."""
-    return bool(_DB_ENABLED and engine is not None and SessionLocal is not None)
+    """Return True if the async DB is usable in this process (set by start_db/shutdown_db)."""
+    return _DB_ENABLED
 
 
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
@@ -87,11 +90,13 @@ def _engine_kwargs_for(url: str) -> dict:
         DB_MAX_OVERFLOW,
         DB_POOL_TIMEOUT,
         DB_POOL_RECYCLE,
+        DB_INSERTMANYVALUES_PAGE_SIZE,
     )
     engine_kwargs = {
         "echo": DB_ECHO,
         "future": True,
         "pool_pre_ping": DB_POOL_PRE_PING,
+        "insertmanyvalues_page_size": DB_INSERTMANYVALUES_PAGE_SIZE,
     }
     engine_kwargs.update({
         "pool_size": DB_POOL_SIZE,
@@ -173,6 +178,41 @@ async def check_database() -> bool:
         return False
 
 
+async def _warm_engine(eng: AsyncEngine, connections: int) -> int:
+    async def _open_one() -> bool:
+        try:
+            async with eng.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+            return True
+        except Exception as exc:
+            logger.warning("DB pool warm-up connection failed: %s", exc)
+            return False
+
+    results = await asyncio.gather(*(_open_one() for _ in range(connections)))
+    return sum(results)
+
+
+async def warm_pool(connections: Optional[int] = None) -> int:
+    """Pre-open pooled connections on the primary and replica engines.
+
+    Concurrently checks out ``connections`` connections per engine (default
+    DB_POOL_WARM, capped at the pool size) and runs ``SELECT 1`` on each; they
+    return to the pool afterwards. Returns the number of connections opened;
+    failures are logged and skipped.
+    """
+    if not is_db_enabled() or engine is None:
+        return 0
+    from src.core.config import DB_POOL_SIZE, DB_POOL_WARM
+    n = min(DB_POOL_WARM if connections is None else int(connections), DB_POOL_SIZE)
+    if n <= 0:
+        return 0
+    engines = [engine, *_replica_engines]
+    opened = await asyncio.gather(*(_warm_engine(eng, n) for eng in engines))
+    total = sum(opened)
+    logger.info("DB pool warmed: %d connection(s) across %d engine(s)", total, len(engines))
+    return total
+
+
 async def start_db() -> None:
     """Initialize async engines/sessionmakers within the current event loop.
 
@@ -4,13 +4,18 @@ import threading
 import time
 from datetime import datetime, timedelta
 from queue import Queue
-from typing import Dict, Optional
+from typing import Dict, Optional, Sequence
 import logging
 import esper
 from dataclasses import fields
 from src.core.time_utils import utc_now, ensure_aware_utc, parse_utc
 
+from src.core import database, notifications, trade_events
+from src.api import ws
 from src.core.sync import (
+    create_colony,
+    upsert_fleet,
+    upsert_fleet_mission,
     sync_planet_resources,
     sync_building_level,
     spend_resources_atomic,
@@ -38,6 +43,7 @@ from src.models import (
     Research,
     ResearchQueue,
     Planet,
+    FleetMovement,
 )
 from src.systems import (
     ResourceProductionSystem,
@@ -51,7 +57,31 @@ from src.systems import (
 
 logger = logging.getLogger(__name__)
 from src.core.metrics import metrics
-from src.core.config import TRADE_TRANSACTION_FEE_RATE
+from src.core.config import (
+    TRADE_TRANSACTION_FEE_RATE,
+    PREREQUISITES,
+    RESEARCH_PREREQUISITES,
+    BASE_BUILDING_COSTS,
+    BASE_BUILD_TIMES,
+    BASE_RESEARCH_COSTS,
+    BASE_RESEARCH_TIMES,
+    BASE_SHIP_COSTS,
+    BASE_SHIP_TIMES,
+    BASE_SHIP_STATS,
+    SHIP_STAT_BONUSES,
+    BUILD_TIME_REDUCTION_PER_HYPERSPACE_LEVEL,
+    ROBOT_FACTORY_BUILD_TIME_REDUCTION_PER_LEVEL,
+    SHIPYARD_BUILD_TIME_REDUCTION_PER_LEVEL,
+    MIN_BUILD_TIME_FACTOR,
+    RESEARCH_LAB_TIME_REDUCTION_PER_LEVEL,
+    MIN_RESEARCH_TIME_FACTOR,
+    BASE_MAX_FLEET_SIZE,
+    FLEET_SIZE_PER_COMPUTER_LEVEL,
+    SHIPYARD_QUEUE_BASE_LIMIT,
+    SHIPYARD_QUEUE_PER_LEVEL,
+    SYSTEMS_PER_GALAXY,
+    POSITIONS_PER_SYSTEM,
+)
 from src.core.commands import (
     parse_build_building,
     parse_demolish_building,
@@ -66,6 +96,22 @@ from src.core.commands import (
     parse_trade_accept_offer,
 )
 
+# Command type -> (parser returning the handler's positional args, GameWorld handler name).
+# Handlers are resolved by name on the instance so they can be overridden per world.
+_COMMAND_DISPATCH = {
+    'build_building': (parse_build_building, '_handle_build_building'),
+    'demolish_building': (parse_demolish_building, '_handle_demolish_building'),
+    'cancel_build_queue': (parse_cancel_build_queue, '_handle_cancel_build_queue'),
+    'update_player_activity': (lambda command: (parse_update_activity(command),), '_handle_update_activity'),
+    'start_research': (parse_start_research, '_handle_start_research'),
+    'build_ships': (parse_build_ships, '_handle_build_ships'),
+    'colonize': (parse_colonize, '_handle_colonize'),
+    'fleet_dispatch': (parse_fleet_dispatch, '_handle_fleet_dispatch'),
+    'fleet_recall': (parse_fleet_recall, '_handle_fleet_recall'),
+    'trade_create_offer': (parse_trade_create_offer, '_handle_trade_create_offer'),
+    'trade_accept_offer': (parse_trade_accept_offer, '_handle_trade_accept_offer'),
+}
+
 
 class GameWorld:
     def __init__(self) -> None:
@@ -78,6 +124,20 @@ class GameWorld:
         # Lifecycle flags
         self.loaded: bool = False
 
+        # user_id -> entity id of the player's ECS entity (see player_entity). Shared
+        # with DB hydration in sync.py through world.user_index, so it is only ever
+        # updated in place.
+        self.user_index: dict[int, int] = {}
+        self._user_index_version: int = -1
+
+        # (monotonic stamp, {(galaxy, system): occupied positions}) served to
+        # /planets/available; None forces a rebuild. New planets are added in place
+        # (record_planet_occupied). The version is bumped on every change so a
+        # rebuild that raced with a new planet is not stored, and results derived
+        # from the index can tell it changed.
+        self.planet_occupancy: Optional[tuple[float, dict[tuple[int, int], set[int]]]] = None
+        self.planet_occupancy_version: int = 0
+
         # Persistence cadence trackers
         self._last_save_ts: float = 0.0
         self._last_cleanup_day: Optional[int] = None
@@ -94,14 +154,14 @@ class GameWorld:
         self.world.add_processor(BattleSystem())
 
         # In-memory battle report store (used when DB is not integrated for reports)
-        self._battle_reports: list[dict] = []
+        self._battle_reports: dict[int, dict] = {}
         self._next_battle_report_id: int = 1
         # In-memory espionage report store
-        self._espionage_reports: list[dict] = []
+        self._espionage_reports: dict[int, dict] = {}
         self._next_espionage_report_id: int = 1
 
-        # In-memory marketplace offers store
-        self._market_offers: list[dict] = []
+        # In-memory marketplace offers store (id -> offer, in creation order)
+        self._market_offers: dict[int, dict] = {}
         self._next_offer_id: int = 1
 
         # In-memory trade history (events) store
@@ -111,6 +171,7 @@ class GameWorld:
         # Expose handlers so systems can push reports
         setattr(self.world, "handle_battle_report", self.handle_battle_report)
         setattr(self.world, "handle_espionage_report", self.handle_espionage_report)
+        setattr(self.world, "user_index", self.user_index)
 
         # Removed file-backed hydration for market offers and reports.
         # Open offers will be hydrated from the database in load_player_data when DB is enabled.
@@ -295,6 +356,18 @@ class GameWorld:
             except Exception as e:
                 logger.error(f"Error processing command: {e}")
 
+    def apply_command(self, command: Dict) -> None:
+        """Execute one command immediately on the caller's thread.
+
+        For request handlers whose response or follow-up reads depend on the
+        command's effect. Unlike _process_commands it leaves every other queued
+        command to the game loop, and it never runs the ECS systems.
+        """
+        try:
+            self._execute_command(command)
+        except Exception as e:
+            logger.error(f"Error processing command: {e}")
+
     def _execute_command(self, command: Dict) -> None:
         """Execute a command from the API."""
         cmd_type = command.get('type')
@@ -312,43 +385,13 @@ class GameWorld:
         except Exception:
             pass
 
-        if cmd_type == 'build_building':
-            uid, building_type = parse_build_building(command)
-            self._handle_build_building(uid, building_type)
-        elif cmd_type == 'demolish_building':
-            uid, building_type = parse_demolish_building(command)
-            self._handle_demolish_building(uid, building_type)
-        elif cmd_type == 'cancel_build_queue':
-            uid, index = parse_cancel_build_queue(command)
-            self._handle_cancel_build_queue(uid, index)
-        elif cmd_type == 'update_player_activity':
-            uid = parse_update_activity(command)
-            self._handle_update_activity(uid)
-        elif cmd_type == 'start_research':
-            uid, research_type = parse_start_research(command)
-            self._handle_start_research(uid, research_type)
-        elif cmd_type == 'build_ships':
-            uid, ship_type, qty = parse_build_ships(command)
-            self._handle_build_ships(uid, ship_type, qty)
-        elif cmd_type == 'colonize':
-            uid, galaxy, system, position, planet_name = parse_colonize(command)
-            self._handle_colonize(uid, galaxy, system, position, planet_name)
-        elif cmd_type == 'fleet_dispatch':
-            uid, galaxy, system, position, mission, speed, ships = parse_fleet_dispatch(command)
-            self._handle_fleet_dispatch(uid, galaxy, system, position, mission, speed, ships)
-        elif cmd_type == 'fleet_recall':
-            uid, fleet_id = parse_fleet_recall(command)
-            self._handle_fleet_recall(uid, fleet_id)
-        elif cmd_type == 'trade_create_offer':
-            uid, offered_resource, offered_amount, requested_resource, requested_amount = parse_trade_create_offer(command)
-            self._handle_trade_create_offer(uid, offered_resource, offered_amount, requested_resource, requested_amount)
-        elif cmd_type == 'trade_accept_offer':
-            uid, offer_id = parse_trade_accept_offer(command)
-            self._handle_trade_accept_offer(uid, offer_id)
+        entry = _COMMAND_DISPATCH.get(cmd_type)
+        if entry is not None:
+            parse, handler = entry
+            getattr(self, handler)(*parse(command))
 
     def _handle_demolish_building(self, user_id: int, building_type: str) -> None:
         """Handle building demolition with prerequisite safety and partial refund."""
-        from src.core.config import PREREQUISITES
         for ent, (player, resources, buildings, build_queue) in self.world.get_components(
             Player, Resources, Buildings, BuildQueue
         ):
@@ -426,7 +469,6 @@ class GameWorld:
 
     def _handle_build_building(self, user_id: int, building_type: str) -> None:
         """Handle building construction command."""
-        from src.core.config import PREREQUISITES
         for ent, (player, resources, buildings, build_queue) in self.world.get_components(
             Player, Resources, Buildings, BuildQueue
         ):
@@ -462,11 +504,9 @@ class GameWorld:
             build_time = self._calculate_build_time(building_type, current_level)
             # Apply build time reductions: hyperspace research (player) and robot_factory (planet)
             try:
-                from src.models import Research as _R, Buildings as _B
-                from src.core.config import BUILD_TIME_REDUCTION_PER_HYPERSPACE_LEVEL, ROBOT_FACTORY_BUILD_TIME_REDUCTION_PER_LEVEL, MIN_BUILD_TIME_FACTOR
-                r = self.world.component_for_entity(ent, _R)
+                r = self.world.component_for_entity(ent, Research)
                 hyper_lvl = int(getattr(r, 'hyperspace', 0)) if r is not None else 0
-                bld_comp = self.world.component_for_entity(ent, _B)
+                bld_comp = self.world.component_for_entity(ent, Buildings)
                 rf_lvl = int(getattr(bld_comp, 'robot_factory', 0)) if bld_comp is not None else 0
                 factor = (1.0 - BUILD_TIME_REDUCTION_PER_HYPERSPACE_LEVEL * hyper_lvl) * (1.0 - ROBOT_FACTORY_BUILD_TIME_REDUCTION_PER_LEVEL * rf_lvl)
                 factor = max(MIN_BUILD_TIME_FACTOR, factor)
@@ -520,10 +560,9 @@ class GameWorld:
 
     def _handle_update_activity(self, user_id: int) -> None:
         """Update player's last activity time."""
-        for ent, (player,) in self.world.get_components(Player):
-            if player.user_id == user_id:
-                player.last_active = utc_now()
-                break
+        ent = self.player_entity(user_id)
+        if ent is not None:
+            self.world.component_for_entity(ent, Player).last_active = utc_now()
 
     def _handle_start_research(self, user_id: int, research_type: str) -> None:
         """Handle research start command: deduct resources and enqueue research."""
@@ -538,11 +577,7 @@ class GameWorld:
             if not hasattr(research, research_type):
                 return
             # Validate research prerequisites
-            try:
-                from src.core.config import RESEARCH_PREREQUISITES
-                reqs = RESEARCH_PREREQUISITES.get(research_type, {})
-            except Exception:
-                reqs = {}
+            reqs = RESEARCH_PREREQUISITES.get(research_type, {})
             unmet = []
             for dep, min_lvl in reqs.items():
                 dep_cur = getattr(research, dep, 0) if hasattr(research, dep) else 0
@@ -568,9 +603,7 @@ class GameWorld:
             duration = self._calculate_research_time(research_type, current_level)
             # Apply research time reduction via research_lab on active planet
             try:
-                from src.models import Buildings as _B
-                from src.core.config import RESEARCH_LAB_TIME_REDUCTION_PER_LEVEL, MIN_RESEARCH_TIME_FACTOR
-                bld_comp = self.world.component_for_entity(ent, _B)
+                bld_comp = self.world.component_for_entity(ent, Buildings)
                 lab_lvl = int(getattr(bld_comp, 'research_lab', 0)) if bld_comp is not None else 0
                 factor = max(MIN_RESEARCH_TIME_FACTOR, 1.0 - RESEARCH_LAB_TIME_REDUCTION_PER_LEVEL * lab_lvl)
                 duration = int(max(1, duration * factor))
@@ -648,20 +681,13 @@ class GameWorld:
                     pass
                 return
             # Fleet size validation based on Computer Technology
-            try:
-                from src.core.config import BASE_MAX_FLEET_SIZE, FLEET_SIZE_PER_COMPUTER_LEVEL
-            except Exception:
-                BASE_MAX_FLEET_SIZE, FLEET_SIZE_PER_COMPUTER_LEVEL = 50, 10
             # Compute current total fleet size
             try:
                 total_current = 0
                 for f in fields(Fleet):
                     total_current += int(getattr(fleet, f.name, 0))
                 # Include queued ships (all types)
-                try:
-                    sbq = self.world.component_for_entity(ent, ShipBuildQueue)
-                except Exception:
-                    sbq = None
+                sbq = self.world.try_component(ent, ShipBuildQueue)
                 if sbq and getattr(sbq, 'items', None):
                     for item in sbq.items:
                         try:
@@ -670,8 +696,7 @@ class GameWorld:
                             pass
                 # Get computer tech level (default 0)
                 try:
-                    from src.models import Research as _R
-                    r = self.world.component_for_entity(ent, _R)
+                    r = self.world.component_for_entity(ent, Research)
                     comp_lvl = int(getattr(r, 'computer', 0)) if r is not None else 0
                 except Exception:
                     comp_lvl = 0
@@ -697,10 +722,6 @@ class GameWorld:
                 # If any unexpected error in validation, fail safe by rejecting
                 return
             # Costs and time
-            try:
-                from src.core.config import BASE_SHIP_COSTS, BASE_SHIP_TIMES, BUILD_TIME_REDUCTION_PER_HYPERSPACE_LEVEL, MIN_BUILD_TIME_FACTOR
-            except Exception:
-                return
             per_cost = BASE_SHIP_COSTS.get(ship_type, {'metal': 0, 'crystal': 0, 'deuterium': 0})
             per_time = int(BASE_SHIP_TIMES.get(ship_type, 60))
             total_cost = {
@@ -711,9 +732,7 @@ class GameWorld:
             duration = per_time * quantity
             # Apply combined reductions: hyperspace research, shipyard level, and robot factory level
             try:
-                from src.models import Research as _R
-                from src.core.config import SHIPYARD_BUILD_TIME_REDUCTION_PER_LEVEL, ROBOT_FACTORY_BUILD_TIME_REDUCTION_PER_LEVEL
-                r = self.world.component_for_entity(ent, _R)
+                r = self.world.component_for_entity(ent, Research)
                 hyper_lvl = int(getattr(r, 'hyperspace', 0)) if r is not None else 0
                 # Base multiplicative factors (each cannot reduce below MIN_BUILD_TIME_FACTOR when combined)
                 hyper_factor = max(0.0, 1.0 - BUILD_TIME_REDUCTION_PER_HYPERSPACE_LEVEL * hyper_lvl)
@@ -746,10 +765,7 @@ class GameWorld:
                 except Exception:
                     pass
                 # Ensure ShipBuildQueue component exists
-                try:
-                    ship_queue = self.world.component_for_entity(ent, ShipBuildQueue)
-                except Exception:
-                    ship_queue = None
+                ship_queue = self.world.try_component(ent, ShipBuildQueue)
                 if ship_queue is None:
                     ship_queue = ShipBuildQueue()
                     try:
@@ -758,7 +774,6 @@ class GameWorld:
                         pass
                 # Enforce shipyard queue size limit before enqueueing
                 try:
-                    from src.core.config import SHIPYARD_QUEUE_BASE_LIMIT, SHIPYARD_QUEUE_PER_LEVEL
                     current_len = 0
                     if getattr(ship_queue, 'items', None):
                         current_len = len(ship_queue.items)
@@ -830,56 +845,50 @@ class GameWorld:
         except Exception:
             return
         # Find player entity and fleet
-        ent_match = None
-        player_comp = None
-        for ent, (player, fleet) in self.world.get_components(Player, Fleet):
-            if player.user_id == user_id:
-                ent_match = ent
-                player_comp = player
-                # Validate colony ship availability
-                try:
-                    cships = int(getattr(fleet, 'colony_ship', 0))
-                except Exception:
-                    cships = 0
-                if cships <= 0:
-                    return
-                # Attempt to persist colony creation
-                try:
-                    from src.core.sync import create_colony
-                    ok = create_colony(user_id, player.name, galaxy, system, position, planet_name)
-                except Exception:
-                    ok = True  # allow ECS-only success if persistence path fails
-                if not ok:
-                    return
-                # Decrement colony ship in ECS
-                try:
-                    setattr(fleet, 'colony_ship', max(0, cships - 1))
-                except Exception:
-                    pass
-                # Persist updated fleet counts best-effort
-                try:
-                    from src.core.sync import upsert_fleet as _upsert_fleet
-                    _upsert_fleet(self.world, ent_match)
-                except Exception:
-                    pass
-                # Optionally log
-                try:
-                    logger.info(
-                        "colonization_success",
-                        extra={
-                            "action_type": "colonize",
-                            "user_id": user_id,
-                            "galaxy": galaxy,
-                            "system": system,
-                            "position": position,
-                            "timestamp": datetime.now().isoformat(),
-                        },
-                    )
-                except Exception:
-                    pass
-                return
-        # If no entity found, nothing to do
-        return
+        found = self.player_components(user_id, Player, Fleet)
+        if found is None:
+            return
+        ent_match, (player, fleet) = found
+        # Validate colony ship availability
+        try:
+            cships = int(getattr(fleet, 'colony_ship', 0))
+        except Exception:
+            cships = 0
+        if cships <= 0:
+            return
+        # Attempt to persist colony creation
+        try:
+            ok = create_colony(user_id, player.name, galaxy, system, position, planet_name)
+        except Exception:
+            ok = True  # allow ECS-only success if persistence path fails
+        if not ok:
+            return
+        self.record_planet_occupied(galaxy, system, position)
+        # Decrement colony ship in ECS
+        try:
+            setattr(fleet, 'colony_ship', max(0, cships - 1))
+        except Exception:
+            pass
+        # Persist updated fleet counts best-effort
+        try:
+            upsert_fleet(self.world, ent_match)
+        except Exception:
+            pass
+        # Optionally log
+        try:
+            logger.info(
+                "colonization_success",
+                extra={
+                    "action_type": "colonize",
+                    "user_id": user_id,
+                    "galaxy": galaxy,
+                    "system": system,
+                    "position": position,
+                    "timestamp": datetime.now().isoformat(),
+                },
+            )
+        except Exception:
+            pass
 
     def _handle_fleet_dispatch(self, user_id: int, galaxy: int, system: int, planet_pos: int, mission: str, speed: Optional[float], ships: Optional[Dict]) -> None:
         """Handle fleet dispatch command.
@@ -897,176 +906,159 @@ class GameWorld:
         except Exception:
             return
         # Find player entity with position and fleet
-        for ent, (player, pos, fleet) in self.world.get_components(Player, Position, Fleet):
-            if player.user_id != user_id:
-                continue
-            # Build movement component
-            try:
-                from src.models import FleetMovement as _FM
-                now = utc_now()
-                origin = Position(galaxy=pos.galaxy, system=pos.system, planet=pos.planet)
-                target = Position(galaxy=galaxy, system=system, planet=planet_pos)
-                # Calculate travel time based on distance and effective fleet speed
-                try:
-                    from src.core.config import SYSTEMS_PER_GALAXY, POSITIONS_PER_SYSTEM
-                except Exception:
-                    SYSTEMS_PER_GALAXY, POSITIONS_PER_SYSTEM = 499, 15
-
-                # Distance in abstract units: linearized across galaxy/system/planet
-                dg = abs(int(target.galaxy) - int(origin.galaxy))
-                ds = abs(int(target.system) - int(origin.system))
-                dp = abs(int(target.planet) - int(origin.planet))
-                distance_units = dg * SYSTEMS_PER_GALAXY * POSITIONS_PER_SYSTEM + ds * POSITIONS_PER_SYSTEM + dp
-
-                # Determine effective speed (units per hour)
-                # Use research-influenced ship speeds via existing helper
-                research_comp = None
+        found = self.player_components(user_id, Position, Fleet)
+        if found is None:
+            return
+        ent, (pos, fleet) = found
+        # Build movement component
+        try:
+            now = utc_now()
+            origin = Position(galaxy=pos.galaxy, system=pos.system, planet=pos.planet)
+            target = Position(galaxy=galaxy, system=system, planet=planet_pos)
+            # Calculate travel time based on distance and effective fleet speed
+            # Distance in abstract units: linearized across galaxy/system/planet
+            dg = abs(int(target.galaxy) - int(origin.galaxy))
+            ds = abs(int(target.system) - int(origin.system))
+            dp = abs(int(target.planet) - int(origin.planet))
+            distance_units = dg * SYSTEMS_PER_GALAXY * POSITIONS_PER_SYSTEM + ds * POSITIONS_PER_SYSTEM + dp
+
+            # Determine effective speed (units per hour)
+            # Use research-influenced ship speeds via existing helper
+            research_comp = self.world.try_component(ent, Research)
+            ship_stats = self._calculate_ship_stats(research_comp) or {}
+
+            # If a composition was provided, use the slowest ship among it; else, use fastest owned ship; fallback to light_fighter base
+            def _get_speed_for(ship_type: str) -> int:
                 try:
-                    research_comp = self.world.component_for_entity(ent, Research)
+                    return int(ship_stats.get(ship_type, {}).get('speed'))
                 except Exception:
-                    research_comp = None
-                ship_stats = self._calculate_ship_stats(research_comp) or {}
+                    return 0
 
-                # If a composition was provided, use the slowest ship among it; else, use fastest owned ship; fallback to light_fighter base
-                def _get_speed_for(ship_type: str) -> int:
+            effective_speed = 0
+            if isinstance(ships, dict) and ships:
+                speeds = []
+                for st, cnt in ships.items():
                     try:
-                        return int(ship_stats.get(ship_type, {}).get('speed'))
+                        cnt_i = int(cnt)
                     except Exception:
-                        return 0
-
-                effective_speed = 0
-                if isinstance(ships, dict) and ships:
-                    speeds = []
-                    for st, cnt in ships.items():
+                        cnt_i = 0
+                    if cnt_i <= 0:
+                        continue
+                    s_val = _get_speed_for(str(st))
+                    if s_val > 0:
+                        speeds.append(s_val)
+                if speeds:
+                    effective_speed = min(speeds)  # slowest ship governs fleet speed
+            if effective_speed <= 0:
+                # Fallback: check owned ships on the entity and take the fastest available
+                owned_fleet = self.world.try_component(ent, Fleet)
+                owned_speeds = []
+                if owned_fleet is not None:
+                    for st in ship_stats.keys():
                         try:
-                            cnt_i = int(cnt)
+                            if int(getattr(owned_fleet, st, 0)) > 0:
+                                sv = _get_speed_for(st)
+                                if sv > 0:
+                                    owned_speeds.append(sv)
                         except Exception:
-                            cnt_i = 0
-                        if cnt_i <= 0:
                             continue
-                        s_val = _get_speed_for(str(st))
-                        if s_val > 0:
-                            speeds.append(s_val)
-                    if speeds:
-                        effective_speed = min(speeds)  # slowest ship governs fleet speed
-                if effective_speed <= 0:
-                    # Fallback: check owned ships on the entity and take the fastest available
-                    try:
-                        owned_fleet = self.world.component_for_entity(ent, Fleet)
-                    except Exception:
-                        owned_fleet = None
-                    owned_speeds = []
-                    if owned_fleet is not None:
-                        for st in ship_stats.keys():
-                            try:
-                                if int(getattr(owned_fleet, st, 0)) > 0:
-                                    sv = _get_speed_for(st)
-                                    if sv > 0:
-                                        owned_speeds.append(sv)
-                            except Exception:
-                                continue
-                    if owned_speeds:
-                        effective_speed = max(owned_speeds)
-                if effective_speed <= 0:
-                    # Final fallback: base light fighter speed or 5000
-                    effective_speed = int(ship_stats.get('light_fighter', {}).get('speed', 5000)) or 5000
-
-                # Apply optional user speed factor (0 < factor <= 1.0)
-                try:
-                    user_factor = float(speed) if speed is not None else 1.0
-                except Exception:
-                    user_factor = 1.0
-                if user_factor <= 0:
-                    user_factor = 1.0
-                if user_factor > 1.0:
-                    user_factor = 1.0
-                effective_speed = max(1.0, effective_speed * user_factor)
-
-                # Convert distance and speed to seconds; interpret speed as units/hour
-                duration_seconds = 1
-                try:
-                    duration_seconds = int((float(distance_units) / float(effective_speed)) * 3600)
-                    if duration_seconds < 1:
-                        duration_seconds = 1
-                except Exception:
+                if owned_speeds:
+                    effective_speed = max(owned_speeds)
+            if effective_speed <= 0:
+                # Final fallback: base light fighter speed or 5000
+                effective_speed = int(ship_stats.get('light_fighter', {}).get('speed', 5000)) or 5000
+
+            # Apply optional user speed factor (0 < factor <= 1.0)
+            try:
+                user_factor = float(speed) if speed is not None else 1.0
+            except Exception:
+                user_factor = 1.0
+            if user_factor <= 0:
+                user_factor = 1.0
+            if user_factor > 1.0:
+                user_factor = 1.0
+            effective_speed = max(1.0, effective_speed * user_factor)
+
+            # Convert distance and speed to seconds; interpret speed as units/hour
+            duration_seconds = 1
+            try:
+                duration_seconds = int((float(distance_units) / float(effective_speed)) * 3600)
+                if duration_seconds < 1:
                     duration_seconds = 1
+            except Exception:
+                duration_seconds = 1
 
-                movement = _FM(
-                    origin=origin,
-                    target=target,
-                    departure_time=now,
-                    arrival_time=now + timedelta(seconds=duration_seconds),
-                    speed=float(effective_speed),
-                    mission=str(mission),
-                    owner_id=int(user_id),
-                    recalled=False,
+            movement = FleetMovement(
+                origin=origin,
+                target=target,
+                departure_time=now,
+                arrival_time=now + timedelta(seconds=duration_seconds),
+                speed=float(effective_speed),
+                mission=str(mission),
+                owner_id=int(user_id),
+                recalled=False,
+            )
+            try:
+                self.world.add_component(ent, movement)
+            except Exception:
+                # If adding fails, do not crash
+                pass
+            # Persist mission best-effort
+            try:
+                upsert_fleet_mission(self.world, ent, movement)
+            except Exception:
+                pass
+            try:
+                logger.info(
+                    "fleet_dispatch_queued",
+                    extra={
+                        "action_type": "fleet_dispatch",
+                        "user_id": user_id,
+                        "target": {"g": galaxy, "s": system, "p": planet_pos},
+                        "mission": mission,
+                        "timestamp": datetime.now().isoformat(),
+                    },
                 )
-                try:
-                    self.world.add_component(ent, movement)
-                except Exception:
-                    # If adding fails, do not crash
-                    pass
-                # Persist mission best-effort
-                try:
-                    from src.core.sync import upsert_fleet_mission as _upsert_mission
-                    _upsert_mission(self.world, ent, movement)
-                except Exception:
-                    pass
-                try:
-                    logger.info(
-                        "fleet_dispatch_queued",
-                        extra={
-                            "action_type": "fleet_dispatch",
-                            "user_id": user_id,
-                            "target": {"g": galaxy, "s": system, "p": planet_pos},
-                            "mission": mission,
-                            "timestamp": datetime.now().isoformat(),
-                        },
-                    )
-                except Exception:
-                    pass
-                # If this is an attack mission, notify the defender of incoming attack (best-effort)
-                try:
-                    if str(mission).lower() == "attack":
-                        # Find defender by matching target coordinates to a player's active Position
-                        defender_id = None
-                        for dent, (dp, dpos) in self.world.get_components(Player, Position):
-                            try:
-                                if int(dpos.galaxy) == int(galaxy) and int(dpos.system) == int(system) and int(dpos.planet) == int(planet_pos):
-                                    defender_id = int(dp.user_id)
-                                    break
-                            except Exception:
-                                continue
-                        if defender_id:
-                            try:
-                                from src.api.ws import send_to_user as _send
-                                _send(defender_id, {
-                                    "type": "incoming_attack",
-                                    "attacker_user_id": int(user_id),
-                                    "origin": {"galaxy": origin.galaxy, "system": origin.system, "planet": origin.planet},
-                                    "target": {"galaxy": galaxy, "system": system, "planet": planet_pos},
-                                    "eta": movement.arrival_time.isoformat(),
-                                    "ts": now.isoformat(),
-                                })
-                            except Exception:
-                                pass
-                            # Persist offline notification (best-effort)
-                            try:
-                                from src.core.notifications import create_notification as _notify
-                                _notify(defender_id, "incoming_attack", {
-                                    "attacker_user_id": int(user_id),
-                                    "origin": {"galaxy": origin.galaxy, "system": origin.system, "planet": origin.planet},
-                                    "target": {"galaxy": galaxy, "system": system, "planet": planet_pos},
-                                    "eta": movement.arrival_time.isoformat(),
-                                }, priority="critical")
-                            except Exception:
-                                pass
-                except Exception:
-                    pass
             except Exception:
                 pass
-            return
-        return
+            # If this is an attack mission, notify the defender of incoming attack (best-effort)
+            try:
+                if str(mission).lower() == "attack":
+                    # Find defender by matching target coordinates to a player's active Position
+                    defender_id = None
+                    for dent, (dp, dpos) in self.world.get_components(Player, Position):
+                        try:
+                            if int(dpos.galaxy) == int(galaxy) and int(dpos.system) == int(system) and int(dpos.planet) == int(planet_pos):
+                                defender_id = int(dp.user_id)
+                                break
+                        except Exception:
+                            continue
+                    if defender_id:
+                        try:
+                            ws.send_to_user(defender_id, {
+                                "type": "incoming_attack",
+                                "attacker_user_id": int(user_id),
+                                "origin": {"galaxy": origin.galaxy, "system": origin.system, "planet": origin.planet},
+                                "target": {"galaxy": galaxy, "system": system, "planet": planet_pos},
+                                "eta": movement.arrival_time.isoformat(),
+                                "ts": now.isoformat(),
+                            })
+                        except Exception:
+                            pass
+                        # Persist offline notification (best-effort)
+                        try:
+                            notifications.create_notification(defender_id, "incoming_attack", {
+                                "attacker_user_id": int(user_id),
+                                "origin": {"galaxy": origin.galaxy, "system": origin.system, "planet": origin.planet},
+                                "target": {"galaxy": galaxy, "system": system, "planet": planet_pos},
+                                "eta": movement.arrival_time.isoformat(),
+                            }, priority="critical")
+                        except Exception:
+                            pass
+            except Exception:
+                pass
+        except Exception:
+            pass
 
     def _handle_fleet_recall(self, user_id: int, fleet_id: Optional[int]) -> bool:
         """Recall an in-flight fleet back to its origin.
@@ -1077,83 +1069,72 @@ class GameWorld:
 
         Returns True if a recall was applied or was already in recalled state, False otherwise.
         """
-        try:
-            from src.models import Player as _P, FleetMovement as _FM
-        except Exception:
-            return False
-
         now = utc_now()
         # Find the player's entity that has an active FleetMovement
-        for ent, (p, mv) in self.world.get_components(_P, _FM):
-            # Normalize existing movement timestamps to aware UTC during recall handling
-            try:
-                mv.arrival_time = ensure_aware_utc(getattr(mv, 'arrival_time', None))
-                mv.departure_time = ensure_aware_utc(getattr(mv, 'departure_time', None))
-            except Exception:
-                pass
-            try:
-                if int(p.user_id) != int(user_id):
-                    continue
-            except Exception:
-                continue
+        found = self.player_components(user_id, FleetMovement)
+        if found is None:
+            return False
+        ent, (mv,) = found
+        # Normalize existing movement timestamps to aware UTC during recall handling
+        try:
+            mv.arrival_time = ensure_aware_utc(getattr(mv, 'arrival_time', None))
+            mv.departure_time = ensure_aware_utc(getattr(mv, 'departure_time', None))
+        except Exception:
+            pass
 
-            # If already arrived or past ETA, nothing to recall
-            try:
-                if now >= mv.arrival_time:
-                    return False
-            except Exception:
+        # If already arrived or past ETA, nothing to recall
+        try:
+            if now >= mv.arrival_time:
                 return False
+        except Exception:
+            return False
 
-            # If already recalled, treat as idempotent success
-            try:
-                if bool(getattr(mv, 'recalled', False)):
-                    return True
-            except Exception:
-                pass
+        # If already recalled, treat as idempotent success
+        try:
+            if bool(getattr(mv, 'recalled', False)):
+                return True
+        except Exception:
+            pass
 
-            # Compute return ETA as elapsed outbound time
-            try:
-                elapsed = now - mv.departure_time
-                seconds = int(max(1, elapsed.total_seconds()))
-            except Exception:
-                seconds = 1
+        # Compute return ETA as elapsed outbound time
+        try:
+            elapsed = now - mv.departure_time
+            seconds = int(max(1, elapsed.total_seconds()))
+        except Exception:
+            seconds = 1
 
-            # Flip destination to origin and mark recalled
-            try:
-                mv.target = mv.origin
-                mv.recalled = True
-                mv.departure_time = now
-                from datetime import timedelta as _td
-                mv.arrival_time = now + _td(seconds=seconds)
-            except Exception:
-                return False
+        # Flip destination to origin and mark recalled
+        try:
+            mv.target = mv.origin
+            mv.recalled = True
+            mv.departure_time = now
+            mv.arrival_time = now + timedelta(seconds=seconds)
+        except Exception:
+            return False
 
-            # Persist mission update best-effort
-            try:
-                from src.core.sync import upsert_fleet_mission as _upsert_mission
-                _upsert_mission(self.world, ent, mv)
-            except Exception:
-                pass
-            # Log
-            try:
-                logger.info(
-                    "fleet_recall_queued",
-                    extra={
-                        "action_type": "fleet_recall",
-                        "user_id": user_id,
-                        "entity": ent,
-                        "timestamp": datetime.now().isoformat(),
-                        "return_eta": mv.arrival_time.isoformat(),
-                    },
-                )
-            except Exception:
-                pass
-            return True
-        return False
+        # Persist mission update best-effort
+        try:
+            upsert_fleet_mission(self.world, ent, mv)
+        except Exception:
+            pass
+        # Log
+        try:
+            logger.info(
+                "fleet_recall_queued",
+                extra={
+                    "action_type": "fleet_recall",
+                    "user_id": user_id,
+                    "entity": ent,
+                    "timestamp": datetime.now().isoformat(),
+                    "return_eta": mv.arrival_time.isoformat(),
+                },
+            )
+        except Exception:
+            pass
+        return True
 
     def _calculate_building_cost(self, building_type: str, level: int) -> Dict[str, int]:
         """Calculate the cost of a building upgrade."""
-        from src.core.config import BASE_BUILDING_COSTS
         if building_type not in BASE_BUILDING_COSTS:
             return {'metal': 0, 'crystal': 0, 'deuterium': 0}
 
@@ -1167,7 +1148,6 @@ class GameWorld:
 
     def _calculate_build_time(self, building_type: str, level: int) -> int:
         """Calculate build time in seconds."""
-        from src.core.config import BASE_BUILD_TIMES
         base_time = BASE_BUILD_TIMES.get(building_type, 60)
         return int(base_time * (1.2 ** level))
 
@@ -1176,7 +1156,6 @@ class GameWorld:
 
         Uses exponential growth similar to buildings but with a 1.6 multiplier by default.
         """
-        from src.core.config import BASE_RESEARCH_COSTS
         base = BASE_RESEARCH_COSTS.get(research_type, {'metal': 0, 'crystal': 0, 'deuterium': 0})
         multiplier = 1.6 ** level
         return {
@@ -1187,7 +1166,6 @@ class GameWorld:
 
     def _calculate_research_time(self, research_type: str, level: int) -> int:
         """Calculate research time in seconds based on current level."""
-        from src.core.config import BASE_RESEARCH_TIMES
         base_time = BASE_RESEARCH_TIMES.get(research_type, 120)
         # Slightly faster growth than buildings
         return int(base_time * (1.25 ** level))
@@ -1197,10 +1175,6 @@ class GameWorld:
 
         Returns a mapping: ship_type -> {attack, shield, speed, cargo}
         """
-        try:
-            from src.core.config import BASE_SHIP_STATS, SHIP_STAT_BONUSES
-        except Exception:
-            return {}
         laser = int(getattr(research, 'laser', 0)) if research else 0
         ion = int(getattr(research, 'ion', 0)) if research else 0
         hyper = int(getattr(research, 'hyperspace', 0)) if research else 0
@@ -1221,6 +1195,60 @@ class GameWorld:
             }
         return stats
 
+    def player_entity(self, user_id: int) -> Optional[int]:
+        """Return the ECS entity id holding user_id's Player component, if any.
+
+        Creation sites record new entities in user_index, and indexed hits are
+        checked against the live Player component. A miss only rescans the world
+        when entities were created or deleted since the last scan (world.version),
+        which catches entities made elsewhere (tests); otherwise it is just a miss.
+        """
+        ent = self.user_index.get(user_id)
+        if ent is not None:
+            player = self.world.try_component(ent, Player)
+            if player is not None and player.user_id == user_id:
+                return ent
+        version = self.world.version
+        if version == self._user_index_version:
+            return None
+        self.user_index.clear()
+        # First match wins, as the linear scan this index replaces returned it
+        for e, player in self.world.get_component(Player):
+            self.user_index.setdefault(player.user_id, e)
+        self._user_index_version = version
+        return self.user_index.get(user_id)
+
+    def player_components(self, user_id: int, *component_types: type) -> Optional[tuple]:
+        """Return (entity, components) for user_id's entity, or None if it lacks any of component_types."""
+        ent = self.player_entity(user_id)
+        if ent is None:
+            return None
+        try:
+            return ent, tuple(self.world.component_for_entity(ent, ctype) for ctype in component_types)
+        except KeyError:
+            return None
+
+    def invalidate_planet_occupancy(self) -> None:
+        """Drop the cached planet occupancy index when planets change at unknown coordinates."""
+        self.planet_occupancy_version += 1
+        self.planet_occupancy = None
+
+    def record_planet_occupied(self, galaxy: int, system: int, position: int) -> None:
+        """Add a newly created planet to the cached occupancy index, if one is cached.
+
+        Also called from the game thread (colonization), so a system's position
+        set is replaced rather than grown while a request may be iterating it.
+        """
+        self.planet_occupancy_version += 1
+        cached = self.planet_occupancy
+        if cached is not None:
+            key = (int(galaxy), int(system))
+            cached[1][key] = cached[1].get(key, set()) | {int(position)}
+
+    def has_player(self, user_id: int) -> bool:
+        """Return True if an ECS entity for user_id is already loaded."""
+        return self.player_entity(user_id) is not None
+
     def get_player_data(self, user_id: int) -> Optional[Dict]:
         """Get all data for a specific player."""
         for ent, (player, position, resources, buildings, build_queue, fleet, research, planet) in self.world.get_components(
@@ -1229,10 +1257,9 @@ class GameWorld:
             if player.user_id == user_id:
                 # Optional ship build queue
                 ship_build_queue_items = []
-                try:
-                    from src.models import ShipBuildQueue as _SBQ
-                    sbq = self.world.component_for_entity(ent, _SBQ)
-                    if sbq and getattr(sbq, 'items', None):
+                sbq = self.world.try_component(ent, ShipBuildQueue)
+                if sbq and getattr(sbq, 'items', None):
+                    try:
                         for item in sbq.items:
                             ship_build_queue_items.append({
                                 'type': item.get('type'),
@@ -1240,8 +1267,8 @@ class GameWorld:
                                 'completion_time': item.get('completion_time').isoformat() if item.get('completion_time') else None,
                                 'cost': item.get('cost'),
                             })
-                except Exception:
-                    pass
+                    except Exception:
+                        pass
                 return {
                     'player': {
                         'name': player.name,
@@ -1349,7 +1376,7 @@ class GameWorld:
                 self._next_battle_report_id = 2
             payload["id"] = rid
             payload["created_at"] = datetime.now().isoformat()
-            self._battle_reports.append(payload)
+            self._battle_reports[rid] = payload
         else:
             payload["id"] = rid
             payload["created_at"] = created_iso
@@ -1410,7 +1437,7 @@ class GameWorld:
             uid = int(user_id)
         except Exception:
             return []
-        reports = [r for r in reversed(self._battle_reports) if r.get("attacker_user_id") == uid or r.get("defender_user_id") == uid]
+        reports = [r for r in reversed(self._battle_reports.values()) if r.get("attacker_user_id") == uid or r.get("defender_user_id") == uid]
         start = max(0, int(offset))
         end = max(start, start + int(limit))
         return [dict(r) for r in reports[start:end]]
@@ -1422,9 +1449,9 @@ class GameWorld:
             rid = int(report_id)
         except Exception:
             return None
-        for r in self._battle_reports:
-            if int(r.get("id", -1)) == rid and (r.get("attacker_user_id") == uid or r.get("defender_user_id") == uid):
-                return dict(r)
+        r = self._battle_reports.get(rid)
+        if r is not None and (r.get("attacker_user_id") == uid or r.get("defender_user_id") == uid):
+            return dict(r)
         return None
 
     # -----------------
@@ -1459,7 +1486,7 @@ class GameWorld:
                 self._next_espionage_report_id = 2
             payload["id"] = rid
             payload["created_at"] = datetime.now().isoformat()
-            self._espionage_reports.append(payload)
+            self._espionage_reports[rid] = payload
         else:
             payload["id"] = rid
             payload["created_at"] = created_iso
@@ -1484,7 +1511,7 @@ class GameWorld:
             uid = int(user_id)
         except Exception:
             return []
-        reports = [r for r in reversed(self._espionage_reports) if r.get("attacker_user_id") == uid or r.get("defender_user_id") == uid]
+        reports = [r for r in reversed(self._espionage_reports.values()) if r.get("attacker_user_id") == uid or r.get("defender_user_id") == uid]
         start = max(0, int(offset))
         end = max(start, start + int(limit))
         return [dict(r) for r in reports[start:end]]
@@ -1496,9 +1523,9 @@ class GameWorld:
             rid = int(report_id)
         except Exception:
             return None
-        for r in self._espionage_reports:
-            if int(r.get("id", -1)) == rid and (r.get("attacker_user_id") == uid or r.get("defender_user_id") == uid):
-                return dict(r)
+        r = self._espionage_reports.get(rid)
+        if r is not None and (r.get("attacker_user_id") == uid or r.get("defender_user_id") == uid):
+            return dict(r)
         return None
 
     # -----------------
@@ -1732,17 +1759,17 @@ class GameWorld:
                             pass
                         # Hydrate open market offers into in-memory ECS for gameplay operations (acceptance/escrow)
                         try:
-                            # Load open offers newest first and merge without duplication
-                            result = await session.execute(
+                            # Load open offers newest first and merge without duplication;
+                            # streamed in batches rather than materialized all at once
+                            rows = await session.stream_scalars(
                                 select(_TO).where(_TO.status == 'open').order_by(_TO.created_at.desc())
+                                .execution_options(yield_per=500)
                             )
-                            rows = result.scalars().all()
-                            existing_ids = {int(o.get('id')) for o in self._market_offers if 'id' in o}
-                            for o in rows:
+                            async for o in rows:
                                 oid = int(getattr(o, 'id'))
-                                if oid in existing_ids:
+                                if oid in self._market_offers:
                                     continue
-                                self._market_offers.append({
+                                self._market_offers[oid] = {
                                     'id': oid,
                                     'seller_user_id': int(getattr(o, 'seller_user_id')),
                                     'offered_resource': getattr(o, 'offered_resource'),
@@ -1753,7 +1780,7 @@ class GameWorld:
                                     'accepted_by': int(getattr(o, 'accepted_by')) if getattr(o, 'accepted_by') is not None else None,
                                     'created_at': getattr(o, 'created_at').isoformat() if getattr(o, 'created_at', None) else None,
                                     'accepted_at': getattr(o, 'accepted_at').isoformat() if getattr(o, 'accepted_at', None) else None,
-                                })
+                                }
                         except Exception:
                             # Best-effort hydration; continue on error
                             pass
@@ -1911,21 +1938,48 @@ class GameWorld:
 
     def queue_command(self, command: Dict) -> None:
         """Queue a command to be processed in the game loop."""
+        self._log_queued(command)
+        self.command_queue.put(command)
+
+    def queue_commands(self, commands: Sequence[Dict]) -> None:
+        """Queue several commands under a single acquisition of the queue lock.
+
+        The commands are appended in order and become visible to the game loop
+        together, e.g. an action plus its update_player_activity follow-up.
+        """
+        for command in commands:
+            self._log_queued(command)
+        q = self.command_queue
+        # Same bookkeeping Queue.put does per item (the queue is unbounded)
+        with q.mutex:
+            q.queue.extend(commands)
+            q.unfinished_tasks += len(commands)
+            q.not_empty.notify(len(commands))
+
+    @property
+    def pending_count(self) -> int:
+        """Commands waiting for the game loop, read without taking the queue lock.
+
+        len() of the underlying deque is a single atomic operation, so probes get
+        a consistent (if instantly stale) depth without contending with request
+        handlers and the tick thread for the mutex, as qsize() would.
+        """
+        return len(self.command_queue.queue)
+
+    @staticmethod
+    def _log_queued(command: Dict) -> None:
         try:
-            action_type = command.get('type')
-            user_id = command.get('user_id')
             logger.info(
                 "queue_command",
                 extra={
-                    "action_type": action_type,
-                    "user_id": user_id,
+                    "action_type": command.get('type'),
+                    "user_id": command.get('user_id'),
                     "timestamp": datetime.now().isoformat(),
                 },
             )
         except Exception:
             # Do not fail queuing due to logging issues
             pass
-        self.command_queue.put(command)
 
     
     def list_market_offers(self, status: Optional[str] = "open", limit: int = 50, offset: int = 0) -> list[dict]:
@@ -1939,11 +1993,18 @@ class GameWorld:
             A shallow copy list of offer dicts.
         """
         try:
-            offers = [o for o in self._market_offers if status is None or o.get("status") == status]
+            offers = [o for o in self._market_offers.values() if status is None or o.get("status") == status]
             return list(offers[offset: offset + max(0, int(limit))])
         except Exception:
             return []
 
+    def get_market_offer(self, offer_id: int) -> Optional[dict]:
+        """Return the in-memory marketplace offer with this id (any status), or None."""
+        try:
+            return self._market_offers.get(int(offer_id))
+        except Exception:
+            return None
+
     # -----------------
     # Trade History API (in-memory)
     # -----------------
@@ -1960,15 +2021,13 @@ class GameWorld:
         """
         # Preserve previous behavior: if DB is enabled, avoid in-memory duplication
         try:
-            from src.core.database import is_db_enabled as _is_db_enabled
-            if _is_db_enabled():
+            if database.is_db_enabled():
                 return
         except Exception:
             pass
         try:
             # Delegate to service (handles in-memory and WS emission)
-            from src.core.trade_events import record_trade_event_sync  # lazy import to avoid cycles
-            record_trade_event_sync(event, gw=self)
+            trade_events.record_trade_event_sync(event, gw=self)
         except Exception:
             # Preserve previous best-effort behavior
             try:
@@ -2017,15 +2076,10 @@ class GameWorld:
             return None
 
         # Locate seller entity and resources
-        seller_ent = None
-        seller_res = None
-        for ent, (p, r) in self.world.get_components(Player, Resources):
-            if getattr(p, 'user_id', None) == user_id:
-                seller_ent = ent
-                seller_res = r
-                break
-        if seller_ent is None or seller_res is None:
+        found = self.player_components(user_id, Resources)
+        if found is None:
             return None
+        _seller_ent, (seller_res,) = found
 
         # Verify sufficient resources and deduct into escrow
         current_amount = int(getattr(seller_res, offered_resource, 0))
@@ -2054,7 +2108,7 @@ class GameWorld:
             "status": "open",
             "created_at": datetime.now().isoformat(),
         }
-        self._market_offers.append(offer)
+        self._market_offers[oid] = offer
         # Record trade history event (offer created)
         try:
             self._record_trade_event({
@@ -2092,11 +2146,7 @@ class GameWorld:
         Returns True on success, False otherwise.
         """
         # Find the offer
-        offer = None
-        for o in self._market_offers:
-            if int(o.get("id", -1)) == int(offer_id):
-                offer = o
-                break
+        offer = self.get_market_offer(offer_id)
         if offer is None or offer.get("status") != "open":
             return False
 
@@ -2106,16 +2156,11 @@ class GameWorld:
             return False
 
         # Locate buyer and seller resources
-        buyer_res = None
-        seller_res = None
-        for ent, (p, r) in self.world.get_components(Player, Resources):
-            uid = getattr(p, 'user_id', None)
-            if uid == buyer_user_id:
-                buyer_res = r
-            if uid == seller_id:
-                seller_res = r
-        if buyer_res is None or seller_res is None:
+        buyer = self.player_components(buyer_user_id, Resources)
+        seller = self.player_components(seller_id, Resources)
+        if buyer is None or seller is None:
             return False
+        buyer_res, seller_res = buyer[1][0], seller[1][0]
 
         offered_resource = offer["offered_resource"]
         requested_resource = offer["requested_resource"]
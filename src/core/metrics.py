@@ -47,16 +47,22 @@ class Stat:
             # Drop oldest
             self._samples.pop(0)
 
-    def _percentile_ms(self, p: float) -> float:
-        if not self._samples:
+    @staticmethod
+    def _percentile_ms(data: list[float], p: float) -> float:
+        # data must already be sorted
+        if not data:
             return 0.0
-        data = sorted(self._samples)
         k = max(0, min(len(data) - 1, int(round((p / 100.0) * (len(data) - 1)))))
         return data[k] * 1000.0
 
+    def copy(self) -> "Stat":
+        """Independent copy, cheap enough to take under the collector lock."""
+        return Stat(self.count, self.total_s, self.min_s, self.max_s, self.last_s, list(self._samples), self._max_samples)
+
     def as_dict_ms(self) -> Dict[str, float | int]:
         # Present values in milliseconds for readability
         avg_ms = (self.total_s / self.count * 1000.0) if self.count else 0.0
+        data = sorted(self._samples)
         return {
             "count": self.count,
             "total_ms": self.total_s * 1000.0,
@@ -64,8 +70,8 @@ class Stat:
             "min_ms": (self.min_s * 1000.0 if self.count else 0.0),
             "max_ms": self.max_s * 1000.0,
             "last_ms": self.last_s * 1000.0,
-            "p95_ms": self._percentile_ms(95.0),
-            "p99_ms": self._percentile_ms(99.0),
+            "p95_ms": self._percentile_ms(data, 95.0),
+            "p99_ms": self._percentile_ms(data, 99.0),
         }
 
 
@@ -146,39 +152,47 @@ class MetricsCollector:
         return max(0.0, time.monotonic() - self._start_monotonic)
 
     def snapshot(self) -> Dict[str, Any]:
+        # Only copy raw state under the lock; sorting samples for percentiles and
+        # building the export dict happen after release, so concurrent
+        # record_* calls from request handlers and the game loop are not held up
         with self._lock:
-            http_by_route: Dict[str, Dict[str, Any]] = {}
-            for (method, route), stat in self._http_stats.items():
-                key = f"{method}:{route}"
-                http_by_route[key] = {
-                    **stat.as_dict_ms(),
-                    "status_counts": dict(self._http_status_counts.get((method, route), {})),
-                }
-
-            tick = self._tick_stats.as_dict_ms()
-            jitter = self._tick_jitter.as_dict_ms()
-            # Timers snapshot
-            timers_by_name: Dict[str, Dict[str, Any]] = {}
-            for name, stat in self._timers.items():
-                timers_by_name[name] = stat.as_dict_ms()
-
-            return {
-                "process": {
-                    "started_at": self._start_time_s,
-                    "uptime_s": self.uptime_s(),
-                },
-                "http": {
-                    "total_count": self._http_total,
-                    "by_route": http_by_route,
-                },
-                "game_loop": {
-                    "ticks": self._tick_total,
-                    **tick,
-                    "jitter": jitter,
-                },
-                "events": dict(self._events),
-                "timers": timers_by_name,
+            http_stats = [
+                (method, route, stat.copy(), dict(self._http_status_counts.get((method, route), {})))
+                for (method, route), stat in self._http_stats.items()
+            ]
+            http_total = self._http_total
+            tick_stats = self._tick_stats.copy()
+            tick_total = self._tick_total
+            jitter_stats = self._tick_jitter.copy()
+            timers = [(name, stat.copy()) for name, stat in self._timers.items()]
+            events = dict(self._events)
+
+        http_by_route: Dict[str, Dict[str, Any]] = {}
+        for method, route, stat, status_counts in http_stats:
+            http_by_route[f"{method}:{route}"] = {
+                **stat.as_dict_ms(),
+                "status_counts": status_counts,
             }
+        # Timers snapshot
+        timers_by_name: Dict[str, Dict[str, Any]] = {name: stat.as_dict_ms() for name, stat in timers}
+
+        return {
+            "process": {
+                "started_at": self._start_time_s,
+                "uptime_s": self.uptime_s(),
+            },
+            "http": {
+                "total_count": http_total,
+                "by_route": http_by_route,
+            },
+            "game_loop": {
+                "ticks": tick_total,
+                **tick_stats.as_dict_ms(),
+                "jitter": jitter_stats.as_dict_ms(),
+            },
+            "events": events,
+            "timers": timers_by_name,
+        }
 
 
 # Singleton instance exported for app-wide use
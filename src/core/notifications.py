@@ -8,14 +8,16 @@ lightweight unit tests and disabled-DB environments. When the async database
 layer is available, it also persists notifications to the SQL database.
 
 Design notes:
-- Synchronous wrapper create_notification() schedules an async insert if an
-  event loop is already running, otherwise runs it with asyncio.run().
+- Synchronous wrapper create_notification() buffers the DB row and schedules a
+  flush if an event loop is already running, otherwise runs it with asyncio.run().
+  Rows buffered before the flush executes are written with one multi-row INSERT.
 - Errors in the DB path are swallowed after logging; in-memory storage is the
   source of truth for tests in environments without DB deps.
 - Payloads must be JSON-serializable.
 """
 
 import asyncio
+import threading
 from datetime import datetime, timezone
 from typing import Dict, List, Any, Optional
 import logging
@@ -24,6 +26,7 @@ logger = logging.getLogger(__name__)
 
 # Optional DB imports guarded for environments without SQLAlchemy/greenlet
 try:
+    from sqlalchemy import insert  # type: ignore
     from sqlalchemy.exc import SQLAlchemyError  # type: ignore
     from src.core.database import SessionLocal, is_db_enabled  # type: ignore
     from src.models.database import Notification as ORMNotification  # type: ignore
@@ -45,33 +48,61 @@ _MAX_PER_USER = 100
 _inmem: Dict[int, List[Dict[str, Any]]] = {}
 
 
-async def _insert_notification_async(user_id: int, ntype: str, payload: Dict[str, Any], priority: str, created_at: datetime) -> None:
-    if not _db_available():
+# Pending DB rows, flushed as one multi-row INSERT (SQLAlchemy insertmanyvalues)
+_pending_rows: List[Dict[str, Any]] = []
+_pending_lock = threading.Lock()
+_flush_scheduled = False
+
+
+def _take_pending_rows() -> List[Dict[str, Any]]:
+    global _flush_scheduled
+    with _pending_lock:
+        rows = list(_pending_rows)
+        _pending_rows.clear()
+        _flush_scheduled = False
+    return rows
+
+
+async def _flush_notifications_async() -> None:
+    """Insert all buffered notification rows in a single executemany round-trip."""
+    rows = _take_pending_rows()
+    if not rows or not _db_available():
         return
     try:
         async with SessionLocal() as session:  # type: ignore[misc]
-            n = ORMNotification(  # type: ignore[call-arg]
-                user_id=int(user_id),
-                type=str(ntype),
-                payload=dict(payload or {}),
-                priority=str(priority or "normal"),
-                created_at=created_at,
-                read_at=None,
-            )
-            session.add(n)
+            await session.execute(insert(ORMNotification), rows)  # type: ignore[arg-type]
             await session.commit()
     except SQLAlchemyError as exc:  # pragma: no cover - env dependent
         try:
-            logger.warning("notification_db_insert_failed user_id=%s type=%s err=%s", user_id, ntype, exc)
+            logger.warning("notification_db_insert_failed rows=%s err=%s", len(rows), exc)
         except Exception:
             pass
     except Exception:  # pragma: no cover
         try:
-            logger.debug("notification_db_insert_unknown_error user_id=%s type=%s", user_id, ntype)
+            logger.debug("notification_db_insert_unknown_error rows=%s", len(rows))
         except Exception:
             pass
 
 
+def _buffer_notification_row(user_id: int, ntype: str, payload: Dict[str, Any], priority: str, created_at: datetime) -> bool:
+    """Queue a row for the next flush. Returns True if the caller must schedule a flush."""
+    global _flush_scheduled
+    row = {
+        "user_id": int(user_id),
+        "type": str(ntype),
+        "payload": dict(payload or {}),
+        "priority": str(priority or "normal"),
+        "created_at": created_at,
+        "read_at": None,
+    }
+    with _pending_lock:
+        _pending_rows.append(row)
+        if _flush_scheduled:
+            return False
+        _flush_scheduled = True
+        return True
+
+
 def _append_in_memory(user_id: int, record: Dict[str, Any]) -> None:
     bucket = _inmem.setdefault(int(user_id), [])
     bucket.append(record)
@@ -101,15 +132,18 @@ def create_notification(user_id: int, ntype: str, payload: Optional[Dict[str, An
     except Exception:
         pass
 
-    # Best-effort DB persistence
+    # Best-effort DB persistence; notifications created before the flush runs share one INSERT
     if _db_available():
         try:
-            try:
-                loop = asyncio.get_running_loop()
-                loop.create_task(_insert_notification_async(user_id, ntype, payload or {}, priority, created_at))
-            except RuntimeError:
-                asyncio.run(_insert_notification_async(user_id, ntype, payload or {}, priority, created_at))
+            if _buffer_notification_row(user_id, ntype, payload or {}, priority, created_at):
+                try:
+                    loop = asyncio.get_running_loop()
+                    loop.create_task(_flush_notifications_async())
+                except RuntimeError:
+                    asyncio.run(_flush_notifications_async())
         except Exception:  # pragma: no cover
+            # Drop the batch rather than leave the buffer waiting on a flush that never runs
+            _take_pending_rows()
             try:
                 logger.debug("notification_schedule_failed user_id=%s type=%s", user_id, ntype)
             except Exception:
@@ -675,7 +675,10 @@ async def _load_player_into_world(world, user_id: int) -> None:
             planet_meta = PlanetComp(name=planet.name, owner_id=orm_user.id)
 
             if ent_found is None:
-                world.create_entity(player, position, resources, production, buildings, build_queue, ship_queue, fleet, research, research_queue, planet_meta)
+                ent = world.create_entity(player, position, resources, production, buildings, build_queue, ship_queue, fleet, research, research_queue, planet_meta)
+                index = getattr(world, "user_index", None)
+                if index is not None:
+                    index[orm_user.id] = ent
             else:
                 # Update in-place
                 from src.models import Player as P, Position as Pos, Resources as Res, ResourceProduction as RP, Buildings as Bld, BuildQueue as BQ, ShipBuildQueue as SBQ, Fleet as Fl, Research as Rs, ResearchQueue as Rq, Planet as Pl
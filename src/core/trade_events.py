@@ -46,10 +46,36 @@ def _emit_ws_to_participants(payload: Dict[str, Any]) -> None:
             pass
 
 
-async def record_trade_event(event: TradeEventPayload, session=None) -> Dict[str, Any]:
+def publish_trade_event(payload: Dict[str, Any]) -> None:
+    """Announce a committed DB trade event: WebSocket to participants, log and metric."""
+    # Emit WS (best-effort)
+    _emit_ws_to_participants(payload)
+    try:
+        logger.info(
+            "trade_event_recorded_db",
+            extra={
+                "action_type": payload.get("type"),
+                "event_id": payload.get("id"),
+                "offer_id": payload.get("offer_id"),
+                "seller_user_id": payload.get("seller_user_id"),
+                "buyer_user_id": payload.get("buyer_user_id"),
+                "timestamp": payload.get("timestamp"),
+            },
+        )
+    except Exception:
+        pass
+    metrics.increment_event("db.trade_event_recorded")
+
+
+async def record_trade_event(event: TradeEventPayload, session=None, commit: bool = True) -> Dict[str, Any]:
     """Record a trade event in DB when enabled; otherwise append to in-memory.
 
     Returns the recorded event dict with id/timestamp populated when possible.
+
+    With commit=False the caller owns the transaction: the event row is only
+    flushed alongside the caller's pending rows, DB errors are re-raised instead
+    of falling back to the in-memory store, and the event is not published; call
+    publish_trade_event() with the returned payload after committing.
     """
     if is_db_enabled() and session is not None:
         try:
@@ -67,7 +93,10 @@ async def record_trade_event(event: TradeEventPayload, session=None) -> Dict[str
                 status=str(event.get("status")),
             )
             session.add(row)
-            await session.commit()
+            if commit:
+                await session.commit()
+            else:
+                await session.flush()
             payload: Dict[str, Any] = {
                 "id": int(row.id),
                 "type": row.type,
@@ -81,25 +110,12 @@ async def record_trade_event(event: TradeEventPayload, session=None) -> Dict[str
                 "status": row.status,
                 "timestamp": row.created_at.isoformat() if getattr(row, "created_at", None) else None,
             }
-            # Emit WS (best-effort)
-            _emit_ws_to_participants(payload)
-            try:
-                logger.info(
-                    "trade_event_recorded_db",
-                    extra={
-                        "action_type": payload.get("type"),
-                        "event_id": payload.get("id"),
-                        "offer_id": payload.get("offer_id"),
-                        "seller_user_id": payload.get("seller_user_id"),
-                        "buyer_user_id": payload.get("buyer_user_id"),
-                        "timestamp": payload.get("timestamp"),
-                    },
-                )
-            except Exception:
-                pass
-            metrics.increment_event("db.trade_event_recorded")
+            if commit:
+                publish_trade_event(payload)
             return payload
         except Exception:
+            if not commit:
+                raise
             # Fall through to in-memory as a safety net
             try:
                 logger.warning("trade_event_db_failed_fallback_inmem", exc_info=True)
@@ -227,6 +243,7 @@ def list_trade_history_in_memory(user_id: int, limit: int = 50, offset: int = 0,
 __all__ = [
     "TradeEventPayload",
     "record_trade_event",
+    "publish_trade_event",
     "record_trade_event_sync",
     "list_trade_history",
     "list_trade_history_in_memory",
@@ -20,19 +20,29 @@ from sqlalchemy import (
     Index,
     Float,
     JSON,
+    text,
 )
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import declarative_base, relationship, Mapped, mapped_column
 from src.core.time_utils import utc_now
 
 Base = declarative_base()
 
+# Binary JSONB on PostgreSQL (no re-parse on read, GIN-indexable); plain JSON elsewhere
+JSONType = JSON().with_variant(JSONB(), "postgresql")
+
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # The unique constraints' btrees also serve username/email lookups
+        UniqueConstraint("username", name="uq_users_username"),
+        UniqueConstraint("email", name="uq_users_email"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    username: Mapped[str] = mapped_column(String(50), unique=True, index=True, nullable=False)
-    email: Mapped[Optional[str]] = mapped_column(String(255), unique=True, index=True, nullable=True)
+    username: Mapped[str] = mapped_column(String(50), nullable=False)
+    email: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
     password_hash: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utc_now, nullable=False, index=True)
     last_login: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True, index=True)
@@ -45,8 +55,8 @@ class User(Base):
 class Planet(Base):
     __tablename__ = "planets"
     __table_args__ = (
+        # uq_owner_coord leads with owner_id, so it also serves per-owner lookups
         UniqueConstraint("owner_id", "galaxy", "system", "position", name="uq_owner_coord"),
-        Index("ix_planets_owner_id", "owner_id"),
         Index("ix_planets_coords", "galaxy", "system", "position"),
         Index("ix_planets_last_update", "last_update"),
     )
@@ -133,14 +143,14 @@ class Research(Base):
 class Notification(Base):
     __tablename__ = "notifications"
     __table_args__ = (
-        Index("ix_notifications_user_id", "user_id"),
+        Index("ix_notifications_user_created", "user_id", "created_at"),
         Index("ix_notifications_created_at", "created_at"),
     )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     type: Mapped[str] = mapped_column(String(50), nullable=False)
-    payload: Mapped[dict] = mapped_column(JSON, nullable=False, default=dict)
+    payload: Mapped[dict] = mapped_column(JSONType, nullable=False, default=dict)
     priority: Mapped[str] = mapped_column(String(20), nullable=False, default="normal")
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utc_now, nullable=False)
     read_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
@@ -149,7 +159,7 @@ class Notification(Base):
 class TradeOffer(Base):
     __tablename__ = "trade_offers"
     __table_args__ = (
-        Index("ix_trade_offers_status", "status"),
+        Index("ix_trade_offers_open", "created_at", postgresql_where=text("status = 'open'")),
         Index("ix_trade_offers_created_at", "created_at"),
         Index("ix_trade_offers_seller_id", "seller_user_id"),
         Index("ix_trade_offers_accepted_by", "accepted_by"),
@@ -192,15 +202,16 @@ class BattleReport(Base):
     __tablename__ = "battle_reports"
     __table_args__ = (
         Index("ix_battle_reports_created_at", "created_at"),
-        Index("ix_battle_reports_attacker", "attacker_user_id"),
-        Index("ix_battle_reports_defender", "defender_user_id"),
+        Index("ix_battle_reports_attacker_created", "attacker_user_id", "created_at"),
+        Index("ix_battle_reports_defender_created", "defender_user_id", "created_at"),
+        Index("ix_battle_reports_location_gin", "location", postgresql_using="gin"),
     )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     attacker_user_id: Mapped[int] = mapped_column(Integer, nullable=False)
     defender_user_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
-    location: Mapped[dict] = mapped_column(JSON, nullable=False, default=dict)
-    outcome: Mapped[dict] = mapped_column(JSON, nullable=False, default=dict)
+    location: Mapped[dict] = mapped_column(JSONType, nullable=False, default=dict)
+    outcome: Mapped[dict] = mapped_column(JSONType, nullable=False, default=dict)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow, nullable=False)
 
 
@@ -208,15 +219,15 @@ class EspionageReport(Base):
     __tablename__ = "espionage_reports"
     __table_args__ = (
         Index("ix_espionage_reports_created_at", "created_at"),
-        Index("ix_espionage_reports_attacker", "attacker_user_id"),
-        Index("ix_espionage_reports_defender", "defender_user_id"),
+        Index("ix_espionage_reports_attacker_created", "attacker_user_id", "created_at"),
+        Index("ix_espionage_reports_defender_created", "defender_user_id", "created_at"),
     )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     attacker_user_id: Mapped[int] = mapped_column(Integer, nullable=False)
     defender_user_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
-    location: Mapped[dict] = mapped_column(JSON, nullable=False, default=dict)
-    snapshot: Mapped[dict] = mapped_column(JSON, nullable=False, default=dict)
+    location: Mapped[dict] = mapped_column(JSONType, nullable=False, default=dict)
+    snapshot: Mapped[dict] = mapped_column(JSONType, nullable=False, default=dict)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow, nullable=False)
 
 
@@ -263,9 +274,7 @@ class FleetMission(Base):
 class BuildingQueueItem(Base):
     __tablename__ = "building_queue"
     __table_args__ = (
-        Index("ix_build_queue_planet_id", "planet_id"),
-        Index("ix_build_queue_complete_at", "complete_at"),
-        Index("ix_build_queue_status", "status"),
+        Index("ix_build_queue_pending", "planet_id", "complete_at", postgresql_where=text("status = 'pending'")),
     )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
@@ -280,9 +289,7 @@ class BuildingQueueItem(Base):
 class ResearchQueueItem(Base):
     __tablename__ = "research_queue"
     __table_args__ = (
-        Index("ix_research_queue_user_id", "user_id"),
-        Index("ix_research_queue_complete_at", "complete_at"),
-        Index("ix_research_queue_status", "status"),
+        Index("ix_research_queue_pending", "user_id", "complete_at", postgresql_where=text("status = 'pending'")),
     )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
@@ -10,6 +10,15 @@ from src.core.sync import upsert_fleet
 logger = logging.getLogger(__name__)
 
 
+def _record_colony(galaxy: int, system: int, position: int) -> None:
+    """Add a completed colony to the shared planet occupancy index best-effort."""
+    try:
+        from src.core.state import game_world
+        game_world.record_planet_occupied(galaxy, system, position)
+    except Exception:
+        pass
+
+
 class FleetMovementSystem(esper.Processor):
     """ECS processor that finalizes fleet movements upon arrival.
 
@@ -108,6 +117,7 @@ class FleetMovementSystem(esper.Processor):
                             except Exception:
                                 ok = True
                             if ok:
+                                _record_colony(target_g, target_s, target_p)
                                 try:
                                     c = int(getattr(fleet, "colony_ship", 0))
                                     setattr(fleet, "colony_ship", max(0, c - 1))
@@ -174,6 +184,7 @@ class FleetMovementSystem(esper.Processor):
 
                     # Consume colony ship on success
                     if ok:
+                        _record_colony(target_g, target_s, target_p)
                         try:
                             c = int(getattr(fleet, "colony_ship", 0))
                             setattr(fleet, "colony_ship", max(0, c - 1))
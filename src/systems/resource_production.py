@@ -21,9 +21,55 @@ from src.core.config import (
     size_multiplier,
     STORAGE_BASE_CAPACITY,
     STORAGE_CAPACITY_GROWTH,
+    ENERGY_DEFICIT_SOFT_FLOOR,
+    ENERGY_DEFICIT_NOTIFY_THRESHOLD,
+    GROWTH_POW_TABLE_SIZE,
+    ENERGY_SOLAR_GROWTH_POW,
+    FUSION_ENERGY_GROWTH_POW,
+    ENERGY_CONSUMPTION_GROWTH_POW,
 )
-from src.api.ws import send_to_user
+from src.api.ws import send_to_user, queue_depth, LOW_PRIORITY_MAX_DEPTH
 from src.core.metrics import metrics
+from src.core.notifications import create_notification_with_cooldown as _notify_cd
+
+
+def _growth(table: tuple, growth: float, lvl: int) -> float:
+    """growth ** max(0, lvl - 1), read from the precomputed table when in range."""
+    k = lvl - 1 if lvl > 0 else 0
+    return table[k] if k < GROWTH_POW_TABLE_SIZE else growth ** k
+
+
+def _consumption(base: float, lvl: int) -> float:
+    """Energy consumption for a building level with optional non-linear growth."""
+    lvl = max(0, int(lvl))
+    return base * lvl * _growth(ENERGY_CONSUMPTION_GROWTH_POW, ENERGY_CONSUMPTION_GROWTH, lvl)
+
+
+def energy_balance(buildings: Buildings, energy_lvl: int = 0) -> tuple[float, float, float]:
+    """Return (produced, required, factor_raw) energy for one planet's buildings.
+
+    factor_raw is the share of required energy that is produced, capped at 1.0
+    (1.0 when nothing is required); the production tick applies
+    ENERGY_DEFICIT_SOFT_FLOOR on top of it.
+    """
+    energy_bonus_factor = 1.0 + (ENERGY_TECH_ENERGY_BONUS_PER_LEVEL * energy_lvl)
+    sp_lvl = max(0, int(getattr(buildings, 'solar_plant', 0)))
+    solar_rate = ENERGY_SOLAR_BASE * sp_lvl * _growth(ENERGY_SOLAR_GROWTH_POW, ENERGY_SOLAR_GROWTH, sp_lvl)
+    fr_lvl = max(0, int(getattr(buildings, 'fusion_reactor', 0)))
+    fusion_rate = FUSION_ENERGY_BASE * fr_lvl * _growth(FUSION_ENERGY_GROWTH_POW, FUSION_ENERGY_GROWTH, fr_lvl)
+    produced = (solar_rate + fusion_rate) * energy_bonus_factor
+    # Consumption with optional non-linear growth per level
+    required = 0.0
+    required += _consumption(ENERGY_CONSUMPTION.get('metal_mine', 0.0), getattr(buildings, 'metal_mine', 0))
+    required += _consumption(ENERGY_CONSUMPTION.get('crystal_mine', 0.0), getattr(buildings, 'crystal_mine', 0))
+    required += _consumption(ENERGY_CONSUMPTION.get('deuterium_synthesizer', 0.0), getattr(buildings, 'deuterium_synthesizer', 0))
+    if required <= 0:
+        factor_raw = 1.0
+    elif produced <= 0:
+        factor_raw = 0.0
+    else:
+        factor_raw = min(1.0, produced / required)
+    return produced, required, factor_raw
 
 
 class ResourceProductionSystem(esper.Processor):
@@ -34,10 +80,21 @@ class ResourceProductionSystem(esper.Processor):
         current_time = utc_now()
 
         world_obj = getattr(self, "world", None)
-        getter = getattr(world_obj, "get_components", esper.get_components)
-        for ent, (resources, production, buildings) in getter(
-            Resources, ResourceProduction, Buildings
-        ):
+        columns = getattr(world_obj, "get_columns", None)
+        if columns is not None:
+            # Walk archetype columns directly (no per-entity tuple unpacking)
+            rows = (
+                row
+                for ents, (res_col, prod_col, bld_col) in columns(Resources, ResourceProduction, Buildings)
+                for row in zip(ents, res_col, prod_col, bld_col)
+            )
+        else:
+            getter = getattr(world_obj, "get_components", esper.get_components)
+            rows = (
+                (ent, res, prod, bld)
+                for ent, (res, prod, bld) in getter(Resources, ResourceProduction, Buildings)
+            )
+        for ent, resources, production, buildings in rows:
             # Calculate time difference in hours (normalize to aware UTC)
             last_update_utc = ensure_aware_utc(production.last_update)
             time_diff = (current_time - last_update_utc).total_seconds() / 3600.0
@@ -54,30 +111,13 @@ class ResourceProductionSystem(esper.Processor):
                     pass
 
                 # Energy balance: production and consumption (+energy tech bonus)
-                energy_bonus_factor = 1.0 + (ENERGY_TECH_ENERGY_BONUS_PER_LEVEL * energy_lvl)
-                sp_lvl = max(0, int(getattr(buildings, 'solar_plant', 0)))
-                solar_rate = ENERGY_SOLAR_BASE * sp_lvl * (ENERGY_SOLAR_GROWTH ** max(0, sp_lvl - 1))
-                fr_lvl = max(0, int(getattr(buildings, 'fusion_reactor', 0)))
-                fusion_rate = FUSION_ENERGY_BASE * fr_lvl * (FUSION_ENERGY_GROWTH ** max(0, fr_lvl - 1))
-                energy_produced = (solar_rate + fusion_rate) * energy_bonus_factor
-                # Consumption with optional non-linear growth per level
-                def _consumption(base: float, lvl: int) -> float:
-                    lvl = max(0, int(lvl))
-                    return base * lvl * (ENERGY_CONSUMPTION_GROWTH ** max(0, lvl - 1))
-                energy_required = 0.0
-                energy_required += _consumption(ENERGY_CONSUMPTION.get('metal_mine', 0.0), getattr(buildings, 'metal_mine', 0))
-                energy_required += _consumption(ENERGY_CONSUMPTION.get('crystal_mine', 0.0), getattr(buildings, 'crystal_mine', 0))
-                energy_required += _consumption(ENERGY_CONSUMPTION.get('deuterium_synthesizer', 0.0), getattr(buildings, 'deuterium_synthesizer', 0))
+                energy_produced, energy_required, factor_raw = energy_balance(buildings, energy_lvl)
                 # Apply energy factor with soft floor when there is some production and some requirement
                 if energy_required <= 0:
-                    factor_raw = 1.0
                     factor = 1.0
                 elif energy_produced <= 0:
-                    factor_raw = 0.0
                     factor = 0.0
                 else:
-                    factor_raw = min(1.0, energy_produced / energy_required)
-                    from src.core.config import ENERGY_DEFICIT_SOFT_FLOOR, ENERGY_DEFICIT_NOTIFY_THRESHOLD
                     factor = max(float(ENERGY_DEFICIT_SOFT_FLOOR), float(factor_raw))
                     # Emit a warning notification when severe deficit occurs (below or equal to threshold)
                     if float(factor_raw) < 1.0 and float(factor_raw) <= float(ENERGY_DEFICIT_NOTIFY_THRESHOLD):
@@ -87,7 +127,6 @@ class ResourceProductionSystem(esper.Processor):
                         except Exception:
                             pass
                         try:
-                            from src.core.notifications import create_notification_with_cooldown as _notify_cd
                             # Attempt to fetch player and planet for context
                             user_id = 0
                             planet_name = None
@@ -173,7 +212,6 @@ class ResourceProductionSystem(esper.Processor):
 
                 # Optional storage-full notification (best-effort, rate-limited)
                 try:
-                    from src.core.notifications import create_notification_with_cooldown as _notify_cd
                     # Attempt to fetch player and planet for context
                     _uid = 0
                     _pname = None
@@ -234,7 +272,8 @@ class ResourceProductionSystem(esper.Processor):
                 try:
                     player = self.world.component_for_entity(ent, Player)
                     user_id = int(getattr(player, 'user_id', 0))
-                    if user_id:
+                    # Skippable: the next update carries fresh totals, so back off while the client lags
+                    if user_id and queue_depth(user_id) < LOW_PRIORITY_MAX_DEPTH:
                         send_to_user(user_id, {
                             "type": "resource_update",
                             "deltas": {"metal": add_m, "crystal": add_c, "deuterium": add_d - cons_d},
@@ -63,3 +63,280 @@ def test_fleet_endpoints_build_ships_and_get_queue():
         assert r.status_code == 200
         payload = r.json()
         assert any(item.get("type") == "light_fighter" for item in payload.get("ship_build_queue", []))
+
+
+def test_fleet_read_does_not_tick_the_world_by_default(monkeypatch):
+    import threading
+    from src.core import config
+    from src.core.state import game_world
+
+    monkeypatch.setattr(config, "SETTLE_WORLD_ON_READ", False)
+    with TestClient(app) as client:
+        uid, token = _register_and_login(client, username="fleetread", email="fleetread@example.com")
+        ticks = []
+        real_process_commands = game_world._process_commands
+
+        def spy():
+            # The background game loop keeps ticking; only count ticks driven by the request
+            if threading.current_thread() is not game_world.game_thread:
+                ticks.append("request")
+            real_process_commands()
+
+        monkeypatch.setattr(game_world, "_process_commands", spy)
+        r = client.get(f"/player/{uid}/fleet", headers={"Authorization": f"Bearer {token}"})
+        assert r.status_code == 200, r.text
+        assert "fleet" in r.json()
+        assert ticks == []
+
+
+def test_build_ships_rejects_orders_over_fleet_cap():
+    from src.core.state import game_world
+    from src.models import Fleet
+    import src.core.config as cfg
+
+    with TestClient(app) as client:
+        uid, token = _register_and_login(client, username="capuser", email="cap@example.com")
+        _ent, (fleet,) = game_world.player_components(uid, Fleet)
+        fleet.light_fighter = cfg.BASE_MAX_FLEET_SIZE - 2
+        fleet.cruiser = 1
+        r = client.post(
+            f"/player/{uid}/build-ships",
+            headers={"Authorization": f"Bearer {token}"},
+            json={"ship_type": "light_fighter", "quantity": 2},
+        )
+        assert r.status_code == 400
+        assert r.json()["detail"] == "Fleet size cap exceeded"
+
+def test_me_caches_only_positive_planet_checks(monkeypatch):
+    import src.core.config as cfg
+    from src.auth import security
+    from src.core.state import game_world
+    from src.models import Player, Position
+
+    monkeypatch.setattr(cfg, "REQUIRE_START_CHOICE", True)
+    with TestClient(app) as client:
+        uid, token = _register_and_login(client, "cacheuser", "cache@example.com")
+        headers = {"Authorization": f"Bearer {token}"}
+        # Drop entities left behind for this id by earlier tests sharing the world
+        for ent in [e for e, p in game_world.world.get_component(Player) if p.user_id == uid]:
+            game_world.world.delete_entity(ent)
+        assert client.get("/auth/me", headers=headers).json()["needs_start_choice"] is True
+        assert not security.user_has_planet_cached(uid)
+
+        game_world.world.create_entity(Player(name="cacheuser", user_id=uid), Position())
+        assert client.get("/auth/me", headers=headers).json()["needs_start_choice"] is False
+        assert security.user_has_planet_cached(uid)
+
+
+def test_bootstrap_registers_then_logs_in_existing_user(monkeypatch):
+    from src.api import auth
+
+    with TestClient(app) as client:
+        body = {"username": "bootuser", "email": "boot@example.com", "password": "Password123!"}
+        r = client.post("/auth/bootstrap", json=body)
+        assert r.status_code == 200, r.text
+        first = r.json()
+        assert first["access_token"] and first["token_type"] == "bearer"
+
+        # Same credentials again: logs in instead of failing on the taken username,
+        # without hashing a password that will never be stored
+        async def _no_hash(password):
+            raise AssertionError("existing user should not be hashed again")
+
+        monkeypatch.setattr(auth, "hash_password_async", _no_hash)
+        r = client.post("/auth/bootstrap", json=body)
+        assert r.status_code == 200, r.text
+        assert r.json()["id"] == first["id"]
+        r = client.get("/auth/me", headers={"Authorization": f"Bearer {r.json()['access_token']}"})
+        assert r.json()["username"] == "bootuser"
+
+        r = client.post("/auth/bootstrap", json={**body, "password": "WrongPass123!"})
+        assert r.status_code == 401
+
+
+def test_cached_token_user_is_dropped_on_logout():
+    from src.auth import security
+
+    with TestClient(app) as client:
+        _uid, token = _register_and_login(client, "tokcache", "tokcache@example.com")
+        headers = {"Authorization": f"Bearer {token}"}
+        assert client.get("/auth/me", headers=headers).status_code == 200
+        assert token in security._TOKEN_USER_CACHE
+        assert client.post("/auth/logout", headers=headers).status_code == 200
+        assert token not in security._TOKEN_USER_CACHE
+        assert client.get("/auth/me", headers=headers).status_code == 401
+
+
+def test_last_login_updates_are_buffered_until_flush():
+    import asyncio
+    from src.auth import security
+    from src.core.time_utils import utc_now
+
+    async def scenario():
+        security.record_last_login(7, utc_now())
+        security.record_last_login(7, utc_now())
+        security.record_last_login(8, utc_now())
+        assert sorted(security._PENDING_LAST_LOGIN) == [7, 8]
+        await security.flush_last_logins()
+        assert security._PENDING_LAST_LOGIN == {}
+
+    asyncio.run(scenario())
+
+
+def test_scheduled_last_login_flush_task_is_kept_alive(monkeypatch):
+    import asyncio
+    from src.auth import security
+    from src.core.time_utils import utc_now
+
+    monkeypatch.setattr(security, "LAST_LOGIN_FLUSH_SECONDS", 0.0)
+    # A flush scheduled on an earlier test's (closed) loop never ran
+    monkeypatch.setattr(security, "_LAST_LOGIN_FLUSH_SCHEDULED", False)
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def slow_flush():
+            await release.wait()
+
+        monkeypatch.setattr(security, "flush_last_logins", slow_flush)
+        security.record_last_login(9, utc_now())
+        await asyncio.sleep(0.01)  # timer fires and starts the flush task
+        assert len(security._LAST_LOGIN_FLUSH_TASKS) == 1
+        release.set()
+        await asyncio.sleep(0.01)
+        assert not security._LAST_LOGIN_FLUSH_TASKS
+
+    asyncio.run(scenario())
+    security._PENDING_LAST_LOGIN.clear()
+
+
+def test_each_login_gets_its_own_token():
+    with TestClient(app) as client:
+        _uid, token = _register_and_login(client, "reuse", "reuse@example.com")
+        r = client.post("/auth/login", json={"username": "reuse", "password": "Password123!"})
+        other = r.json()["access_token"]
+        assert other != token
+        # Logging out one session leaves the other signed in
+        client.post("/auth/logout", headers={"Authorization": f"Bearer {token}"})
+        assert client.get("/auth/me", headers={"Authorization": f"Bearer {other}"}).status_code == 200
+
+
+def test_register_payload_errors_keep_the_400_contract():
+    with TestClient(app) as client:
+        bad = [
+            ({"username": "ab", "email": "ab@example.com", "password": "Password123!"}, "Username too short"),
+            ({"username": "abc", "email": "not-an-email", "password": "Password123!"}, "Invalid email"),
+            ({"username": "abc", "email": "abc@example.com", "password": "short"}, "Password too short (min 8)"),
+            # Several violations report the first check, as validate_basic did
+            ({"username": "ab", "email": "nope", "password": "short"}, "Username too short"),
+        ]
+        for payload, detail in bad:
+            for path in ("/auth/register", "/auth/bootstrap"):
+                r = client.post(path, json=payload)
+                assert r.status_code == 400, r.text
+                assert r.json() == {"detail": detail}
+        # Missing fields are still FastAPI's standard 422, as before
+        r = client.post("/auth/register", json={"username": "abc"})
+        assert r.status_code == 422
+        assert isinstance(r.json()["detail"], list)
+
+
+def test_blacklist_drops_entries_once_tokens_expire(monkeypatch):
+    from src.auth import security
+
+    expired = security.create_access_token("1", expires_minutes=-1)
+    fresh = security.create_access_token("1")
+    monkeypatch.setattr(security, "_BLACKLIST_NEXT_SWEEP", float("inf"))
+    security.blacklist_token(expired)
+    assert expired in security._TOKEN_BLACKLIST
+
+    monkeypatch.setattr(security, "_BLACKLIST_NEXT_SWEEP", 0.0)
+    security.blacklist_token(fresh)
+    assert expired not in security._TOKEN_BLACKLIST
+    assert fresh in security._TOKEN_BLACKLIST
+    security._TOKEN_BLACKLIST.pop(fresh, None)
+
+
+def test_decoded_token_cache_reuses_claims_until_blacklisted(monkeypatch):
+    from src.auth import security
+
+    token = security.create_access_token("5")
+    calls = []
+    real_decode = security.decode_token
+    monkeypatch.setattr(security, "decode_token", lambda t: calls.append(t) or real_decode(t))
+
+    assert security.decode_token_cached(token)["sub"] == "5"
+    assert security.decode_token_cached(token)["sub"] == "5"
+    assert len(calls) == 1
+
+    security.blacklist_token(token)
+    security.decode_token_cached(token)
+    assert len(calls) == 2
+    security._TOKEN_BLACKLIST.pop(token, None)
+    security._DECODED_TOKEN_CACHE.pop(token, None)
+
+
+def test_ensure_player_loaded_skips_the_load_path_for_indexed_players(monkeypatch):
+    from src.api import auth
+
+    with TestClient(app) as client:
+        uid, _token = _register_and_login(client, username="indexed", email="indexed@example.com")
+        loads = []
+        monkeypatch.setattr(auth.game_world, "load_player_data", lambda user_id: loads.append(user_id))
+        monkeypatch.setattr(auth.game_world, "get_player_data", lambda user_id: None)
+        assert auth.ensure_player_loaded(uid) is True
+        assert loads == []
+
+
+def test_get_current_user_reuses_decoded_claims_after_the_user_cache_expires(monkeypatch):
+    import asyncio
+    from src.auth import security
+
+    with TestClient(app) as client:
+        uid, token = _register_and_login(client, username="claimsreuse", email="claimsreuse@example.com")
+        calls = []
+        real_decode = security.decode_token
+        monkeypatch.setattr(security, "decode_token", lambda t: calls.append(t) or real_decode(t))
+        security._DECODED_TOKEN_CACHE.pop(token, None)
+        for _ in range(2):
+            security._TOKEN_USER_CACHE.pop(token, None)
+            user = asyncio.run(security.get_current_user(token=token, session=None))
+            assert user.id == uid
+        assert len(calls) == 1
+
+
+def test_rate_limiter_refills_continuously(monkeypatch):
+    from types import SimpleNamespace
+    import pytest
+    from fastapi import HTTPException
+    from src.auth import security
+
+    clock = [1000.0]
+    monkeypatch.setattr(security, "time", SimpleNamespace(monotonic=lambda: clock[0], time=security.time.time))
+    monkeypatch.setattr(security, "RATE_LIMIT_PER_MINUTE", 3)
+    security._RATE_LIMIT_STATE.pop(-5, None)
+    for _ in range(3):
+        security.rate_limit_check(-5)
+    with pytest.raises(HTTPException) as exc:
+        security.rate_limit_check(-5)
+    assert exc.value.status_code == 429
+    clock[0] += 20.0  # one token back at 3/minute
+    security.rate_limit_check(-5)
+    with pytest.raises(HTTPException):
+        security.rate_limit_check(-5)
+    security._RATE_LIMIT_STATE.pop(-5, None)
+
+
+def test_login_rehashes_passwords_stored_with_a_deprecated_scheme(monkeypatch):
+    from src.api import auth
+
+    with TestClient(app) as client:
+        _register_and_login(client, username="rehash", email="rehash@example.com")
+        user = auth.mem_get_user_by_username("rehash")
+        old_hash = user.password_hash
+        monkeypatch.setattr(auth, "password_needs_rehash", lambda h: h == old_hash)
+        r = client.post("/auth/login", json={"username": "rehash", "password": "Password123!"})
+        assert r.status_code == 200, r.text
+        assert user.password_hash != old_hash
+        r = client.post("/auth/login", json={"username": "rehash", "password": "Password123!"})
+        assert r.status_code == 200, r.text
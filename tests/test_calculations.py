@@ -25,3 +25,12 @@ def test_calculate_building_cost_unknown_building_safe_defaults():
 
     assert cost == {'metal': 0, 'crystal': 0, 'deuterium': 0}
     assert isinstance(time_s, int)
+
+
+def test_growth_table_matches_pow_inside_and_past_the_table():
+    from src.systems.resource_production import _growth
+
+    growth = 1.1
+    table = tuple(growth ** k for k in range(64))
+    for lvl in (0, 1, 2, 30, 64, 65, 100):
+        assert _growth(table, growth, lvl) == growth ** max(0, lvl - 1)
@@ -14,7 +14,12 @@ def _register_and_login(client: TestClient, username: str = "colonist", email: s
     return user_id, token
 
 
-def test_build_colony_ship_and_colonize():
+def test_build_colony_ship_and_colonize(monkeypatch):
+    from src.core import config
+
+    # Fleet reads settle due completions first, so assertions right after the
+    # short sleeps below do not race the background game loop
+    monkeypatch.setattr(config, "SETTLE_WORLD_ON_READ", True)
     with TestClient(app) as client:
         uid, token = _register_and_login(client)
 
@@ -52,3 +57,48 @@ def test_build_colony_ship_and_colonize():
         assert r.status_code == 200
         after_fleet = r.json().get("fleet", {})
         assert after_fleet.get("colony_ship", 0) == max(0, fleet.get("colony_ship", 0) - 1)
+
+
+
+def test_colonized_positions_leave_the_cached_available_list(monkeypatch):
+    from datetime import timedelta
+    from src.core import config
+    from src.core.state import game_world
+    from src.core.time_utils import utc_now
+    from src.models import Fleet, FleetMovement, Position
+    from src.systems.fleet_movement import FleetMovementSystem
+
+    monkeypatch.setattr(config, "PLANET_OCCUPANCY_CACHE_SECONDS", 60.0)
+    with TestClient(app) as client:
+        uid, _token = _register_and_login(client, "settler", "settler@example.com")
+        params = {"limit": 50}
+
+        # Prime the occupancy cache while the target slots are still free
+        before = client.get("/planets/available", params=params).json()["available"]
+        assert len(before) >= 2
+        first, second = before[0], before[1]
+        ent, (fleet,) = game_world.player_components(uid, Fleet)
+        fleet.colony_ship = 2
+
+        # Immediate colonize command
+        game_world.apply_command({"type": "colonize", "user_id": uid, **first})
+        # Colonize mission finishing in the fleet movement system
+        now = utc_now()
+        game_world.world.add_component(ent, FleetMovement(
+            origin=Position(galaxy=1, system=1, planet=1),
+            target=Position(galaxy=second["galaxy"], system=second["system"], planet=second["position"]),
+            departure_time=now - timedelta(seconds=10),
+            arrival_time=now - timedelta(seconds=5),
+            speed=1.0,
+            mission="colonize",
+            owner_id=uid,
+        ))
+        system = FleetMovementSystem()
+        system.world = game_world.world
+        system.process()
+        system.process()
+        assert fleet.colony_ship == 0
+
+        after = client.get("/planets/available", params=params).json()["available"]
+        assert first not in after
+        assert second not in after
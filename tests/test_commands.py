@@ -0,0 +1,10 @@
+from src.core.commands import parse_build_ships, parse_cancel_build_queue, parse_colonize, parse_fleet_dispatch
+
+
+def test_parsers_accept_typed_and_raw_values_alike():
+    assert parse_build_ships({"user_id": 3, "ship_type": "cruiser", "quantity": 2}) == (3, "cruiser", 2)
+    assert parse_build_ships({"user_id": "3", "ship_type": "cruiser", "quantity": "x"}) == (3, "cruiser", 1)
+    assert parse_colonize({"user_id": 1, "galaxy": 0, "system": "4", "position": 9}) == (1, 1, 4, 9, "Colony")
+    assert parse_cancel_build_queue({"user_id": 1, "index": None}) == (1, None)
+    assert parse_cancel_build_queue({"user_id": 1, "index": "2"}) == (1, 2)
+    assert parse_fleet_dispatch({"user_id": True, "speed": "fast", "ships": [1]}) == (1, 1, 1, 1, "transfer", None, None)
@@ -0,0 +1,47 @@
+import asyncio
+
+from src.core import database
+
+
+class _FakeConn:
+    def __init__(self, engine):
+        self.engine = engine
+
+    async def __aenter__(self):
+        self.engine.open += 1
+        self.engine.peak = max(self.engine.peak, self.engine.open)
+        return self
+
+    async def __aexit__(self, *exc):
+        self.engine.open -= 1
+        return False
+
+    async def execute(self, stmt):
+        await asyncio.sleep(0)
+        self.engine.statements.append(str(stmt))
+
+
+class _FakeEngine:
+    def __init__(self):
+        self.open = 0
+        self.peak = 0
+        self.statements = []
+
+    def connect(self):
+        return _FakeConn(self)
+
+
+def test_warm_pool_opens_connections_concurrently(monkeypatch):
+    primary, replica = _FakeEngine(), _FakeEngine()
+    monkeypatch.setattr(database, "engine", primary)
+    monkeypatch.setattr(database, "_replica_engines", [replica])
+    monkeypatch.setattr(database, "_DB_ENABLED", True)
+
+    assert asyncio.run(database.warm_pool(3)) == 6
+    assert primary.statements == ["SELECT 1"] * 3
+    assert primary.peak == 3 and replica.peak == 3
+
+
+def test_warm_pool_is_a_noop_when_db_disabled(monkeypatch):
+    monkeypatch.setattr(database, "_DB_ENABLED", False)
+    assert asyncio.run(database.warm_pool(3)) == 0
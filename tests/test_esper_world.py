@@ -0,0 +1,283 @@
+import esper
+
+from src.models import Position, Resources, Fleet, FleetMovement
+from src.core.time_utils import utc_now
+
+
+def test_get_components_only_visits_matching_archetypes():
+    world = esper.World()
+    a = world.create_entity(Position(), Resources(metal=1))
+    b = world.create_entity(Position(), Resources(metal=2), Fleet())
+    _ = world.create_entity(Fleet())
+
+    rows = {eid: comps for eid, comps in world.get_components(Resources, Position)}
+    assert set(rows) == {a, b}
+    res_a, pos_a = rows[a]
+    assert isinstance(res_a, Resources) and res_a.metal == 1
+    assert isinstance(pos_a, Position)
+    assert [eid for eid, _ in world.get_components(Fleet)] == [b, 3]
+
+
+def test_add_and_remove_component_migrate_entity_between_archetypes():
+    world = esper.World()
+    pos = Position(galaxy=2)
+    e1 = world.create_entity(pos, Fleet())
+    e2 = world.create_entity(Position(galaxy=3), Fleet())
+    now = utc_now()
+    mv = FleetMovement(origin=Position(), target=Position(), departure_time=now, arrival_time=now)
+
+    world.add_component(e1, mv)
+    assert world.component_for_entity(e1, FleetMovement) is mv
+    assert world.component_for_entity(e1, Position) is pos
+    # The swapped-in entity keeps its own components
+    assert world.component_for_entity(e2, Position).galaxy == 3
+    assert [eid for eid, _ in world.get_components(FleetMovement)] == [e1]
+
+    world.remove_component(e1, FleetMovement)
+    assert list(world.get_components(FleetMovement)) == []
+    assert world.component_for_entity(e1, Position) is pos
+    try:
+        world.component_for_entity(e1, FleetMovement)
+        assert False, "FleetMovement should be gone"
+    except KeyError:
+        pass
+
+
+def test_components_can_be_removed_while_iterating():
+    world = esper.World()
+    now = utc_now()
+    ents = [
+        world.create_entity(Position(), FleetMovement(origin=Position(), target=Position(), departure_time=now, arrival_time=now))
+        for _ in range(5)
+    ]
+    seen = []
+    for eid, (_mv,) in world.get_components(FleetMovement):
+        seen.append(eid)
+        world.remove_component(eid, FleetMovement)
+    assert sorted(seen) == ents
+    assert [eid for eid, _ in world.get_components(Position)] != []
+    assert list(world.get_components(FleetMovement)) == []
+
+
+def test_delete_entity_and_get_component():
+    world = esper.World()
+    e1 = world.create_entity(Position(galaxy=1))
+    e2 = world.create_entity(Position(galaxy=2))
+    world.delete_entity(e1)
+    assert [(eid, p.galaxy) for eid, p in world.get_component(Position)] == [(e2, 2)]
+
+
+def test_query_cache_picks_up_new_archetypes():
+    world = esper.World()
+    a = world.create_entity(Position())
+    assert [eid for eid, _ in world.get_components(Position)] == [a]
+    # A new archetype containing Position must invalidate the cached match list
+    b = world.create_entity(Position(), Fleet())
+    assert sorted(eid for eid, _ in world.get_components(Position)) == [a, b]
+
+
+def test_deleted_entity_ids_are_recycled():
+    world = esper.World()
+    e1 = world.create_entity(Position())
+    e2 = world.create_entity(Position())
+    world.delete_entity(e1)
+    e3 = world.create_entity(Fleet())
+    assert e3 == e1
+    assert world.component_for_entity(e3, Fleet) is not None
+    assert [eid for eid, _ in world.get_components(Position)] == [e2]
+
+
+def test_get_columns_yields_aligned_columns_per_archetype():
+    world = esper.World()
+    a = world.create_entity(Position(galaxy=1), Resources(metal=10))
+    b = world.create_entity(Position(galaxy=2), Resources(metal=20), Fleet())
+    world.create_entity(Fleet())
+
+    seen = {}
+    for entities, (resources, positions) in world.get_columns(Resources, Position):
+        assert len(entities) == len(resources) == len(positions)
+        for eid, res, pos in zip(entities, resources, positions):
+            seen[eid] = (res.metal, pos.galaxy)
+    assert seen == {a: (10, 1), b: (20, 2)}
+
+
+def test_query_orderings_share_one_cache_entry():
+    world = esper.World()
+    e = world.create_entity(Position(), Resources())
+    assert [eid for eid, _ in world.get_components(Position, Resources)] == [e]
+    assert [eid for eid, _ in world.get_components(Resources, Position)] == [e]
+    assert len(world._query_cache) == 1
+    # Component order in each row still follows the caller's order
+    (_, (res, pos)), = world.get_components(Resources, Position)
+    assert isinstance(res, Resources) and isinstance(pos, Position)
+
+
+def test_processor_added_during_process_runs_from_next_tick():
+    world = esper.World()
+    calls = []
+
+    class Late(esper.Processor):
+        def process(self):
+            calls.append("late")
+
+    class Spawner(esper.Processor):
+        def process(self):
+            calls.append("spawner")
+            if len(calls) == 1:
+                self.world.add_processor(Late())
+
+    world.add_processor(Spawner())
+    world.process()
+    assert calls == ["spawner"]
+    world.process()
+    assert calls == ["spawner", "spawner", "late"]
+
+
+def test_player_entity_index_tracks_recreated_entities():
+    from src.core.game import GameWorld
+    from src.models import Player
+
+    gw = GameWorld()
+    assert gw.player_entity(7) is None
+
+    e1 = gw.world.create_entity(Player(name="p7", user_id=7), Position())
+    assert gw.player_entity(7) == e1
+    assert gw.user_index[7] == e1
+
+    # A stale index entry whose id was recycled for another user is not trusted
+    gw.world.delete_entity(e1)
+    e2 = gw.world.create_entity(Player(name="p8", user_id=8))
+    assert e2 == e1
+    assert gw.player_entity(7) is None
+    assert gw.player_entity(8) == e2
+    assert gw.has_player(8)
+
+
+def test_player_entity_miss_rescans_only_after_world_changes(monkeypatch):
+    from src.core.game import GameWorld
+    from src.models import Player
+
+    gw = GameWorld()
+    gw.world.create_entity(Player(name="p1", user_id=1))
+    scans = []
+    real_get_component = gw.world.get_component
+    monkeypatch.setattr(gw.world, "get_component", lambda ctype: scans.append(ctype) or real_get_component(ctype))
+
+    assert gw.player_entity(2) is None
+    assert gw.player_entity(2) is None
+    assert gw.has_player(2) is False
+    assert len(scans) == 1
+
+    e2 = gw.world.create_entity(Player(name="p2", user_id=2))
+    assert gw.player_entity(2) == e2
+    assert len(scans) == 2
+
+
+
+def test_player_entity_rebuild_keeps_the_first_duplicate():
+    from src.core.game import GameWorld
+    from src.models import Player
+
+    gw = GameWorld()
+    first = gw.world.create_entity(Player(name="dup", user_id=5), Position())
+    gw.world.create_entity(Player(name="dup", user_id=5), Position())
+    # Same entity the old linear scan over get_component(Player) returned
+    expected = next(e for e, p in gw.world.get_component(Player) if p.user_id == 5)
+    assert expected == first
+    assert gw.player_entity(5) == first
+
+def test_player_components_requires_every_requested_type():
+    from src.core.game import GameWorld
+    from src.models import Player
+
+    gw = GameWorld()
+    pos = Position()
+    ent = gw.world.create_entity(Player(name="p9", user_id=9), pos)
+    assert gw.player_components(9, Position) == (ent, (pos,))
+    assert gw.player_components(9, Position, Fleet) is None
+    assert gw.player_components(10, Position) is None
+
+
+def test_try_component_returns_none_for_missing_components():
+    world = esper.World()
+    pos = Position()
+    ent = world.create_entity(pos)
+    assert world.try_component(ent, Position) is pos
+    assert world.try_component(ent, Fleet) is None
+    assert world.try_component(ent + 100, Position) is None
+    assert world.has_component(ent, Position)
+    assert not world.has_component(ent, Fleet)
+    world.delete_entity(ent)
+    assert not world.has_component(ent, Position)
+
+
+def test_lookups_never_see_another_entitys_row_while_entities_migrate():
+    import threading
+
+    world = esper.World()
+    positions = {world.create_entity(Position(galaxy=i)): i for i in range(1, 51)}
+    stop = threading.Event()
+
+    def migrate() -> None:
+        # Each add/remove swap-removes a row, moving another entity into its slot
+        while not stop.is_set():
+            for ent in positions:
+                world.add_component(ent, Fleet())
+                world.remove_component(ent, Fleet)
+
+    writer = threading.Thread(target=migrate)
+    writer.start()
+    try:
+        for _ in range(200):
+            for ent, galaxy in positions.items():
+                assert world.component_for_entity(ent, Position).galaxy == galaxy
+    finally:
+        stop.set()
+        writer.join()
+
+
+def test_lookups_do_not_wait_for_a_running_tick():
+    import threading
+
+    world = esper.World()
+    ent = world.create_entity(Position(galaxy=3))
+    entered = threading.Event()
+    release = threading.Event()
+
+    class Slow(esper.Processor):
+        def process(self) -> None:
+            entered.set()
+            release.wait(5)
+
+    world.add_processor(Slow())
+    ticker = threading.Thread(target=world.process)
+    ticker.start()
+    try:
+        assert entered.wait(5)
+        # The tick is still running; reads and moves must not block on it
+        result = []
+        reader = threading.Thread(target=lambda: result.append(world.component_for_entity(ent, Position).galaxy))
+        reader.start()
+        reader.join(1)
+        assert result == [3]
+    finally:
+        release.set()
+        ticker.join()
+
+
+def test_query_cache_miss_cannot_miss_an_archetype_created_concurrently():
+    import threading
+
+    world = esper.World()
+    world.create_entity(Position(galaxy=1))
+    result = []
+    # An archetype created while another thread computes a miss must end up in the cached list
+    with world.lock:
+        reader = threading.Thread(target=lambda: result.append(list(world.get_component(Position))))
+        reader.start()
+        reader.join(0.1)
+        assert reader.is_alive()  # the miss waits for the in-flight structural change
+        late = world.create_entity(Position(galaxy=2), Fleet())
+    reader.join()
+    assert {ent for ent, _pos in result[0]} == {1, late}
+    assert {ent for ent, _pos in world.get_component(Position)} == {1, late}
@@ -1,3 +1,4 @@
+import pytest
 from src.core.game import GameWorld
 from datetime import datetime
 from src.models import Player, Position, Resources, ResourceProduction, Buildings, BuildQueue, Fleet, Research, Planet
@@ -93,3 +94,60 @@ def test_build_prerequisites_allow_shipyard_with_robot_factory_level2():
     assert snapshot["resources"]["metal"] == 100
     assert snapshot["resources"]["crystal"] == 100
     assert snapshot["resources"]["deuterium"] == 0
+
+
+def test_queue_commands_enqueues_a_batch_in_order():
+    gw = GameWorld()
+    gw.queue_commands([
+        {'type': 'build_building', 'user_id': 4, 'building_type': 'metal_mine'},
+        {'type': 'update_player_activity', 'user_id': 4},
+    ])
+    assert gw.command_queue.qsize() == 2
+    assert gw.command_queue.get_nowait()['type'] == 'build_building'
+    assert gw.command_queue.get_nowait()['type'] == 'update_player_activity'
+    assert gw.command_queue.empty()
+
+
+def test_pending_count_tracks_queued_commands():
+    gw = GameWorld()
+    assert gw.pending_count == 0
+    gw.queue_command({'type': 'update_player_activity', 'user_id': 5})
+    gw.queue_commands([{'type': 'update_player_activity', 'user_id': 6}] * 2)
+    assert gw.pending_count == 3
+    gw._process_commands()
+    assert gw.pending_count == 0
+
+
+def test_execute_command_dispatches_parsed_args_to_the_handler(monkeypatch):
+    from src.core.game import GameWorld
+
+    gw = GameWorld()
+    calls = []
+    monkeypatch.setattr(gw, "_handle_colonize", lambda *args: calls.append(("colonize", args)))
+    monkeypatch.setattr(gw, "_handle_update_activity", lambda *args: calls.append(("activity", args)))
+    gw._execute_command({"type": "colonize", "user_id": "4", "galaxy": 2})
+    gw._execute_command({"type": "update_player_activity", "user_id": 4})
+    gw._execute_command({"type": "unknown", "user_id": 4})
+    assert calls == [("colonize", (4, 2, 1, 1, "Colony")), ("activity", (4,))]
+
+
+def test_energy_summary_matches_the_production_tick_formulas(monkeypatch):
+    from src.api import routes
+    from src.systems.resource_production import energy_balance
+
+    gw = GameWorld()
+    bld = Buildings(metal_mine=12, crystal_mine=10, deuterium_synthesizer=8, solar_plant=9, fusion_reactor=2)
+    gw.world.create_entity(Player(name="energy", user_id=1), bld, Research(energy=3))
+    # No Research component: counted with energy level 0
+    bare = Buildings(metal_mine=20, solar_plant=1)
+    gw.world.create_entity(Player(name="bare", user_id=2), bare)
+    monkeypatch.setattr(routes, "game_world", gw)
+    # Research must come from the column snapshot, not per-entity lookups
+    monkeypatch.setattr(gw.world, "try_component", lambda *args: pytest.fail("point lookup"))
+
+    produced, required, factor = energy_balance(bld, 3)
+    assert produced > 0 and required > 0
+    summary = routes._energy_summary()
+    assert summary["total_planets"] == 2
+    assert summary["min_factor"] == min(factor, energy_balance(bare, 0)[2])
+    assert summary["deficit_planets"] == sum(1 for f in (factor, energy_balance(bare, 0)[2]) if f < 1.0)
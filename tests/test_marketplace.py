@@ -93,3 +93,26 @@ def test_marketplace_validation_prevents_self_trade_and_insufficient():
     # Should remain open and no resource changes except escrow
     offers_after = gw.list_market_offers()
     assert offers_after[0]['status'] == 'open'
+
+
+def test_get_market_offer_finds_offers_beyond_the_first_listing_page():
+    gw = GameWorld()
+    gw.world.create_entity(
+        Player(name="Seller", user_id=30), Position(), Resources(metal=10000, crystal=0, deuterium=0),
+        ResourceProduction(), Buildings(), BuildQueue(), Fleet(), Research(), Planet(name="Home", owner_id=30)
+    )
+    gw.queue_commands([{
+        'type': 'trade_create_offer',
+        'user_id': 30,
+        'offered_resource': 'metal',
+        'offered_amount': 10,
+        'requested_resource': 'crystal',
+        'requested_amount': 5,
+    }] * 60)
+    gw._process_commands()
+
+    assert len(gw.list_market_offers()) == 50  # default page size
+    last = gw.get_market_offer(60)
+    assert last is not None and last['id'] == 60 and last['status'] == 'open'
+    assert gw.get_market_offer(61) is None
+    assert gw.get_market_offer("not-an-id") is None
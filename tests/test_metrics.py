@@ -24,3 +24,83 @@ def test_metrics_http_and_ticks():
             time.sleep(0.2)
             ticks = client.get("/metrics").json()["game_loop"].get("ticks", 0)
         assert ticks >= 1
+
+
+def test_snapshot_computes_percentiles_outside_the_collector_state():
+    from src.core.metrics import MetricsCollector
+
+    collector = MetricsCollector()
+    for i in range(100, 0, -1):
+        collector.record_timer("op", i / 1000.0)
+    timer = collector.snapshot()["timers"]["op"]
+    assert timer["count"] == 100
+    assert round(timer["p95_ms"]) == 95
+    assert round(timer["p99_ms"]) == 99
+    # Recording order is preserved; snapshot sorted a copy
+    assert collector._timers["op"]._samples[0] == 0.1
+
+
+def test_metrics_document_is_reused_within_the_cache_window(monkeypatch):
+    from src.core import config
+
+    with TestClient(app) as client:
+        monkeypatch.setattr(config, "METRICS_CACHE_SECONDS", 60.0)
+        first = client.get("/metrics")
+        client.get("/")
+        second = client.get("/metrics")
+        assert first.status_code == second.status_code == 200
+        assert second.content == first.content
+
+        monkeypatch.setattr(config, "METRICS_CACHE_SECONDS", 0.0)
+        fresh = client.get("/metrics").json()
+        assert fresh["http"]["total_count"] > first.json()["http"]["total_count"]
+
+
+def test_probe_endpoints_are_not_recorded():
+    with TestClient(app) as client:
+        client.get("/healthz")
+        client.get("/metrics")
+        by_route = client.get("/metrics").json()["http"]["by_route"]
+        assert "GET:/healthz" not in by_route
+        assert "GET:/metrics" not in by_route
+
+
+def test_healthz_reformats_last_save_only_when_it_changes(monkeypatch):
+    import asyncio
+    from datetime import datetime
+    from types import SimpleNamespace
+    from src.api import routes
+
+    # Stand-in world: the real game loop may save (and move _last_save_ts) mid-test
+    world = SimpleNamespace(_last_save_ts=1_700_000_000.0, loaded=True, running=False, pending_count=0)
+    monkeypatch.setattr(routes, "game_world", world)
+    monkeypatch.setattr(routes, "_last_save_iso_cache", (0.0, ""))
+
+    first = asyncio.run(routes.healthz())["lastSaveTs"]
+    assert first == datetime.fromtimestamp(1_700_000_000.0).isoformat()
+    assert routes._last_save_iso_cache == (1_700_000_000.0, first)
+
+    monkeypatch.setattr(routes, "_last_save_iso_cache", (1_700_000_000.0, "cached"))
+    assert asyncio.run(routes.healthz())["lastSaveTs"] == "cached"
+
+    world._last_save_ts = 1_700_000_060.0
+    assert asyncio.run(routes.healthz())["lastSaveTs"] == datetime.fromtimestamp(1_700_000_060.0).isoformat()
+
+
+def test_metrics_document_is_the_same_with_and_without_orjson(monkeypatch):
+    import asyncio
+    import json
+    import orjson
+    from src.api import routes
+
+    snap = {"http": {"total_count": 3, "by_route": {"GET:/": {"count": 3, "p99_ms": 1.25}}}, "last_error": None}
+    monkeypatch.setattr(routes.metrics, "snapshot", lambda: snap)
+
+    bodies = []
+    for encoder in (orjson, None):
+        monkeypatch.setattr(routes, "_orjson", encoder)
+        monkeypatch.setattr(routes, "_metrics_cache", None)
+        r = asyncio.run(routes.get_metrics())
+        assert r.media_type == "application/json"
+        bodies.append(json.loads(r.body))
+    assert bodies == [snap, snap]
@@ -1,5 +1,8 @@
 import unittest
 
+from fastapi.testclient import TestClient
+
+from src.main import app
 from src.core.notifications import (
     create_notification,
     get_in_memory_notifications,
@@ -40,6 +43,121 @@ class TestNotificationsInMemory(unittest.TestCase):
         # Oldest 20 should have been dropped; first remaining should have i=20
         self.assertEqual(items[0]["payload"]["i"], 20)
 
+    def test_listing_accepts_a_keyset_cursor(self):
+        with TestClient(app) as client:
+            r = client.post("/auth/register", json={"username": "notif_cursor", "email": "notif_cursor@example.com", "password": "Password123!"})
+            self.assertEqual(r.status_code, 200, r.text)
+            user_id = r.json()["id"]
+            r = client.post("/auth/login", json={"username": "notif_cursor", "password": "Password123!"})
+            headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+            create_notification(user_id, "info", {"i": 1})
+
+            url = f"/player/{user_id}/notifications"
+            r = client.get(url, headers=headers, params={"before_created_at": "2026-01-01T00:00:00+00:00", "before_id": 5})
+            self.assertEqual(r.status_code, 200, r.text)
+            body = r.json()
+            self.assertIn("next_cursor", body)
+            self.assertEqual(len(body["notifications"]), 1)
+            self.assertEqual(client.get(url, headers=headers, params={"before_id": 0}).status_code, 422)
+
+    def test_empty_db_page_does_not_fall_back_to_memory(self):
+        import asyncio
+        import json
+        from unittest import mock
+        from src.api import routes
+
+        class _Result:
+            def all(self):
+                return []
+
+        class _Session:
+            async def execute(self, stmt):
+                return _Result()
+
+        create_notification(11, "info", {"i": 1})
+        with mock.patch.object(routes, "is_db_enabled", lambda: True):
+            r = asyncio.run(routes.list_notifications(
+                11, limit=50, offset=0, before_created_at=None, before_id=None, user=None, _rl=None, session=_Session(),
+            ))
+        self.assertEqual(json.loads(r.body), {"notifications": [], "next_cursor": None})
+
+    def test_next_cursor_is_set_only_when_another_row_exists(self):
+        import asyncio
+        import json
+        from datetime import datetime, timedelta
+        from unittest import mock
+        from fastapi import HTTPException
+        from src.api import routes
+
+        base = datetime(2026, 1, 1)
+        rows = [(10 - i, 11, "info", {}, "normal", base - timedelta(minutes=i), None) for i in range(3)]
+
+        class _Result:
+            def __init__(self, limit):
+                self.limit = limit
+
+            def all(self):
+                return rows[:self.limit]
+
+        class _Session:
+            async def execute(self, stmt):
+                return _Result(stmt._limit)
+
+        def page(limit, **kwargs):
+            params = {"offset": 0, "before_created_at": None, "before_id": None, **kwargs}
+            with mock.patch.object(routes, "is_db_enabled", lambda: True):
+                r = asyncio.run(routes.list_notifications(11, limit=limit, user=None, _rl=None, session=_Session(), **params))
+            return json.loads(r.body)
+
+        # Data ending exactly on the page boundary: no cursor, no extra round trip
+        body = page(3)
+        self.assertEqual(len(body["notifications"]), 3)
+        self.assertIsNone(body["next_cursor"])
+        body = page(2)
+        self.assertEqual([n["id"] for n in body["notifications"]], [10, 9])
+        self.assertEqual(body["next_cursor"]["before_id"], 9)
+
+        with self.assertRaises(HTTPException) as ctx:
+            page(2, offset=5, before_created_at=base, before_id=9)
+        self.assertEqual(ctx.exception.status_code, 400)
+
+    def test_delete_checks_ownership_in_the_delete_statement(self):
+        import asyncio
+        from types import SimpleNamespace
+        from unittest import mock
+        from fastapi import HTTPException
+        from src.api import routes
+
+        class _Result:
+            def __init__(self, value):
+                self.value = value
+
+            def scalar_one_or_none(self):
+                return self.value
+
+        class _Session:
+            def __init__(self):
+                self.calls = []
+                self.commits = 0
+
+            async def execute(self, stmt, params=None):
+                self.calls.append((stmt, params))
+                # Only notification 5 owned by user 9 exists
+                return _Result(5 if params == {"notification_id": 5, "user_id": 9} else None)
+
+            async def commit(self):
+                self.commits += 1
+
+        session = _Session()
+        with mock.patch.object(routes, "is_db_enabled", lambda: True):
+            out = asyncio.run(routes.delete_notification(5, user=SimpleNamespace(id=9), _rl=None, session=session))
+            self.assertEqual(out, {"deleted": True, "id": 5})
+            with self.assertRaises(HTTPException) as ctx:
+                asyncio.run(routes.delete_notification(5, user=SimpleNamespace(id=10), _rl=None, session=session))
+            self.assertEqual(ctx.exception.status_code, 404)
+        self.assertEqual(session.commits, 1)
+        self.assertTrue(all(stmt is routes._DELETE_OWN_NOTIFICATION for stmt, _ in session.calls))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -51,3 +51,116 @@ def test_planets_available_invalid_params():
     # Limit bounds respected
     r = client.get("/planets/available", params={"limit": 0})
     assert r.status_code == 422  # validation error from FastAPI for ge=1
+
+
+def test_planets_available_reuses_the_occupancy_index_until_a_planet_is_created(monkeypatch):
+    from src.api import routes
+    from src.core import config
+    from src.core.state import game_world
+
+    monkeypatch.setattr(config, "PLANET_OCCUPANCY_CACHE_SECONDS", 60.0)
+    loads = []
+    real_load = routes._load_planet_occupancy
+
+    async def counting_load(session):
+        loads.append(session)
+        return await real_load(session)
+
+    monkeypatch.setattr(routes, "_load_planet_occupancy", counting_load)
+
+    with TestClient(app) as client:
+        params = {"limit": 3}
+        first = client.get("/planets/available", params=params).json()["available"]
+        client.get("/planets/available", params=params)
+        assert len(loads) == 1
+
+        # A new planet invalidates the index, so the next listing excludes it
+        game_world.invalidate_planet_occupancy()
+        monkeypatch.setattr(
+            routes, "_load_planet_occupancy",
+            lambda session: _const_occupancy({(first[0]["galaxy"], first[0]["system"]): {first[0]["position"]}}),
+        )
+        after = client.get("/planets/available", params=params).json()["available"]
+        assert first[0] not in after
+        assert after[0] == first[1]
+
+
+async def _const_occupancy(by_system):
+    return by_system
+
+
+def test_planets_available_fallback_pages_match_a_full_enumeration(monkeypatch):
+    import asyncio
+    import json
+    from src.api import routes
+
+    occupancy = {(1, 1): {1, 2, 15}, (1, 3): set(range(1, 16)), (2, 1): {4}}
+    monkeypatch.setattr(routes, "seeded_pool_ready", lambda: False)
+    monkeypatch.setattr(routes, "_planet_occupancy", lambda session: _const_occupancy(occupancy))
+    monkeypatch.setattr(routes, "GALAXY_COUNT", 2)
+    monkeypatch.setattr(routes, "SYSTEMS_PER_GALAXY", 4)
+    monkeypatch.setattr(routes, "POSITIONS_PER_SYSTEM", 15)
+
+    everything = [
+        {"galaxy": g, "system": s, "position": p}
+        for g in range(1, 3) for s in range(1, 5) for p in range(1, 16)
+        if p not in occupancy.get((g, s), ())
+    ]
+
+    def page(**kwargs):
+        return json.loads(asyncio.run(routes.get_available_planets(session=None, **kwargs)).body)["available"]
+
+    for offset in (0, 7, 13, 45, len(everything) - 2, len(everything) + 5):
+        assert page(galaxy=None, system=None, limit=10, offset=offset) == everything[offset:offset + 10]
+    in_g1s3 = page(galaxy=1, system=3, limit=5, offset=0)
+    assert in_g1s3 == []
+    assert page(galaxy=2, system=None, limit=3, offset=14) == [c for c in everything if c["galaxy"] == 2][14:17]
+
+
+def test_seeded_pages_are_reused_until_the_occupancy_index_changes(monkeypatch):
+    from src.api import routes
+
+    calls = []
+
+    def fake_list(occupied, galaxy=None, system=None, limit=50, offset=0):
+        calls.append(sorted(occupied))
+        return [{"galaxy": 1, "system": 1, "position": offset + 1}]
+
+    monkeypatch.setattr(routes, "list_available_from_seed", fake_list)
+    monkeypatch.setattr(routes, "_seed_page_cache", (None, -1, {}))
+
+    index = {(1, 1): {3}, (2, 5): {1}}
+    first = routes._seeded_page(index, 1, None, 10, 0)
+    assert routes._seeded_page(index, 1, None, 10, 0) is first
+    assert calls == [[(1, 1, 3)]]  # only the filtered galaxy is passed on
+
+    routes._seeded_page(index, 1, None, 10, 10)
+    assert len(calls) == 2
+
+    rebuilt = {(1, 1): {3, 4}}
+    routes._seeded_page(rebuilt, 1, None, 10, 0)
+    assert calls[-1] == [(1, 1, 3), (1, 1, 4)]
+
+    # A planet added to the same index object in place also drops the pages
+    monkeypatch.setattr(routes.game_world, "planet_occupancy", (0.0, rebuilt))
+    routes.game_world.record_planet_occupied(1, 1, 5)
+    routes._seeded_page(rebuilt, 1, None, 10, 0)
+    assert calls[-1] == [(1, 1, 3), (1, 1, 4), (1, 1, 5)]
+
+
+def test_new_planets_are_added_to_the_cached_occupancy_index():
+    import time
+    from src.core.game import GameWorld
+
+    gw = GameWorld()
+    index = {(2, 3): {4}}
+    gw.planet_occupancy = (time.monotonic(), index)
+    gw.record_planet_occupied(2, 3, 7)
+    gw.record_planet_occupied(1, 1, 1)
+    assert gw.planet_occupancy[1] is index
+    assert index == {(2, 3): {4, 7}, (1, 1): {1}}
+
+    gw.invalidate_planet_occupancy()
+    assert gw.planet_occupancy is None
+    gw.record_planet_occupied(5, 5, 5)  # nothing cached: the next read rebuilds
+    assert gw.planet_occupancy is None
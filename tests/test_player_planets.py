@@ -35,3 +35,30 @@ def test_get_player_planets_forbidden_on_user_mismatch():
         # Use user2 token to access user1 planets -> should be 403
         r = client.get(f"/player/{uid1}/planets", headers={"Authorization": f"Bearer {token2}"})
         assert r.status_code == 403, r.text
+
+
+def test_choose_start_rejects_players_who_already_have_a_planet():
+    with TestClient(app) as client:
+        uid, token = _register_and_login(client, username="pp_user4", email="pp4@example.com")
+        r = client.post(
+            f"/player/{uid}/choose-start",
+            json={"galaxy": 1, "system": 1},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        assert r.status_code == 400, r.text
+        assert r.json()["detail"] == "Starter planet already chosen"
+
+
+def test_dashboard_combines_the_player_list_endpoints():
+    with TestClient(app) as client:
+        uid, token = _register_and_login(client, username="pp_dash", email="ppdash@example.com")
+        other_uid, _ = _register_and_login(client, username="pp_dash2", email="ppdash2@example.com")
+        headers = {"Authorization": f"Bearer {token}"}
+        r = client.get(f"/player/{uid}/dashboard", headers=headers)
+        assert r.status_code == 200, r.text
+        body = r.json()
+        assert body["planets"] == client.get(f"/player/{uid}/planets", headers=headers).json()["planets"]
+        assert body["battle_reports"] == client.get(f"/player/{uid}/battle-reports", headers=headers, params={"limit": 10}).json()["reports"]
+        assert body["espionage_reports"] == client.get(f"/player/{uid}/espionage-reports", headers=headers, params={"limit": 10}).json()["reports"]
+        assert body["trade_history"] == client.get(f"/player/{uid}/trade/history", headers=headers, params={"limit": 10}).json()["events"]
+        assert client.get(f"/player/{other_uid}/dashboard", headers=headers).status_code == 403
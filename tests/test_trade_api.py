@@ -1,3 +1,4 @@
+import pytest
 from fastapi.testclient import TestClient
 from src.main import app
 
@@ -71,3 +72,141 @@ def test_trade_offer_flow_create_list_accept_and_resources_update():
         assert found is not None
         assert found.get("status") == "accepted"
         assert int(found.get("accepted_by")) == buyer_id
+
+
+def test_trade_offers_listing_exposes_a_keyset_cursor():
+    with TestClient(app) as client:
+        r = client.get("/trade/offers", params={"before_created_at": "2026-01-01T00:00:00+00:00", "before_id": 5})
+        assert r.status_code == 200, r.text
+        assert "next_cursor" in r.json()
+        assert client.get("/trade/offers", params={"before_id": 0}).status_code == 422
+        assert client.get("/trade/offers", params={"before_created_at": "yesterday"}).status_code == 422
+
+
+
+def test_trade_offers_next_cursor_only_when_another_offer_exists(monkeypatch):
+    import asyncio
+    import json
+    from datetime import datetime, timedelta
+    from fastapi import HTTPException
+    from src.api import routes
+
+    base = datetime(2026, 1, 1)
+    rows = [(10 - i, 1, "metal", 5, "crystal", 3, "open", None, base - timedelta(minutes=i), None) for i in range(3)]
+
+    class _Result:
+        def __init__(self, limit):
+            self.limit = limit
+
+        def all(self):
+            return rows[:self.limit]
+
+    class _Session:
+        async def execute(self, stmt):
+            return _Result(stmt._limit)
+
+    monkeypatch.setattr(routes, "is_db_enabled", lambda: True)
+
+    def page(limit, **kwargs):
+        params = {"status": "open", "offset": 0, "before_created_at": None, "before_id": None, **kwargs}
+        return json.loads(asyncio.run(routes.list_trade_offers(limit=limit, session=_Session(), **params)).body)
+
+    # Data ending exactly on the page boundary: no cursor, no extra round trip
+    body = page(3)
+    assert len(body["offers"]) == 3
+    assert body["next_cursor"] is None
+    body = page(2)
+    assert [o["id"] for o in body["offers"]] == [10, 9]
+    assert body["next_cursor"]["before_id"] == 9
+
+    with pytest.raises(HTTPException) as exc:
+        page(2, offset=5, before_created_at=base, before_id=9)
+    assert exc.value.status_code == 400
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_list_response_encodes_datetimes_like_isoformat(monkeypatch, use_orjson):
+    import json
+    import orjson
+    from datetime import datetime, timezone
+    from src.api import routes
+
+    # Both the orjson fast path and the stdlib fallback must produce the same document
+    monkeypatch.setattr(routes, "_orjson", orjson if use_orjson else None)
+    naive = datetime(2026, 1, 2, 3, 4, 5, 678000)
+    aware = datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+    r = routes._list_response({"offers": [{"id": 1, "created_at": naive, "accepted_at": aware}, {"id": 2, "created_at": None}]})
+    assert r.media_type == "application/json"
+    offers = json.loads(r.body)["offers"]
+    assert offers[0] == {"id": 1, "created_at": naive.isoformat(), "accepted_at": aware.isoformat()}
+    assert offers[1]["created_at"] is None
+
+
+def _fake_trade_session(fail_flush: bool = False):
+    class _Session:
+        def __init__(self) -> None:
+            self.added: list = []
+            self.flushes = 0
+            self.commits = 0
+            self.rollbacks = 0
+
+        def add(self, row) -> None:
+            self.added.append(row)
+
+        async def flush(self) -> None:
+            self.flushes += 1
+            if fail_flush:
+                raise RuntimeError("duplicate key")
+            for n, row in enumerate(self.added, start=1000):
+                row.id = row.id or n
+
+        async def commit(self) -> None:
+            self.commits += 1
+
+        async def rollback(self) -> None:
+            self.rollbacks += 1
+
+    return _Session()
+
+
+def test_create_offer_writes_offer_and_event_in_one_commit(monkeypatch):
+    import asyncio
+    from types import SimpleNamespace
+    from src.api import routes
+    from src.core import trade_events
+
+    published = []
+    with TestClient(app) as client:
+        seller_id, _token = _register_and_login(client, "onecommit", "onecommit@example.com")
+        monkeypatch.setattr(routes, "is_db_enabled", lambda: True)
+        monkeypatch.setattr(trade_events, "is_db_enabled", lambda: True)
+        monkeypatch.setattr(routes, "publish_trade_event", published.append)
+        session = _fake_trade_session()
+        body = {"offered_resource": "metal", "offered_amount": 10, "requested_resource": "crystal", "requested_amount": 5}
+        offer = asyncio.run(routes.create_trade_offer(body, user=SimpleNamespace(id=seller_id), _rl=None, _pl=None, session=session))
+        assert (session.flushes, session.commits) == (1, 1)
+        assert [type(row).__name__ for row in session.added] == ["TradeOffer", "TradeEvent"]
+        assert offer["seller_user_id"] == seller_id and offer["status"] == "open"
+        assert [e["type"] for e in published] == ["offer_created"]
+
+
+def test_failed_offer_insert_rolls_back_without_announcing_an_event(monkeypatch):
+    import asyncio
+    from types import SimpleNamespace
+    from src.api import routes
+    from src.core import trade_events
+    from src.core.state import game_world
+
+    published = []
+    with TestClient(app) as client:
+        seller_id, _token = _register_and_login(client, "failcommit", "failcommit@example.com")
+        monkeypatch.setattr(routes, "is_db_enabled", lambda: True)
+        monkeypatch.setattr(trade_events, "is_db_enabled", lambda: True)
+        monkeypatch.setattr(routes, "publish_trade_event", published.append)
+        history_before = len(game_world._trade_history)
+        session = _fake_trade_session(fail_flush=True)
+        body = {"offered_resource": "metal", "offered_amount": 10, "requested_resource": "crystal", "requested_amount": 5}
+        asyncio.run(routes.create_trade_offer(body, user=SimpleNamespace(id=seller_id), _rl=None, _pl=None, session=session))
+        assert (session.commits, session.rollbacks) == (0, 1)
+        assert published == []
+        # Only the ECS escrow's own offer_created, no in-memory fallback for the DB event
+        assert len(game_world._trade_history) == history_before + 1
@@ -1,3 +1,5 @@
+import json
+
 from fastapi.testclient import TestClient
 from src.main import app
 
@@ -25,3 +27,310 @@ def test_websocket_welcome_and_ping():
             msg2 = websocket.receive_json()
             assert msg2["type"] == "pong"
             assert "server_time" in msg2
+
+
+class _FakeWebSocket:
+    def __init__(self) -> None:
+        self.sent: list = []
+        self.closed = False
+
+    async def accept(self) -> None:
+        pass
+
+    async def send_text(self, text: str) -> None:
+        self.sent.append(json.loads(text))
+
+    async def close(self, code: int = 1000) -> None:
+        self.closed = True
+
+
+def test_connection_manager_keeps_a_running_total():
+    import asyncio
+    from src.api.routes import ConnectionManager
+
+    async def scenario():
+        mgr = ConnectionManager()
+        a, b, c = _FakeWebSocket(), _FakeWebSocket(), _FakeWebSocket()
+        await mgr.connect(a, 1)
+        await mgr.connect(b, 1)
+        await mgr.connect(c, 2)
+        await mgr.connect(c, 2)  # duplicate registration is not double-counted
+        assert mgr.total_connections == 3
+        mgr.disconnect(a, 1)
+        mgr.disconnect(a, 1)  # already gone
+        assert mgr.total_connections == 2
+        await mgr.close_all()
+        assert mgr.total_connections == 0
+
+    asyncio.run(scenario())
+
+
+def test_broadcast_reaches_every_socket_and_drops_broken_ones():
+    import asyncio
+    from src.api.routes import ConnectionManager
+
+    class _Broken(_FakeWebSocket):
+        async def send_text(self, text: str) -> None:
+            raise RuntimeError("peer gone")
+
+    async def scenario():
+        mgr = ConnectionManager()
+        a, b, broken = _FakeWebSocket(), _FakeWebSocket(), _Broken()
+        await mgr.connect(a, 1)
+        await mgr.connect(broken, 1)
+        await mgr.connect(b, 2)
+        await mgr.broadcast({"type": "tick"})
+        assert a.sent == [{"type": "tick"}]
+        assert b.sent == [{"type": "tick"}]
+        assert broken.closed
+        assert mgr.total_connections == 2
+
+    asyncio.run(scenario())
+
+
+def test_broadcast_tolerates_connection_changes_while_sending():
+    import asyncio
+    from src.api.routes import ConnectionManager
+
+    mgr = ConnectionManager()
+    late = _FakeWebSocket()
+
+    class _Broken(_FakeWebSocket):
+        async def send_text(self, text: str) -> None:
+            raise RuntimeError("peer gone")
+
+    class _Slow(_FakeWebSocket):
+        async def send_text(self, text: str) -> None:
+            # A new user arrives while this send is still in flight
+            await mgr.connect(late, 99)
+            await asyncio.sleep(0)
+            await super().send_text(text)
+
+    async def scenario():
+        broken, slow, other = _Broken(), _Slow(), _FakeWebSocket()
+        await mgr.connect(broken, 1)  # user 1's only socket: their entry is removed mid-broadcast
+        await mgr.connect(slow, 2)
+        await mgr.connect(other, 2)
+        await mgr.broadcast({"type": "tick"})
+        assert slow.sent == other.sent == [{"type": "tick"}]
+        assert late.sent == []
+        assert mgr.total_connections == 3
+
+    asyncio.run(scenario())
+
+def test_broadcast_encodes_the_message_once(monkeypatch):
+    import asyncio
+    from src.api import routes
+
+    calls = []
+    real_encode = routes._encode_ws_message
+
+    def counting_encode(message):
+        calls.append(message)
+        return real_encode(message)
+
+    monkeypatch.setattr(routes, "_encode_ws_message", counting_encode)
+
+    async def scenario():
+        mgr = routes.ConnectionManager()
+        sockets = [_FakeWebSocket() for _ in range(5)]
+        for uid, ws in enumerate(sockets, start=1):
+            await mgr.connect(ws, uid)
+        await mgr.broadcast({"type": "tick", "n": 1})
+        assert all(ws.sent == [{"type": "tick", "n": 1}] for ws in sockets)
+
+    asyncio.run(scenario())
+    assert len(calls) == 1
+
+
+
+def test_broadcast_frames_are_identical_with_and_without_orjson(monkeypatch):
+    import asyncio
+    import orjson
+    from src.api import routes, ws
+
+    frames = []
+
+    class _RawSocket(_FakeWebSocket):
+        async def send_text(self, text: str) -> None:
+            frames.append(text)
+
+    async def scenario():
+        mgr = routes.ConnectionManager()
+        await mgr.connect(_RawSocket(), 1)
+        await mgr.broadcast({"type": "tick", "name": "Éole", "n": [1, 2.5, None, True], "nested": {"a": "}"}})
+
+    for encoder in (orjson, None):
+        monkeypatch.setattr(ws, "_orjson", encoder)
+        asyncio.run(scenario())
+    assert len(frames) == 2
+    assert frames[0] == frames[1]
+
+
+def test_server_time_is_reformatted_at_most_every_tick(monkeypatch):
+    from types import SimpleNamespace
+    from src.api import routes
+
+    clock = [1000.0]
+    monkeypatch.setattr(routes, "time", SimpleNamespace(monotonic=lambda: clock[0], perf_counter=routes.time.perf_counter))
+    monkeypatch.setattr(routes, "_iso_clock", (float("-inf"), ""))
+
+    first = routes._iso_now()
+    assert first
+    clock[0] += routes._ISO_CLOCK_SECONDS / 2
+    assert routes._iso_now() is first
+    clock[0] += routes._ISO_CLOCK_SECONDS
+    assert routes._iso_now() is not first
+
+
+def test_websocket_replies_to_pipelined_frames_in_order():
+    with TestClient(app) as client:
+        _uid, token = _register_and_login(client, username="wspipe", email="wspipe@example.com")
+        with client.websocket_connect(f"/ws?token={token}") as websocket:
+            assert websocket.receive_json()["type"] == "welcome"
+            for _ in range(3):
+                websocket.send_text("ping")
+            websocket.send_text("hello")
+            assert [websocket.receive_json()["type"] for _ in range(3)] == ["pong"] * 3
+            assert websocket.receive_json() == {"type": "info", "message": "hello"}
+
+
+def test_websocket_reports_binary_frames_and_keeps_reading():
+    with TestClient(app) as client:
+        _uid, token = _register_and_login(client, username="wsbin", email="wsbin@example.com")
+        with client.websocket_connect(f"/ws?token={token}") as websocket:
+            assert websocket.receive_json()["type"] == "welcome"
+            websocket.send_bytes(b"\x00\x01")
+            assert websocket.receive_json() == {"type": "error", "message": "invalid message"}
+            websocket.send_text("ping")
+            assert websocket.receive_json()["type"] == "pong"
+
+
+def test_ws_reader_gives_up_after_repeated_receive_errors():
+    import asyncio
+    from src.api import routes
+
+    class _BrokenSocket:
+        calls = 0
+
+        async def iter_text(self):
+            _BrokenSocket.calls += 1
+            raise RuntimeError("socket is broken")
+            yield  # pragma: no cover - makes this an async generator
+
+    async def scenario():
+        replies: asyncio.Queue = asyncio.Queue()
+        await routes._ws_reader(_BrokenSocket(), replies)
+        return [replies.get_nowait() for _ in range(replies.qsize())]
+
+    queued = asyncio.run(scenario())
+    assert _BrokenSocket.calls == routes._WS_MAX_RECEIVE_ERRORS
+    assert queued[-1] is None
+    assert queued.count({"type": "error", "message": "invalid message"}) == routes._WS_MAX_RECEIVE_ERRORS
+
+
+def test_send_to_user_coalesces_bursts_per_user(monkeypatch):
+    import asyncio
+    import threading
+    from src.api import routes, ws
+
+    sent = []
+
+    class _Manager:
+        async def send_text_to_user(self, user_id, text):
+            sent.append((user_id, json.loads(text)))
+
+    monkeypatch.setattr(routes, "ws_manager", _Manager())
+    monkeypatch.setattr(ws, "_seq", {})
+
+    async def scenario():
+        ws.set_loop(asyncio.get_running_loop())
+
+        def produce():
+            for n in range(3):
+                ws.send_to_user(1, {"type": "resource_update", "n": n})
+            ws.send_to_user(2, {"type": "building_complete"})
+
+        producer = threading.Thread(target=produce)
+        producer.start()
+        producer.join()
+        assert ws.queue_depth(1) == 3
+        await asyncio.sleep(0.05)
+        assert ws.queue_depth(1) == 0
+        ws.send_to_user(1, {"type": "late"})
+        await ws.stop()
+
+    asyncio.run(scenario())
+    assert sent == [
+        (1, {"type": "batch", "items": [{"type": "resource_update", "n": n, "seq": n + 1} for n in range(3)]}),
+        (2, {"type": "building_complete", "seq": 1}),
+        (1, {"type": "late", "seq": 4}),
+    ]
+
+
+def test_send_to_user_drops_oldest_and_reports_the_gap(monkeypatch):
+    import asyncio
+    from src.api import routes, ws
+
+    sent = []
+
+    class _Manager:
+        async def send_text_to_user(self, user_id, text):
+            sent.append((user_id, json.loads(text)))
+
+    monkeypatch.setattr(routes, "ws_manager", _Manager())
+    monkeypatch.setattr(ws, "_seq", {})
+    monkeypatch.setattr(ws, "PER_USER_MAX_PENDING", 2)
+
+    async def scenario():
+        ws.set_loop(asyncio.get_running_loop())
+        for n in range(5):
+            ws.send_to_user(1, {"n": n})
+        assert ws.queue_depth(1) == 2
+        await ws.stop()
+
+    asyncio.run(scenario())
+    assert sent == [(1, {"type": "batch", "items": [
+        {"type": "gap", "from_seq": 1, "to_seq": 3},
+        {"n": 3, "seq": 4},
+        {"n": 4, "seq": 5},
+    ]})]
+
+
+def test_pre_encoded_messages_get_their_seq_spliced_in():
+    from src.api import ws
+
+    assert json.loads(ws._with_seq(7, ws.encode_message({}))) == {"seq": 7}
+    assert json.loads(ws._with_seq(8, ws.encode_message({"type": "t", "n": [1, {"a": "}"}]}))) == {"seq": 8, "type": "t", "n": [1, {"a": "}"}]}
+
+
+def test_producer_thread_encoding_matches_on_both_encoders(monkeypatch):
+    import asyncio
+    import threading
+    import orjson
+    from src.api import routes, ws
+
+    sent = []
+
+    class _Manager:
+        async def send_text_to_user(self, user_id, text):
+            sent.append(text)
+
+    monkeypatch.setattr(routes, "ws_manager", _Manager())
+    # Integer keys (e.g. per-planet maps) and non-ASCII names are encoded off the loop
+    message = {"type": "resource_update", "by_planet": {7: {"metal": 1.5}}, "name": "Éole"}
+
+    async def scenario():
+        ws.set_loop(asyncio.get_running_loop())
+        producer = threading.Thread(target=ws.send_to_user, args=(1, message))
+        producer.start()
+        producer.join()
+        await ws.stop()
+
+    for encoder in (orjson, None):
+        monkeypatch.setattr(ws, "_orjson", encoder)
+        monkeypatch.setattr(ws, "_seq", {})
+        asyncio.run(scenario())
+    assert len(sent) == 2
+    assert sent[0] == sent[1]
+    assert json.loads(sent[0]) == {"type": "resource_update", "by_planet": {"7": {"metal": 1.5}}, "name": "Éole", "seq": 1}